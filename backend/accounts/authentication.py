@@ -0,0 +1,76 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import acached_request_user, cached_request_user
+from .context import UserContext
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with the user taken from the per-user cache, in
+    one select_related query on a miss, and exposed to views as
+    ``request.user_context``.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            request.user_context = UserContext(result[0])
+        return result
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views: (user, token) or None, with the
+        user read through the async cache and ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = await acached_request_user(self.get_user_id(validated_token))
+        if user is not None and api_settings.CHECK_REVOKE_TOKEN:
+            # check_user would load the deferred password synchronously
+            await user.arefresh_from_db(fields=["password"])
+        self.check_user(user, validated_token)
+
+        request.user_context = UserContext(user)
+        return user, validated_token
+
+    def get_user(self, validated_token):
+        # JWTAuthentication.get_user with a cached lookup
+        user = cached_request_user(self.get_user_id(validated_token))
+        self.check_user(user, validated_token)
+        return user
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    def check_user(self, user, validated_token):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # The password is deferred; this loads it
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
@@ -0,0 +1,100 @@
+"""
+Short-lived per-user caches.
+
+- The UserSerializer data RefreshTokenView answers with: RefreshTokenView
+  is the most called endpoint, and serving the data from here turns a
+  refresh into signature checks only.
+- The user CachedJWTAuthentication authenticates, loaded with company
+  and department in one query (and without the password hash), so
+  neither authentication nor ``user.company`` / ``user.department``
+  query again within USER_CACHE_TIMEOUT.
+
+Entries are dropped when the user, their company or their department
+is saved or deleted (accounts.signals). Changes that send no signal,
+such as ``queryset.update()``, show after USER_CACHE_TIMEOUT at most.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import User
+from .serializers import UserSerializer
+
+
+def user_cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def _request_user_key(user_id):
+    return f"accounts:request-user:{user_id}"
+
+
+def remember_user(user):
+    """
+    Cache and return the UserSerializer data of ``user``.
+    """
+    data = dict(UserSerializer(user).data)
+    user_cache().set(_user_key(user.pk), data, settings.USER_CACHE_TIMEOUT)
+    return data
+
+
+def cached_user_data(user_id):
+    """
+    UserSerializer data of user ``user_id``, or None if there is none.
+    """
+    data = user_cache().get(_user_key(user_id))
+    if data is None:
+        user = User.objects.filter(id=user_id).first()
+        if user is None:
+            return None
+        data = remember_user(user)
+    return data
+
+
+def _request_user_queryset(user_id):
+    return (
+        User.objects.select_related("company", "department")
+        .defer("password")
+        .filter(id=user_id)
+    )
+
+
+def cached_request_user(user_id):
+    """
+    User ``user_id`` with company and department loaded, or None if
+    there is none.
+    """
+    cache = user_cache()
+    key = _request_user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = _request_user_queryset(user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+async def acached_request_user(user_id):
+    """
+    cached_request_user for async views.
+    """
+    cache = user_cache()
+    key = _request_user_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await _request_user_queryset(user_id).afirst()
+        if user is None:
+            return None
+        await cache.aset(key, user, settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_users(*user_ids):
+    user_cache().delete_many([
+        key(user_id) for user_id in user_ids for key in (_user_key, _request_user_key)
+    ])
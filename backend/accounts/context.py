@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+
+from .models import Company, Department, User
+
+
+@dataclass(frozen=True)
+class UserContext:
+    """
+    The user a request is made by and their tenant. Set as
+    ``request.user_context`` by CachedJWTAuthentication, whose user has
+    company and department preloaded.
+    """
+
+    user: User
+
+    @property
+    def id(self) -> int:
+        return self.user.id
+
+    @property
+    def role(self) -> str:
+        return self.user.role
+
+    @property
+    def is_admin(self) -> bool:
+        return self.user.role == "admin"
+
+    @property
+    def company_id(self) -> int | None:
+        return self.user.company_id
+
+    @property
+    def company(self) -> Company | None:
+        return self.user.company
+
+    @property
+    def department_id(self) -> int | None:
+        return self.user.department_id
+
+    @property
+    def department(self) -> Department | None:
+        return self.user.department
+
+
+def user_context(request) -> UserContext:
+    """
+    The request's UserContext, also for users authenticated some other
+    way (their company and department then load on first use).
+    """
+    context = getattr(request, "user_context", None)
+    if context is None or context.user is not request.user:
+        context = UserContext(request.user)
+    return context
@@ -0,0 +1,121 @@
+"""
+Password hashers whose cost comes from settings.
+
+``PASSWORD_HASHER`` picks the hasher that new and upgraded passwords
+use; the others stay listed so existing hashes still verify. A hash
+made with another hasher or other costs is rewritten on the next
+successful login (Django's ``check_password`` setter), so changing the
+settings migrates users as they log in.
+
+``calibrate`` measures a hasher on the current machine and returns the
+costs that keep one hash at or below a target time; see the
+``calibrate_password_hasher`` command.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.utils.crypto import get_random_string
+
+
+class CalibratedScryptPasswordHasher(ScryptPasswordHasher):
+    # A limit, not an allocation: OpenSSL refuses more than 32 MiB
+    # unless told otherwise, which stops at 2 ** 14 with block size 8
+    maxmem = 2**28
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+
+class CalibratedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Needs argon2-cffi (``pip install django[argon2]``).
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or super().iterations
+
+
+def hash_ms(hasher, repeat=3):
+    """
+    Median milliseconds ``hasher`` takes to hash one password.
+    """
+    password, salt = get_random_string(16), hasher.salt()
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        hasher.encode(password, salt)
+        timings.append((time.perf_counter() - began) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def pinned(hasher_class, **costs):
+    """
+    An instance of ``hasher_class`` with the given cost attributes
+    instead of the settings.
+    """
+    return type(hasher_class.__name__, (hasher_class,), costs)()
+
+
+def calibrate(name, target_ms, repeat=3):
+    """
+    ``({setting: value}, ms)``: the highest cost of hasher ``name`` whose
+    hash takes at most ``target_ms`` (or the lowest cost tried), other
+    parameters kept at their current settings.
+    """
+    if name == "pbkdf2":
+        # Linear in the iterations: scale one measurement
+        probe = 100_000
+        ms = hash_ms(pinned(PBKDF2PasswordHasher, iterations=probe), repeat)
+        iterations = max(int(probe * target_ms / ms) // 1000 * 1000, 1000)
+        measured = hash_ms(pinned(PBKDF2PasswordHasher, iterations=iterations), repeat)
+        return {"PASSWORD_PBKDF2_ITERATIONS": iterations}, measured
+
+    if name == "scrypt":
+        setting, values = "PASSWORD_SCRYPT_WORK_FACTOR", [2**n for n in range(10, 18)]
+        base, attribute = CalibratedScryptPasswordHasher, "work_factor"
+    elif name == "argon2":
+        setting, values = "PASSWORD_ARGON2_TIME_COST", range(1, 33)
+        base, attribute = CalibratedArgon2PasswordHasher, "time_cost"
+    else:
+        raise ValueError(f'Unknown hasher "{name}".')
+
+    # Cost grows with the value: stop at the first one over the target
+    best = None
+    for value in values:
+        ms = hash_ms(pinned(base, **{attribute: value}), repeat)
+        if best is not None and ms > target_ms:
+            break
+        best = ({setting: value}, ms)
+        if ms > target_ms:
+            break
+    return best
@@ -0,0 +1,70 @@
+"""
+Credential checks for LoginView.
+
+A password check is deliberately expensive, and a client retrying a
+slow login, or several tabs logging in at once, sends the same
+credentials again while the first check still runs. ``check_credentials``
+runs one lookup and one hash per (email, password) at a time in this
+process: callers arriving while it is in flight wait for it and share
+its outcome. The guard is per process; other workers hash on their own.
+"""
+
+import threading
+from concurrent.futures import Future
+
+from django.utils.crypto import salted_hmac
+
+from .models import User
+
+
+class SingleFlight:
+    """
+    Runs ``fn`` once per key at a time; concurrent calls with the same
+    key wait for that run and get its result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            call.set_result(fn())
+        except BaseException as exc:
+            call.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+        return call.result()
+
+
+LOGIN_FLIGHTS = SingleFlight()
+
+
+def _check(email, password):
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        return None, False
+
+    # Rehashes with the current hasher and costs when they changed
+    return user, user.check_password(password)
+
+
+def check_credentials(email, password):
+    """
+    ``(user, valid)``: the user with ``email`` (None if there is none)
+    and whether ``password`` is theirs.
+    """
+    # Keyed on a keyed digest so the password itself is not kept
+    key = (email, salted_hmac("accounts.login", password, algorithm="sha256").hexdigest())
+    return LOGIN_FLIGHTS.do(key, lambda: _check(email, password))
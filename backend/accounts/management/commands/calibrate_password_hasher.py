@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.hashers import calibrate
+
+
+class Command(BaseCommand):
+    help = "Measure a password hasher here and print the costs for a target time per hash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hasher", choices=sorted(settings.PASSWORD_HASHER_CLASSES),
+            default=settings.PASSWORD_HASHER,
+        )
+        parser.add_argument(
+            "--target-ms", type=float, default=250,
+            help="Longest a single hash may take",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            costs, ms = calibrate(options["hasher"], options["target_ms"], options["repeat"])
+        except ValueError as exc:
+            # e.g. argon2-cffi is not installed
+            raise CommandError(str(exc))
+
+        for setting, value in costs.items():
+            self.stdout.write(f"{setting}={value}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['hasher']}: {ms:.0f} ms per hash, "
+            f"{1000 / ms:.1f} logins/s per core"
+        ))
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from .cache import forget_users
+from .models import Company, Department, User
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    forget_users(instance.pk)
+
+
+def forget_cached_members(sender, instance, created=False, **kwargs):
+    # Cached users embed their company and department; on delete this
+    # runs before SET_NULL empties the foreign keys
+    if created:
+        return
+    field = "company" if sender is Company else "department"
+    forget_users(*User.objects.filter(**{field: instance}).values_list("id", flat=True))
+
+
+def connect():
+    post_save.connect(forget_cached_user, sender=User, dispatch_uid="user-cache-save")
+    post_delete.connect(forget_cached_user, sender=User, dispatch_uid="user-cache-delete")
+
+    for model in (Company, Department):
+        post_save.connect(
+            forget_cached_members, sender=model, dispatch_uid=f"user-cache-save-{model.__name__}"
+        )
+        pre_delete.connect(
+            forget_cached_members, sender=model, dispatch_uid=f"user-cache-delete-{model.__name__}"
+        )
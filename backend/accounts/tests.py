@@ -0,0 +1,172 @@
+import threading
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from accounts.login import SingleFlight
+from accounts.models import Company, Department, User
+
+SCRYPT_FIRST = [
+    "accounts.hashers.CalibratedScryptPasswordHasher",
+    "accounts.hashers.CalibratedPBKDF2PasswordHasher",
+]
+
+
+@override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2**10, PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name="GearGuard", location="Pune")
+        self.user = User.objects.create_user(
+            email="tech@test.com",
+            password="tech123",
+            role="technician",
+            company=self.company,
+        )
+
+    def _login(self, password):
+        return self.client.post(
+            "/api/accounts/login/",
+            {"email": "tech@test.com", "password": password},
+            format="json",
+        )
+
+    def test_login_checks_credentials(self):
+        res = self._login("tech123")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertIn("refresh", res.cookies)
+
+        res = self._login("wrong")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(
+            "/api/accounts/login/",
+            {"email": "nobody@test.com", "password": "tech123"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_login_rehashes_with_current_hasher_and_costs(self):
+        # PBKDF2 unless another hasher is opted into
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+        # A wrong password leaves the stored hash alone
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self._login("wrong")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self._login("tech123")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+        with override_settings(PASSWORD_HASHERS=SCRYPT_FIRST):
+            self._login("tech123")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$1024$"))
+
+        with override_settings(PASSWORD_HASHERS=SCRYPT_FIRST, PASSWORD_SCRYPT_WORK_FACTOR=2**11):
+            self.assertEqual(self._login("tech123").status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$2048$"))
+
+    def test_refresh_serves_cached_user_until_saved(self):
+        self._login("tech123")
+
+        # Login cached the user, so a refresh only checks the token
+        with self.assertNumQueries(0):
+            res = self.client.post("/api/accounts/refresh-token/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertEqual(res.data["user"]["role"], "technician")
+
+        self.user.role = "admin"
+        self.user.save()
+        with self.assertNumQueries(1):
+            res = self.client.post("/api/accounts/refresh-token/")
+        self.assertEqual(res.data["user"]["role"], "admin")
+
+        self.user.delete()
+        res = self.client.post("/api/accounts/refresh-token/")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def _user_queries(self, access):
+        """
+        Queries a JWT-authenticated request runs against users, companies
+        or departments.
+        """
+        with CaptureQueriesContext(connection) as captured:
+            res = self.client.get(
+                "/api/core/maintenance-teams/", HTTP_AUTHORIZATION=f"Bearer {access}"
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [
+            query["sql"] for query in captured
+            if 'FROM "accounts_' in query["sql"]
+        ]
+
+    def test_jwt_user_and_tenant_are_cached_per_user(self):
+        access = self._login("tech123").data["access"]
+        self.user.department = Department.objects.create(name="Maintenance")
+        self.user.save()
+
+        # One query for the user, company and department, then none
+        queries = self._user_queries(access)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('JOIN "accounts_company"', queries[0])
+        self.assertIn('JOIN "accounts_department"', queries[0])
+        self.assertEqual(self._user_queries(access), [])
+
+        # Renaming the company drops its members' cached users
+        self.company.name = "GearGuard Pune"
+        self.company.save()
+        self.assertEqual(len(self._user_queries(access)), 1)
+
+    def test_single_flight_shares_concurrent_calls(self):
+        flights = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return len(calls)
+
+        def run():
+            results.append(flights.do("key", slow))
+
+        leader = threading.Thread(target=run)
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=run) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [1, 1, 1, 1])
+
+        # Done calls are forgotten; errors reach the caller
+        self.assertEqual(flights.do("key", slow), 2)
+        with self.assertRaises(ZeroDivisionError):
+            flights.do("key", lambda: 1 / 0)
+
+    def test_calibrate_password_hasher_command(self):
+        out = StringIO()
+        call_command(
+            "calibrate_password_hasher", "--hasher", "scrypt",
+            "--target-ms", "1", "--repeat", "1", stdout=out,
+        )
+        self.assertIn("PASSWORD_SCRYPT_WORK_FACTOR=1024", out.getvalue())
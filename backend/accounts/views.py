@@ -1,6 +1,8 @@
 from rest_framework.views import APIView, Response, status
-from .serializers import RegisterSerializer, UserSerializer
+from .serializers import RegisterSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
+from .cache import cached_user_data, remember_user
+from .login import check_credentials
 from .models import User
 
 class RegisterView(APIView):
@@ -25,24 +27,23 @@ class LoginView(APIView):
                 {"error": "Email and password are required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        user = User.objects.filter(email=username).first()
+        user, valid = check_credentials(username, password)
         if user is None:
             return Response(
                 {"error": "User not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        if not user.check_password(password):
+        if not valid:
             return Response(
                 {"error": "Invalid email or password."},
                 status=status.HTTP_401_UNAUTHORIZED,
             )
-        serializer = UserSerializer(user)
         token = RefreshToken.for_user(user)
         response = Response(
             {
                 "message": "Login successful.",
                 "access": str(token.access_token),
-                "user" : serializer.data,
+                "user" : remember_user(user),
             },
             status=status.HTTP_200_OK,
         )
@@ -68,11 +69,12 @@ class RefreshTokenView(APIView):
         try:
             token = RefreshToken(refresh_token)
             access_token = str(token.access_token)
-            user = User.objects.get(id=token['user_id'])
-            serializer = UserSerializer(user)
+            user = cached_user_data(token['user_id'])
+            if user is None:
+                raise User.DoesNotExist
             return Response(
                 {"access": access_token,
-                 "user": serializer.data
+                 "user": user
                 },
                 status=status.HTTP_200_OK,
             )
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -50,12 +51,35 @@ ADMIN_SECRET_KEY = os.getenv('ADMIN_SECRET_KEY')
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Technician auto-assignment: least_loaded, round_robin or skill_weighted
+MAINTENANCE_ASSIGNMENT_POLICY = os.getenv('MAINTENANCE_ASSIGNMENT_POLICY', 'least_loaded')
+MAINTENANCE_LOAD_WINDOW_DAYS = int(os.getenv('MAINTENANCE_LOAD_WINDOW_DAYS', '14'))
+
+# Preventive maintenance generation (manage.py schedule_preventive_maintenance)
+MAINTENANCE_PREVENTIVE_HORIZON_DAYS = int(os.getenv('MAINTENANCE_PREVENTIVE_HORIZON_DAYS', '7'))
+MAINTENANCE_PREVENTIVE_DURATION_HOURS = int(os.getenv('MAINTENANCE_PREVENTIVE_DURATION_HOURS', '2'))
+MAINTENANCE_PREVENTIVE_MAX_DELAY_DAYS = int(os.getenv('MAINTENANCE_PREVENTIVE_MAX_DELAY_DAYS', '7'))
+MAINTENANCE_WORKDAY_START_HOUR = int(os.getenv('MAINTENANCE_WORKDAY_START_HOUR', '9'))
+MAINTENANCE_WORKDAY_END_HOUR = int(os.getenv('MAINTENANCE_WORKDAY_END_HOUR', '17'))
+
+# Board change events (maintenance.events), streamed at /api/maintenance/events/
+# under ASGI. The in-process broker only reaches one process's streams.
+MAINTENANCE_EVENT_BROKER = os.getenv(
+    'MAINTENANCE_EVENT_BROKER', 'maintenance.events.InProcessBroker'
+)
+MAINTENANCE_EVENT_KEEPALIVE_SECONDS = int(os.getenv('MAINTENANCE_EVENT_KEEPALIVE_SECONDS', '15'))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
+    'EXCEPTION_HANDLER': 'core.exceptions.exception_handler',
 }
 
+# Serve the read-heavy endpoints (request list, work logs, selects) with
+# async views; turn on when running under an ASGI server (api.asgi)
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '0') == '1'
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
@@ -92,6 +116,7 @@ WSGI_APPLICATION = 'api.wsgi.app'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+# PostgreSQL 15 or newer: the daily rollups' unique key is NULLS NOT DISTINCT
 
 postgres = urlparse(os.getenv("DATABASE_URL"))
 
@@ -107,6 +132,25 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory by default; point CACHE_BACKEND / CACHE_LOCATION at a
+# shared backend (e.g. Redis) when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+SELECT_CACHE_ALIAS = 'default'
+SELECT_CACHE_TIMEOUT = int(os.getenv('SELECT_CACHE_TIMEOUT', '300'))
+
+# User data served on token refresh; dropped when the user is saved
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', '60'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -126,6 +170,37 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER (pbkdf2, scrypt or argon2) hashes new passwords; the
+# others still verify existing hashes, which are rehashed with the
+# current hasher and costs on the next login. pbkdf2 at Django's own
+# iterations is the default so existing hashes stay as they are; scrypt
+# and argon2 are opt-in, and switching rehashes every user on their
+# next login at the new hasher's cost. argon2 needs argon2-cffi.
+# `manage.py calibrate_password_hasher` suggests costs for a target
+# time per hash; the defaults are Django's own.
+
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHER_CLASSES = {
+    'scrypt': 'accounts.hashers.CalibratedScryptPasswordHasher',
+    'argon2': 'accounts.hashers.CalibratedArgon2PasswordHasher',
+    'pbkdf2': 'accounts.hashers.CalibratedPBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER),
+]
+
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', str(2**14)))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv('PASSWORD_SCRYPT_BLOCK_SIZE', '8'))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv('PASSWORD_SCRYPT_PARALLELISM', '5'))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '102400'))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '8'))
+# Unset: the iterations of the installed Django
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '0')) or None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
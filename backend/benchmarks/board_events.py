@@ -0,0 +1,155 @@
+"""
+What a board refresh costs polled vs. pushed.
+
+    python manage.py shell < benchmarks/board_events.py
+
+    BENCH_REQUESTS=2000  BENCH_POLLS=50  BENCH_SUBSCRIBERS=500  BENCH_EVENTS=200
+
+BENCH_REQUESTS requests are created for one company. A poll is one page
+of the request list, rendered as the endpoint would, BENCH_POLLS times.
+For push, BENCH_SUBSCRIBERS streams subscribe to the company channel of
+an InProcessBroker and BENCH_EVENTS status changes are published from
+another thread; the time is until every subscriber has every event.
+Everything is rolled back at the end.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import Company, Department, User
+from core.models import Equipment, EquipmentCategory, WorkCenter
+from maintenance.events import (
+    STATUS_CHANGED,
+    InProcessBroker,
+    company_channel,
+    request_event,
+)
+from maintenance.models import MaintenanceRequest
+from maintenance.views import MaintenanceRequestViewSet
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "2000"))
+POLLS = int(os.getenv("BENCH_POLLS", "50"))
+SUBSCRIBERS = int(os.getenv("BENCH_SUBSCRIBERS", "500"))
+EVENTS = int(os.getenv("BENCH_EVENTS", "200"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def poll(admin):
+    view = MaintenanceRequestViewSet.as_view({"get": "list"})
+    factory = APIRequestFactory()
+    size = 0
+
+    began = time.perf_counter()
+    for _ in range(POLLS):
+        request = factory.get("/api/maintenance/", HTTP_HOST="localhost")
+        force_authenticate(request, user=admin)
+        response = view(request)
+        assert response.status_code == 200, response.data
+        size = len(JSONRenderer().render(response.data))
+    return (time.perf_counter() - began) * 1000 / POLLS, size
+
+
+async def push(company_id, events):
+    broker = InProcessBroker()
+    broker.queue_size = EVENTS
+    subscriptions = [
+        broker.subscribe([company_channel(company_id)]) for _ in range(SUBSCRIBERS)
+    ]
+
+    async def drain(subscription):
+        for _ in range(EVENTS):
+            json.dumps(await subscription.get(), separators=(",", ":"))
+
+    def publish():
+        for event in events:
+            broker.publish([company_channel(company_id)], event)
+
+    began = time.perf_counter()
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    await asyncio.gather(*(drain(subscription) for subscription in subscriptions))
+    elapsed = time.perf_counter() - began
+    publisher.join()
+
+    for subscription in subscriptions:
+        subscription.close()
+    return elapsed * 1000 / EVENTS
+
+
+print(f"📡 Board refresh: {REQUESTS} requests, {SUBSCRIBERS} subscribers")
+
+try:
+    with transaction.atomic():
+        company = Company.objects.create(name="Bench Co", location="Bench")
+        department = Department.objects.create(name="Bench")
+        admin = User.objects.create(
+            email="bench-admin@bench.local", role="admin",
+            company=company, department=department,
+        )
+        technician = User.objects.create(
+            email="bench-tech@bench.local", role="technician",
+            company=company, department=department,
+        )
+        equipment = Equipment.objects.create(
+            name="Bench Press", serial_number="BENCH-EVT-1", company=company,
+            category=EquipmentCategory.objects.create(name="Bench Events"),
+            department=department,
+        )
+        work_center = WorkCenter.objects.create(
+            name="Bench Line", code="BENCH-EVT", company=company,
+            cost_per_hour=100, time_efficiency=90, oee_target=85,
+        )
+
+        start = timezone.now() + timedelta(days=1)
+        requests = MaintenanceRequest.objects.bulk_create(
+            MaintenanceRequest(
+                title=f"Bench request {number}",
+                maintenance_type="corrective",
+                status="scheduled",
+                equipment=equipment,
+                work_center=work_center,
+                assigned_technician=technician,
+                scheduled_start=start + timedelta(hours=number),
+                duration_hours=1,
+                scheduled_end=start + timedelta(hours=number + 1),
+                company=company,
+                department=department,
+                created_by=admin,
+            )
+            for number in range(REQUESTS)
+        )
+
+        poll_ms, poll_bytes = poll(admin)
+
+        events = []
+        for maintenance in requests[:EVENTS]:
+            maintenance.status = "in_progress"
+            events.append(request_event(STATUS_CHANGED, maintenance, previous_status="scheduled"))
+        event_bytes = sum(
+            len(json.dumps(event, separators=(",", ":"))) for event in events
+        ) / len(events)
+        event_ms = asyncio.run(push(company.id, events))
+
+        print("--------------------------------------------------")
+        print(f"Poll (one list page):  {poll_ms:8.2f} ms   {poll_bytes:7d} bytes per client")
+        print(
+            f"Push (one event):      {event_ms:8.2f} ms   {event_bytes:7.0f} bytes per client, "
+            f"{event_ms * 1000 / SUBSCRIBERS:.1f} µs per subscriber"
+        )
+        print("--------------------------------------------------")
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
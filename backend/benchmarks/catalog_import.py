@@ -0,0 +1,106 @@
+"""
+Throughput and peak Python memory of the chunked CSV equipment import
+as the file grows.
+
+    python manage.py shell < benchmarks/catalog_import.py
+
+    BENCH_ROW_COUNTS=10000,100000  BENCH_CHUNK_SIZE=1000
+
+For every size a CSV is written to a temporary file and imported twice:
+the first pass creates every row, the second updates them all. A third
+pass under tracemalloc reports the peak. Everything is rolled back.
+"""
+
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.models import Company, Department, User
+from core.importers import EquipmentImporter
+from core.models import EquipmentCategory
+
+ROW_COUNTS = [int(n) for n in os.getenv("BENCH_ROW_COUNTS", "10000,100000").split(",")]
+CHUNK_SIZE = int(os.getenv("BENCH_CHUNK_SIZE", "1000"))
+EMPLOYEES = int(os.getenv("BENCH_EMPLOYEES", "500"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def fixtures():
+    Company.objects.create(name="Bench Co", location="Bench")
+    Department.objects.create(name="Bench")
+    EquipmentCategory.objects.create(name="Bench")
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(email=f"bench-user-{i}@bench.local", password=password, role="user")
+        for i in range(EMPLOYEES)
+    )
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow([
+            "serial_number", "name", "company", "category", "department",
+            "employee", "maintenance_interval_days", "last_maintenance_service_date",
+        ])
+        for i in range(rows):
+            writer.writerow([
+                f"BENCH-{i:08d}", f"Bench Asset {i}", "Bench Co", "Bench", "Bench",
+                f"bench-user-{i % EMPLOYEES}@bench.local", 30 + i % 300, "2026-01-01",
+            ])
+
+
+def run_import(path):
+    importer = EquipmentImporter(chunk_size=CHUNK_SIZE)
+    with open(path, encoding="utf-8-sig", newline="") as lines:
+        for progress in importer.run(importer.read_header(lines)):
+            pass
+    return progress
+
+
+print("🛠️ Equipment CSV import benchmark")
+print(f"{'rows':>10}{'create s':>10}{'update s':>10}{'rows/s':>10}{'peak MiB':>10}")
+
+try:
+    with transaction.atomic():
+        fixtures()
+
+        for rows in ROW_COUNTS:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "equipment.csv")
+                write_csv(path, rows)
+
+                with transaction.atomic():
+                    began = time.perf_counter()
+                    created = run_import(path)
+                    create_s = time.perf_counter() - began
+
+                    began = time.perf_counter()
+                    updated = run_import(path)
+                    update_s = time.perf_counter() - began
+
+                    tracemalloc.start()
+                    run_import(path)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+                    assert created["created"] == rows, created
+                    assert updated["updated"] == rows, updated
+                    transaction.set_rollback(True)
+
+            print(
+                f"{rows:>10,}{create_s:>10.2f}{update_s:>10.2f}"
+                f"{rows / create_s:>10,.0f}{peak / 2**20:>10.1f}"
+            )
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
@@ -0,0 +1,168 @@
+"""
+Peak Python memory and throughput of the streaming history export as
+the history grows.
+
+    python manage.py shell < benchmarks/history_export.py
+
+    BENCH_REQUEST_COUNTS=10000,100000,500000  BENCH_LOGS_PER_REQUEST=2
+
+Requests are inserted up to each count, each with work logs and one
+assignment. Both formats are drained through maintenance.exports once
+for timing and once under tracemalloc for the peak. Everything is
+rolled back at the end.
+"""
+
+import os
+import time
+import tracemalloc
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from accounts.models import Company, Department, User
+from core.models import Equipment, EquipmentCategory, MaintenanceTeam, WorkCenter
+from maintenance.exports import stream_export
+from maintenance.models import MaintenanceRequest
+
+REQUEST_COUNTS = [
+    int(n) for n in os.getenv("BENCH_REQUEST_COUNTS", "10000,100000,500000").split(",")
+]
+LOGS_PER_REQUEST = int(os.getenv("BENCH_LOGS_PER_REQUEST", "2"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def fixtures():
+    company = Company.objects.create(name="Bench Co", location="Bench")
+    department = Department.objects.create(name="Bench")
+    password = make_password(None)
+    creator = User.objects.create(
+        email="bench-user@bench.local", password=password, role="user",
+        company=company, department=department,
+    )
+    technician = User.objects.create(
+        email="bench-tech@bench.local", password=password, role="technician",
+        company=company,
+    )
+    category = EquipmentCategory.objects.create(name="Bench")
+    equipment = Equipment.objects.create(
+        name="Bench Press", serial_number="BENCH-0001",
+        company=company, category=category,
+    )
+    work_center = WorkCenter.objects.create(
+        name="Bench Line", code="BENCH-0", company=company,
+        cost_per_hour=100, time_efficiency=90, oee_target=85,
+    )
+    team = MaintenanceTeam.objects.create(name="Bench Team", company=company)
+    return company, creator, technician, equipment, work_center, team
+
+
+def insert_history(count, offset, company, creator, technician, equipment, work_center, team):
+    params = {
+        "company": company.id,
+        "creator": creator.id,
+        "technician": technician.id,
+        "equipment": equipment.id,
+        "work_center": work_center.id,
+        "team": team.id,
+        "first": offset + 1,
+        "last": offset + count,
+        "logs": LOGS_PER_REQUEST,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO maintenance_maintenancerequest (
+                title, description, maintenance_type, priority, status,
+                equipment_id, work_center_id, company_id, created_by_id,
+                assigned_team_id, assigned_technician_id,
+                scheduled_start, duration_hours, scheduled_end,
+                created_at, updated_at
+            )
+            SELECT
+                'Bench #' || g, 'Export benchmark row', 'corrective', 'medium',
+                'completed', %(equipment)s, %(work_center)s, %(company)s,
+                %(creator)s, %(team)s, %(technician)s,
+                now() - g * interval '1 minute', 2,
+                now() - g * interval '1 minute' + interval '2 hours',
+                now() - g * interval '1 minute', now()
+            FROM generate_series(%(first)s, %(last)s) AS g
+            """,
+            params,
+        )
+        cursor.execute(
+            """
+            INSERT INTO maintenance_maintenanceworklog (
+                maintenance_request_id, technician_id, note, status, created_at
+            )
+            SELECT r.id, %(technician)s, 'Log ' || n, 'in_progress', r.created_at
+            FROM maintenance_maintenancerequest r, generate_series(1, %(logs)s) AS n
+            WHERE r.title = ANY(
+                SELECT 'Bench #' || g FROM generate_series(%(first)s, %(last)s) AS g
+            )
+            """,
+            params,
+        )
+        cursor.execute(
+            """
+            INSERT INTO maintenance_maintenanceassignment (
+                maintenance_request_id, assigned_team_id, assigned_technician_id,
+                assigned_by_id, assigned_at, is_active
+            )
+            SELECT r.id, %(team)s, %(technician)s, %(creator)s, r.created_at, true
+            FROM maintenance_maintenancerequest r
+            WHERE r.title = ANY(
+                SELECT 'Bench #' || g FROM generate_series(%(first)s, %(last)s) AS g
+            )
+            """,
+            params,
+        )
+        cursor.execute("ANALYZE")
+
+
+def drain(output):
+    size = 0
+    for chunk in stream_export(MaintenanceRequest.objects.all(), output):
+        size += len(chunk)
+    return size
+
+
+def measure(output):
+    """
+    Timed pass, then a second pass under tracemalloc for the peak.
+    """
+    began = time.perf_counter()
+    size = drain(output)
+    elapsed = time.perf_counter() - began
+
+    tracemalloc.start()
+    drain(output)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, size / 2**20
+
+
+print("🛠️ History export benchmark")
+print(f"{'requests':>10}{'format':>8}{'seconds':>10}{'rows/s':>10}{'peak MiB':>10}{'out MiB':>10}")
+
+try:
+    with transaction.atomic():
+        objects = fixtures()
+        inserted = 0
+
+        for target in REQUEST_COUNTS:
+            insert_history(target - inserted, inserted, *objects)
+            inserted = target
+
+            for output in ("ndjson", "csv"):
+                elapsed, peak, size = measure(output)
+                print(
+                    f"{target:>10,}{output:>8}{elapsed:>10.2f}"
+                    f"{target / elapsed:>10,.0f}{peak:>10.1f}{size:>10.1f}"
+                )
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
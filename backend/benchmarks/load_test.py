@@ -0,0 +1,167 @@
+"""
+Load test of the read endpoints against running deployments, e.g. the
+WSGI app with the sync views and the ASGI app with ASYNC_READ_VIEWS on:
+
+    gunicorn api.wsgi:app -w 2 -k gthread --threads 8 -b 127.0.0.1:8000
+    ASYNC_READ_VIEWS=1 uvicorn api.asgi:application --workers 2 --port 8001
+
+    python benchmarks/load_test.py
+
+    BENCH_TARGETS=wsgi=http://127.0.0.1:8000,asgi=http://127.0.0.1:8001
+    BENCH_EMAIL=tech@example.com  BENCH_PASSWORD=...  (or BENCH_TOKEN)
+    BENCH_PATHS=/api/maintenance/,/api/core/work-centers/select/
+    BENCH_CONCURRENCY=1,16,64  BENCH_SECONDS=10
+
+Every concurrency level runs that many clients for BENCH_SECONDS, each
+on its own keep-alive connection, cycling through BENCH_PATHS. Reported
+per target and level: throughput, p50 / p99 latency and errors. Plain
+asyncio, so it runs without Django or any HTTP client package.
+"""
+
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+TARGETS = [
+    target.split("=", 1)
+    for target in os.getenv(
+        "BENCH_TARGETS", "wsgi=http://127.0.0.1:8000,asgi=http://127.0.0.1:8001"
+    ).split(",")
+]
+PATHS = os.getenv(
+    "BENCH_PATHS", "/api/maintenance/,/api/core/work-centers/select/"
+).split(",")
+CONCURRENCY = [int(n) for n in os.getenv("BENCH_CONCURRENCY", "1,16,64").split(",")]
+SECONDS = float(os.getenv("BENCH_SECONDS", "10"))
+
+
+class Connection:
+    """
+    One keep-alive HTTP/1.1 connection, reopened when the server closes it.
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=b"", retry=True):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # Closed between requests: retry once on a new connection
+            await self.close()
+            if not retry:
+                raise ConnectionError("Connection closed without a response")
+            return await self.request(method, path, headers, body, retry=False)
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            content = b""
+            while size := int((await self.reader.readline()).strip(), 16):
+                content += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+        else:
+            content = await self.reader.readexactly(
+                int(response_headers.get("content-length", 0))
+            )
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, content
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+
+
+async def access_token(url):
+    token = os.getenv("BENCH_TOKEN")
+    if token:
+        return token
+
+    connection = Connection(url)
+    body = json.dumps({
+        "email": os.environ["BENCH_EMAIL"],
+        "password": os.environ["BENCH_PASSWORD"],
+    }).encode()
+    status, content = await connection.request(
+        "POST", "/api/accounts/login/", {"Content-Type": "application/json"}, body
+    )
+    await connection.close()
+    if status != 200:
+        raise SystemExit(f"Login at {url} failed with {status}: {content[:200]!r}")
+    return json.loads(content)["access"]
+
+
+async def client(url, headers, deadline, latencies, errors):
+    connection = Connection(url)
+    turn = 0
+    while time.perf_counter() < deadline:
+        path = PATHS[turn % len(PATHS)]
+        turn += 1
+        began = time.perf_counter()
+        try:
+            status, _ = await connection.request("GET", path, headers)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await connection.close()
+            status = None
+        if status == 200:
+            latencies.append(time.perf_counter() - began)
+        else:
+            errors.append(status)
+    await connection.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+async def main():
+    print(f"🚦 {', '.join(PATHS)} for {SECONDS:.0f}s per level")
+    print("--------------------------------------------------")
+    print(f"{'target':<8} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    for name, url in TARGETS:
+        headers = {"Authorization": f"Bearer {await access_token(url)}"}
+
+        for concurrency in CONCURRENCY:
+            latencies, errors = [], []
+            deadline = time.perf_counter() + SECONDS
+            began = time.perf_counter()
+            await asyncio.gather(*(
+                client(url, headers, deadline, latencies, errors)
+                for _ in range(concurrency)
+            ))
+            elapsed = time.perf_counter() - began
+
+            latencies.sort()
+            print(
+                f"{name:<8} {concurrency:>7} {len(latencies) / elapsed:>9.1f} "
+                f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.1f} {len(errors):>7}"
+            )
+
+    print("--------------------------------------------------")
+
+
+asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Login throughput per worker for each password hasher, and what the
+single-flight guard saves when the same credentials arrive together.
+
+    python manage.py shell < benchmarks/login_throughput.py
+
+    BENCH_HASHERS=pbkdf2,scrypt  BENCH_LOGINS=20  BENCH_CONCURRENCY=8
+
+For every hasher a user is created with it and LoginView is called
+BENCH_LOGINS times in a row (lookup, hash, tokens). A user stored with
+the first hasher then logs in under the last one to show the transparent
+rehash. Finally BENCH_CONCURRENCY threads check the same password at
+once, with and without the guard. Everything is rolled back at the end.
+"""
+
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from accounts.login import LOGIN_FLIGHTS
+from accounts.models import Company, User
+from accounts.views import LoginView
+
+HASHERS = os.getenv("BENCH_HASHERS", "pbkdf2,scrypt").split(",")
+LOGINS = int(os.getenv("BENCH_LOGINS", "20"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "8"))
+PASSWORD = "bench-password-1"
+
+
+class Rollback(Exception):
+    pass
+
+
+def preferring(name):
+    classes = settings.PASSWORD_HASHER_CLASSES
+    return override_settings(
+        PASSWORD_HASHER=name,
+        PASSWORD_HASHERS=[
+            classes[name], *(path for other, path in classes.items() if other != name)
+        ],
+    )
+
+
+def login(email):
+    request = APIRequestFactory().post(
+        "/api/auth/login/", {"email": email, "password": PASSWORD}, format="json"
+    )
+    response = LoginView.as_view()(request)
+    assert response.status_code == 200, response.data
+    return response
+
+
+def concurrent(check):
+    """
+    Wall time of CONCURRENCY threads running ``check`` together.
+    """
+    barrier = threading.Barrier(CONCURRENCY)
+
+    def run():
+        barrier.wait()
+        check()
+
+    threads = [threading.Thread(target=run) for _ in range(CONCURRENCY)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - began) * 1000
+
+
+print(f"🔐 Login throughput, {LOGINS} logins per hasher")
+
+try:
+    with transaction.atomic():
+        company = Company.objects.create(name="Bench Co", location="Bench")
+        results = []
+
+        for name in HASHERS:
+            with preferring(name):
+                user = User.objects.create_user(
+                    email=f"bench-{name}@bench.local", password=PASSWORD,
+                    role="technician", company=company,
+                )
+                login(user.email)
+
+                began = time.perf_counter()
+                for _ in range(LOGINS):
+                    login(user.email)
+                elapsed = time.perf_counter() - began
+                results.append((name, elapsed * 1000 / LOGINS, LOGINS / elapsed))
+
+        with preferring(HASHERS[0]):
+            user = User.objects.create_user(
+                email="bench-rehash@bench.local", password=PASSWORD,
+                role="technician", company=company,
+            )
+        before = user.password.split("$", 1)[0]
+        with preferring(HASHERS[-1]):
+            login(user.email)
+        user.refresh_from_db()
+        after = user.password.split("$", 1)[0]
+
+        with preferring(HASHERS[-1]):
+            encoded = make_password(PASSWORD)
+            hashes = []
+
+            def hash_once():
+                hashes.append(1)
+                return check_password(PASSWORD, encoded)
+
+            plain_ms = concurrent(hash_once)
+            plain_hashes = len(hashes)
+            hashes.clear()
+            guarded_ms = concurrent(lambda: LOGIN_FLIGHTS.do("bench", hash_once))
+            guarded_hashes = len(hashes)
+
+        print("--------------------------------------------------")
+        for name, ms, rate in results:
+            print(f"{name:<8} {ms:8.1f} ms per login   {rate:6.1f} logins/s per worker")
+        print(f"Rehash on login:    {before} -> {after}")
+        print(
+            f"{CONCURRENCY} concurrent checks: {plain_hashes} hashes in {plain_ms:.0f} ms "
+            f"without the guard, {guarded_hashes} in {guarded_ms:.0f} ms with it"
+        )
+        print("--------------------------------------------------")
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
@@ -0,0 +1,129 @@
+"""
+End-to-end run of the preventive maintenance scheduler on a seeded
+fleet of assets.
+
+    python manage.py shell < benchmarks/preventive_scheduler.py
+
+    BENCH_ASSETS=100000  BENCH_TECHNICIANS=400  BENCH_TEAMS=10
+    BENCH_WORK_CENTERS=60  BENCH_DUE_SHARE=0.2
+
+``BENCH_DUE_SHARE`` of the assets is overdue; the rest are spread over
+the coming year. ``BENCH_DUE_SHARE=1`` is the full load, every asset due
+at once. The due query, the allocation and the bulk insert are
+all timed by the one call, which is rolled back afterwards.
+"""
+
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from accounts.models import Company, Department, User
+from core.models import EquipmentCategory, MaintenanceTeam, WorkCenter
+from maintenance.models import MaintenanceAssignment, MaintenanceRequest
+from maintenance.preventive import schedule_preventive_maintenance
+
+ASSETS = int(os.getenv("BENCH_ASSETS", "100000"))
+TECHNICIANS = int(os.getenv("BENCH_TECHNICIANS", "400"))
+TEAMS = int(os.getenv("BENCH_TEAMS", "10"))
+WORK_CENTERS = int(os.getenv("BENCH_WORK_CENTERS", "60"))
+DUE_SHARE = float(os.getenv("BENCH_DUE_SHARE", "0.2"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed():
+    company = Company.objects.create(name="Bench Co", location="Bench")
+    department = Department.objects.create(name="Bench")
+    password = make_password(None)
+
+    technicians = User.objects.bulk_create(
+        User(
+            email=f"bench-tech-{i}@bench.local",
+            password=password,
+            role="technician",
+            company=company,
+        )
+        for i in range(TECHNICIANS)
+    )
+    admin = User.objects.create(
+        email="bench-admin@bench.local", password=password, role="admin",
+        company=company,
+    )
+    WorkCenter.objects.bulk_create(
+        WorkCenter(
+            name=f"Bench Line {i}", code=f"BENCH-{i}", company=company,
+            cost_per_hour=100 + i, capacity=1 + i % 4,
+            time_efficiency=90, oee_target=85,
+        )
+        for i in range(WORK_CENTERS)
+    )
+
+    categories = []
+    for i in range(TEAMS):
+        team = MaintenanceTeam.objects.create(name=f"Bench Team {i}", company=company)
+        members = technicians[i::TEAMS]
+        team.members.add(*members)
+        categories.append(EquipmentCategory.objects.create(
+            name=f"Bench {i}", default_technician=members[0],
+        ))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO core_equipment (
+                name, serial_number, company_id, category_id, department_id,
+                maintenance_interval_days, last_maintenance_service_date
+            )
+            SELECT
+                'Bench Asset #' || g, 'BENCH-A-' || g,
+                %(company)s,
+                (%(categories)s::bigint[])[1 + g %% %(category_count)s],
+                %(department)s,
+                30 + g %% 336,
+                CASE WHEN random() < %(due_share)s
+                    THEN current_date - (30 + g %% 336) - (g %% 20)
+                    ELSE current_date - (g %% (30 + g %% 336)) + 8
+                END
+            FROM generate_series(1, %(rows)s) AS g
+            """,
+            {
+                "company": company.id,
+                "categories": [category.id for category in categories],
+                "category_count": len(categories),
+                "department": department.id,
+                "due_share": DUE_SHARE,
+                "rows": ASSETS,
+            },
+        )
+        for table in ("core_equipment", "accounts_user", "core_maintenanceteam_members"):
+            cursor.execute(f"ANALYZE {table}")
+
+    return admin
+
+
+print(f"🛠️ Seeding {ASSETS:,} assets...")
+
+try:
+    with transaction.atomic():
+        admin = seed()
+
+        began = time.perf_counter()
+        summary = schedule_preventive_maintenance(admin)
+        elapsed = time.perf_counter() - began
+
+        print("--------------------------------------------------")
+        print(f"Due assets:        {summary['due']:,}")
+        print(f"Scheduled:         {summary['scheduled']:,}")
+        print(f"Without a slot:    {summary['unassigned']:,}")
+        print(f"Requests written:  {MaintenanceRequest.objects.count():,}")
+        print(f"Assignments:       {MaintenanceAssignment.objects.count():,}")
+        print(f"Elapsed:           {elapsed:.2f}s")
+        print("--------------------------------------------------")
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
@@ -0,0 +1,217 @@
+"""
+Query plans and timings for the MaintenanceRequest indexes, with and
+without them, on a seeded table.
+
+    BENCH_ROWS=2000000 python manage.py shell < benchmarks/scheduling_indexes.py
+
+Everything runs inside one transaction that is rolled back at the end,
+so the database is left untouched. The "before" pass drops the indexes
+declared in MaintenanceRequest.Meta inside a savepoint.
+"""
+
+import os
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import Company, Department, User
+from core.models import Equipment, EquipmentCategory, MaintenanceTeam, WorkCenter
+from maintenance.models import MaintenanceRequest
+from maintenance.services import (
+    WorkCenterAllocator,
+    calendar_window,
+    technician_schedule,
+    technician_scores,
+)
+
+ROWS = int(os.getenv("BENCH_ROWS", "2000000"))
+TECHNICIANS = int(os.getenv("BENCH_TECHNICIANS", "400"))
+WORK_CENTERS = int(os.getenv("BENCH_WORK_CENTERS", "60"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "5"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed():
+    company = Company.objects.create(name="Bench Co", location="Bench")
+    department = Department.objects.create(name="Bench")
+    password = make_password(None)
+
+    technicians = User.objects.bulk_create(
+        User(
+            email=f"bench-tech-{i}@bench.local",
+            password=password,
+            role="technician",
+            company=company,
+            department=department,
+        )
+        for i in range(TECHNICIANS)
+    )
+    creator = User.objects.create(
+        email="bench-user@bench.local", password=password, role="user",
+        company=company, department=department,
+    )
+    category = EquipmentCategory.objects.create(name="Bench")
+    equipment = Equipment.objects.create(
+        name="Bench Press", serial_number="BENCH-0001",
+        company=company, category=category, department=department,
+    )
+    work_centers = WorkCenter.objects.bulk_create(
+        WorkCenter(
+            name=f"Bench Line {i}", code=f"BENCH-{i}", company=company,
+            cost_per_hour=100 + i, capacity=1 + i % 3,
+            time_efficiency=90, oee_target=85,
+        )
+        for i in range(WORK_CENTERS)
+    )
+    team = MaintenanceTeam.objects.create(name="Bench Team", company=company)
+    team.members.add(*technicians[:40])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO maintenance_maintenancerequest (
+                title, description, maintenance_type, priority, status,
+                equipment_id, work_center_id, company_id, department_id,
+                created_by_id, assigned_team_id, assigned_technician_id,
+                scheduled_start, duration_hours, scheduled_end,
+                created_at, updated_at
+            )
+            SELECT
+                'Bench #' || g, '', 'corrective', 'medium',
+                (ARRAY['new', 'scheduled', 'in_progress', 'completed', 'cancelled'])[1 + g %% 5],
+                %(equipment)s,
+                (%(work_centers)s::bigint[])[1 + g %% %(wc_count)s],
+                %(company)s, %(department)s, %(creator)s, %(team)s,
+                (%(technicians)s::bigint[])[1 + g %% %(tech_count)s],
+                start, hours, start + hours * interval '1 hour',
+                now() - g * interval '15 seconds',
+                now()
+            FROM generate_series(1, %(rows)s) AS g,
+                LATERAL (
+                    SELECT
+                        now() - interval '365 days' + (g %% 1051200) * interval '1 minute'
+                            AS start,
+                        1 + g %% 8 AS hours
+                ) AS slot
+            """,
+            {
+                "equipment": equipment.id,
+                "work_centers": [wc.id for wc in work_centers],
+                "wc_count": len(work_centers),
+                "company": company.id,
+                "department": department.id,
+                "creator": creator.id,
+                "team": team.id,
+                "technicians": [tech.id for tech in technicians],
+                "tech_count": len(technicians),
+                "rows": ROWS,
+            },
+        )
+        cursor.execute("ANALYZE maintenance_maintenancerequest")
+
+    return company, department, creator, team, technicians
+
+
+def hot_queries(company, department, creator, team, technicians):
+    """
+    Capture the SQL the scheduling services and list endpoints run.
+    """
+    start = timezone.now() + timedelta(days=3)
+    end = start + timedelta(hours=4)
+    member_ids = list(team.members.values_list("id", flat=True))
+
+    with CaptureQueriesContext(connection) as captured:
+        technician_schedule(member_ids, start, end)
+        technician_scores(member_ids, start, policy="least_loaded")
+        WorkCenterAllocator(company, start, end)
+        list(MaintenanceRequest.objects.filter(company=company)[:50])
+        list(MaintenanceRequest.objects.filter(department=department)[:50])
+        list(MaintenanceRequest.objects.filter(created_by=creator)[:50])
+        list(calendar_window(
+            MaintenanceRequest.objects.filter(company=company), start, start + timedelta(days=7)
+        ))
+        list(calendar_window(
+            MaintenanceRequest.objects.filter(assigned_technician=technicians[0]),
+            start, start + timedelta(days=31),
+        ))
+
+    labels = [
+        "technician availability",
+        "workload scores",
+        "work centers",
+        "work center alternatives",
+        "work center bookings",
+        "list by company",
+        "list by department",
+        "list by creator",
+        "calendar week",
+        "calendar month, technician",
+    ]
+    return list(zip(labels, (query["sql"] for query in captured.captured_queries)))
+
+
+def measure(queries):
+    results = {}
+    with connection.cursor() as cursor:
+        for label, sql in queries:
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql)
+            plan = [row[0] for row in cursor.fetchall()]
+
+            timings = []
+            for _ in range(REPEAT):
+                began = time.perf_counter()
+                cursor.execute(sql)
+                cursor.fetchall()
+                timings.append((time.perf_counter() - began) * 1000)
+
+            results[label] = (sorted(timings)[len(timings) // 2], plan)
+    return results
+
+
+def print_plans(title, results):
+    print(f"\n==================== {title} ====================")
+    for label, (median, plan) in results.items():
+        print(f"\n--- {label}: {median:.2f} ms (median of {REPEAT})")
+        print("\n".join(plan))
+
+
+print(f"🛠️ Seeding {ROWS:,} maintenance requests...")
+
+try:
+    with transaction.atomic():
+        began = time.perf_counter()
+        fixtures = seed()
+        print(f"✅ Seeded in {time.perf_counter() - began:.1f}s")
+
+        queries = hot_queries(*fixtures)
+        index_names = [index.name for index in MaintenanceRequest._meta.indexes]
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in index_names:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+            before = measure(queries)
+            transaction.set_rollback(True)
+
+        after = measure(queries)
+
+        print_plans("BEFORE (FK indexes only)", before)
+        print_plans("AFTER (MaintenanceRequest.Meta.indexes)", after)
+
+        print("\n--------------------------------------------------")
+        print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for label, _ in queries:
+            old, new = before[label][0], after[label][0]
+            print(f"{label:<28}{old:>12.2f}{new:>12.2f}{old / max(new, 1e-6):>9.1f}x")
+        print("--------------------------------------------------")
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
@@ -0,0 +1,80 @@
+"""
+Token refresh throughput with the user served from the database vs.
+the user cache.
+
+    python manage.py shell < benchmarks/token_refresh.py
+
+    BENCH_REFRESHES=2000
+
+RefreshTokenView is called BENCH_REFRESHES times with the same refresh
+cookie, once dropping the cached user before every call (what each
+refresh used to cost: a user query plus serialization) and once with
+the cache warm. Everything is rolled back at the end.
+"""
+
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.cache import forget_users, remember_user
+from accounts.models import Company, Department, User
+from accounts.views import RefreshTokenView
+
+REFRESHES = int(os.getenv("BENCH_REFRESHES", "2000"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def run(user, refresh, warm):
+    view = RefreshTokenView.as_view()
+    factory = APIRequestFactory()
+    queries = 0
+
+    began = time.perf_counter()
+    for _ in range(REFRESHES):
+        if not warm:
+            forget_users(user.pk)
+        request = factory.post("/api/accounts/refresh-token/")
+        request.COOKIES["refresh"] = refresh
+        with CaptureQueriesContext(connection) as captured:
+            response = view(request)
+        assert response.status_code == 200, response.data
+        queries += len(captured)
+    elapsed = time.perf_counter() - began
+
+    return REFRESHES / elapsed, elapsed * 1000 / REFRESHES, queries / REFRESHES
+
+
+print(f"🔄 {REFRESHES} token refreshes")
+
+try:
+    with transaction.atomic():
+        company = Company.objects.create(name="Bench Co", location="Bench")
+        user = User.objects.create(
+            email="bench-tech@bench.local", password=make_password(None),
+            role="technician", company=company,
+            department=Department.objects.create(name="Bench"),
+        )
+        refresh = str(RefreshToken.for_user(user))
+
+        cold = run(user, refresh, warm=False)
+        remember_user(user)
+        warm = run(user, refresh, warm=True)
+
+        print("--------------------------------------------------")
+        for label, (rate, ms, queries) in (("Database", cold), ("User cache", warm)):
+            print(f"{label:<12} {rate:8.0f} req/s   {ms:6.3f} ms   {queries:.0f} queries/refresh")
+        print(f"Speedup:     {warm[0] / cold[0]:.1f}x")
+        print("--------------------------------------------------")
+
+        forget_users(user.pk)
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
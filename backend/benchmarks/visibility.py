@@ -0,0 +1,177 @@
+"""
+Technician visibility query: old M2M join vs. the membership lookup in
+maintenance.services.visible_maintenance_requests, as team size and
+request count grow.
+
+    python manage.py shell < benchmarks/visibility.py
+
+    BENCH_TEAM_SIZES=5,50,500  BENCH_REQUEST_COUNTS=100000,1000000
+
+For every team size, requests are inserted up to each count and the
+first list page (what the cursor-paginated endpoint runs) and a count
+of the whole visible set are timed for both queries, along with how
+many rows each returns. Everything is rolled back at the end.
+"""
+
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import Company, Department, User
+from core.models import Equipment, EquipmentCategory, MaintenanceTeam, WorkCenter
+from maintenance.models import MaintenanceRequest
+from maintenance.services import visible_maintenance_requests
+
+TEAM_SIZES = [int(n) for n in os.getenv("BENCH_TEAM_SIZES", "5,50,500").split(",")]
+REQUEST_COUNTS = [
+    int(n) for n in os.getenv("BENCH_REQUEST_COUNTS", "100000,1000000").split(",")
+]
+OTHER_TEAMS = int(os.getenv("BENCH_OTHER_TEAMS", "20"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "5"))
+PAGE = 51
+
+
+class Rollback(Exception):
+    pass
+
+
+def fixtures():
+    company = Company.objects.create(name="Bench Co", location="Bench")
+    department = Department.objects.create(name="Bench")
+    creator = User.objects.create(
+        email="bench-user@bench.local", password=make_password(None),
+        role="user", company=company, department=department,
+    )
+    category = EquipmentCategory.objects.create(name="Bench")
+    equipment = Equipment.objects.create(
+        name="Bench Press", serial_number="BENCH-0001",
+        company=company, category=category,
+    )
+    work_center = WorkCenter.objects.create(
+        name="Bench Line", code="BENCH-0", company=company,
+        cost_per_hour=100, time_efficiency=90, oee_target=85,
+    )
+    teams = [
+        MaintenanceTeam.objects.create(name=f"Bench Team {i}", company=company)
+        for i in range(OTHER_TEAMS + 1)
+    ]
+    return company, creator, equipment, work_center, teams
+
+
+def add_technicians(company, team, count, offset):
+    password = make_password(None)
+    technicians = User.objects.bulk_create(
+        User(
+            email=f"bench-tech-{offset + i}@bench.local",
+            password=password,
+            role="technician",
+            company=company,
+        )
+        for i in range(count)
+    )
+    team.members.add(*technicians)
+    return technicians
+
+
+def insert_requests(count, company, creator, equipment, work_center, teams, technicians):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO maintenance_maintenancerequest (
+                title, description, maintenance_type, priority, status,
+                equipment_id, work_center_id, company_id, created_by_id,
+                assigned_team_id, assigned_technician_id,
+                created_at, updated_at
+            )
+            SELECT
+                'Bench #' || g, '', 'corrective', 'medium', 'scheduled',
+                %(equipment)s, %(work_center)s, %(company)s, %(creator)s,
+                (%(teams)s::bigint[])[1 + g %% %(team_count)s],
+                (%(technicians)s::bigint[])[1 + g %% %(tech_count)s],
+                now() - g * interval '1 second', now()
+            FROM generate_series(1, %(rows)s) AS g
+            """,
+            {
+                "equipment": equipment.id,
+                "work_center": work_center.id,
+                "company": company.id,
+                "creator": creator.id,
+                "teams": [team.id for team in teams],
+                "team_count": len(teams),
+                "technicians": [tech.id for tech in technicians],
+                "tech_count": len(technicians),
+                "rows": count,
+            },
+        )
+        cursor.execute("ANALYZE maintenance_maintenancerequest")
+
+
+def old_queryset(user):
+    return MaintenanceRequest.objects.filter(
+        Q(assigned_technician=user) | Q(assigned_team__members=user)
+    )
+
+
+def median_ms(run):
+    timings = []
+    for _ in range(REPEAT):
+        began = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - began) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def timed(build):
+    """
+    Median time of the first page and of counting the whole visible
+    set, plus that count (duplicates included).
+    """
+    page_ms = median_ms(
+        lambda: list(build().order_by("-created_at", "-id")[:PAGE])
+    )
+    count_ms = median_ms(lambda: build().count())
+    return page_ms, count_ms, build().count()
+
+
+print("🛠️ Technician visibility benchmark")
+print(
+    f"{'members':>8}{'requests':>11}"
+    f"{'page old':>10}{'page new':>10}{'count old':>11}{'count new':>11}"
+    f"{'rows old':>10}{'rows new':>10}"
+)
+
+try:
+    with transaction.atomic():
+        company, creator, equipment, work_center, teams = fixtures()
+        offset = 0
+
+        for team_size in TEAM_SIZES:
+            with transaction.atomic():
+                technicians = add_technicians(company, teams[0], team_size, offset)
+                offset += team_size
+                user = technicians[0]
+
+                inserted = 0
+                for target in REQUEST_COUNTS:
+                    insert_requests(
+                        target - inserted, company, creator, equipment,
+                        work_center, teams, technicians,
+                    )
+                    inserted = target
+
+                    old = timed(lambda: old_queryset(user))
+                    new = timed(lambda: visible_maintenance_requests(user))
+                    print(
+                        f"{team_size:>8}{target:>11,}"
+                        f"{old[0]:>10.2f}{new[0]:>10.2f}{old[1]:>11.2f}{new[1]:>11.2f}"
+                        f"{old[2]:>10,}{new[2]:>10,}"
+                    )
+
+                transaction.set_rollback(True)
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
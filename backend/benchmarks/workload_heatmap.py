@@ -0,0 +1,144 @@
+"""
+Latency of the team workload heatmap for a large team.
+
+    python manage.py shell < benchmarks/workload_heatmap.py
+
+    BENCH_TECHNICIANS=500  BENCH_DAYS=28  BENCH_BOOKINGS_PER_TECH=40
+
+Every technician gets non-overlapping bookings spread over the window.
+The query, the rasterization and both encodings are timed separately
+(median of BENCH_REPEAT runs). Everything is rolled back at the end.
+"""
+
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import Company, Department, User
+from core.models import Equipment, EquipmentCategory, MaintenanceTeam, WorkCenter
+from maintenance.heatmap import encode_base64, encode_rle, team_heatmap, to_percent
+
+TECHNICIANS = int(os.getenv("BENCH_TECHNICIANS", "500"))
+DAYS = int(os.getenv("BENCH_DAYS", "28"))
+BOOKINGS_PER_TECH = int(os.getenv("BENCH_BOOKINGS_PER_TECH", "40"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "7"))
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(start):
+    company = Company.objects.create(name="Bench Co", location="Bench")
+    department = Department.objects.create(name="Bench")
+    password = make_password(None)
+    creator = User.objects.create(
+        email="bench-user@bench.local", password=password, role="user",
+        company=company, department=department,
+    )
+    technicians = User.objects.bulk_create(
+        User(
+            email=f"bench-tech-{i}@bench.local",
+            password=password,
+            role="technician",
+            company=company,
+        )
+        for i in range(TECHNICIANS)
+    )
+    team = MaintenanceTeam.objects.create(name="Bench Team", company=company)
+    team.members.add(*technicians)
+    category = EquipmentCategory.objects.create(name="Bench")
+    equipment = Equipment.objects.create(
+        name="Bench Press", serial_number="BENCH-0001",
+        company=company, category=category,
+    )
+    work_center = WorkCenter.objects.create(
+        name="Bench Line", code="BENCH-0", company=company, capacity=TECHNICIANS,
+        cost_per_hour=100, time_efficiency=90, oee_target=85,
+    )
+
+    # Slot n of a technician starts n * (window / bookings) into the
+    # window, plus a per-technician shift, and lasts 1 to 8 hours
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO maintenance_maintenancerequest (
+                title, description, maintenance_type, priority, status,
+                equipment_id, work_center_id, company_id, created_by_id,
+                assigned_team_id, assigned_technician_id,
+                scheduled_start, duration_hours, scheduled_end,
+                created_at, updated_at
+            )
+            SELECT
+                'Bench #' || t.id || '-' || n, '', 'corrective', 'medium', 'scheduled',
+                %(equipment)s, %(work_center)s, %(company)s, %(creator)s,
+                %(team)s, t.id, slot.start, slot.hours,
+                slot.start + slot.hours * interval '1 hour', now(), now()
+            FROM unnest(%(technicians)s::bigint[]) AS t(id),
+                generate_series(0, %(bookings)s - 1) AS n,
+                LATERAL (
+                    SELECT
+                        %(start)s::timestamptz
+                            + n * (%(days)s * interval '1 day' / %(bookings)s)
+                            + (t.id %% 7) * interval '1 hour' AS start,
+                        1 + (t.id + n) %% 8 AS hours
+                ) AS slot
+            """,
+            {
+                "equipment": equipment.id,
+                "work_center": work_center.id,
+                "company": company.id,
+                "creator": creator.id,
+                "team": team.id,
+                "technicians": [tech.id for tech in technicians],
+                "bookings": BOOKINGS_PER_TECH,
+                "start": start,
+                "days": DAYS,
+            },
+        )
+        cursor.execute("ANALYZE maintenance_maintenancerequest")
+
+    return team
+
+
+def median_ms(run):
+    timings = []
+    result = None
+    for _ in range(REPEAT):
+        began = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - began) * 1000)
+    return sorted(timings)[len(timings) // 2], result
+
+
+start = timezone.now().replace(minute=0, second=0, microsecond=0)
+buckets = DAYS * 24
+
+print(f"🛠️ Heatmap of {TECHNICIANS} technicians x {buckets} hourly buckets")
+
+try:
+    with transaction.atomic():
+        team = seed(start)
+
+        total, (members, utilization) = median_ms(
+            lambda: team_heatmap(team, start, 60, buckets)
+        )
+        percent = to_percent(utilization)
+        base64_ms, matrix = median_ms(lambda: encode_base64(to_percent(utilization)))
+        rle_ms, runs = median_ms(lambda: encode_rle(to_percent(utilization)))
+
+        print("--------------------------------------------------")
+        print(f"Bookings:           {TECHNICIANS * BOOKINGS_PER_TECH:,}")
+        print(f"Matrix:             {percent.shape[0]} x {percent.shape[1]}")
+        print(f"Mean utilization:   {utilization.mean() * 100:.1f}%")
+        print(f"Query + raster:     {total:.1f} ms")
+        print(f"base64 encoding:    {base64_ms:.1f} ms ({len(matrix) / 1024:.0f} KiB)")
+        print(f"RLE encoding:       {rle_ms:.1f} ms ({len(runs['values']):,} runs)")
+        print("--------------------------------------------------")
+
+        raise Rollback
+except Rollback:
+    print("🧹 Rolled back benchmark data")
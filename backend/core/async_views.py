@@ -0,0 +1,194 @@
+"""
+Async counterparts of the read-heavy endpoints, served when
+ASYNC_READ_VIEWS is on (under an ASGI server).
+
+DRF views are sync only, so these are plain Django async views with the
+pieces of APIView they need: JWT authentication through the async
+cache and ORM, DRF's Request for query params, JSON rendering and DRF's
+error payloads. Payloads are the same as the sync views'.
+
+Django's async ORM still runs each query through ``sync_to_async`` in a
+per-request thread; what the event loop saves is a thread held per
+in-flight request around the queries (authentication, cache lookups
+and rendering run on the loop).
+"""
+
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from accounts.authentication import CachedJWTAuthentication
+from .cache import (
+    aresource_version,
+    etag_matches,
+    select_cache,
+    select_entry,
+    select_key,
+)
+from .models import Company, Department, WorkCenter
+from .serializers import (
+    EQUIPMENT_SELECT_FIELDS,
+    CompanySerializer,
+    DepartmentSerializer,
+    MaintenanceWorkCenterSelectSerializer,
+    equipment_select_row,
+)
+from .services import user_equipment
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data) if data is not None else b"",
+        status=status_code,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+class AsyncAPIView(View):
+    """
+    Async view with APIView's authentication and error handling.
+
+    Handlers take DRF's Request and return an HttpResponse. Methods
+    without an async handler go to ``sync_view`` when one is given, so
+    one route can pair an async read with the sync DRF writes.
+    """
+
+    authentication_required = True
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Bearer tokens, not cookies, as with every DRF view
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = None
+        if method in self.http_method_names and method != "options":
+            handler = getattr(self, method, None)
+
+        if handler is None:
+            if self.sync_view is not None:
+                return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+            if method == "options":
+                return await self.options(request, *args, **kwargs)
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        request = Request(request)
+        try:
+            await self.authenticate(request)
+            return await handler(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(exc)
+
+    async def authenticate(self, request):
+        authenticator = CachedJWTAuthentication()
+        result = await authenticator.aauthenticate(request)
+
+        if result is None:
+            if self.authentication_required:
+                raise NotAuthenticated()
+            request.user, request.auth = AnonymousUser(), None
+            return
+
+        request.user, request.auth = result
+
+    def handle_exception(self, exc):
+        data = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+        headers = None
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            headers = {
+                "WWW-Authenticate": CachedJWTAuthentication().authenticate_header(None)
+            }
+        return json_response(data, exc.status_code, headers)
+
+
+class AsyncCachedSelectMixin(ABC):
+    """
+    CachedSelectMixin for async views, sharing its cache entries.
+    """
+
+    cache_resource = None
+
+    def get_cache_scope(self, request):
+        return "all"
+
+    @abstractmethod
+    async def get_select_data(self, request):
+        pass
+
+    async def get(self, request):
+        cache = select_cache()
+        key = select_key(
+            self.cache_resource,
+            await aresource_version(self.cache_resource),
+            self.get_cache_scope(request),
+        )
+
+        entry = await cache.aget(key)
+        if entry is None:
+            entry = select_entry(await self.get_select_data(request))
+            await cache.aset(key, entry, settings.SELECT_CACHE_TIMEOUT)
+
+        data, etag = entry
+        headers = {"ETag": etag}
+
+        if etag_matches(request, etag):
+            return json_response(None, status.HTTP_304_NOT_MODIFIED, headers)
+
+        return json_response(data, headers=headers)
+
+
+class AsyncEquipmentSelectView(AsyncCachedSelectMixin, AsyncAPIView):
+    cache_resource = "equipment"
+
+    def get_cache_scope(self, request):
+        user = request.user
+        return f"user:{user.id}:department:{user.department_id}"
+
+    async def get_select_data(self, request):
+        rows = user_equipment(request.user).values(*EQUIPMENT_SELECT_FIELDS)
+        return [equipment_select_row(row) async for row in rows]
+
+
+class AsyncWorkCenterSelectView(AsyncCachedSelectMixin, AsyncAPIView):
+    cache_resource = "work_centers"
+
+    def get_cache_scope(self, request):
+        return f"company:{request.user.company_id}"
+
+    async def get_select_data(self, request):
+        queryset = WorkCenter.objects.filter(
+            company_id=request.user.company_id
+        ).select_related("company")
+
+        work_centers = [work_center async for work_center in queryset]
+        return MaintenanceWorkCenterSelectSerializer(work_centers, many=True).data
+
+
+class AsyncCompanySelectView(AsyncCachedSelectMixin, AsyncAPIView):
+    authentication_required = False
+    cache_resource = "companies"
+
+    async def get_select_data(self, request):
+        companies = [company async for company in Company.objects.all()]
+        return CompanySerializer(companies, many=True).data
+
+
+class AsyncDepartmentSelectView(AsyncCachedSelectMixin, AsyncAPIView):
+    authentication_required = False
+    cache_resource = "departments"
+
+    async def get_select_data(self, request):
+        departments = [department async for department in Department.objects.all()]
+        return DepartmentSerializer(departments, many=True).data
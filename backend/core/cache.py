@@ -0,0 +1,105 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+def select_cache():
+    return caches[settings.SELECT_CACHE_ALIAS]
+
+
+def _version_key(resource):
+    return f"select:{resource}:version"
+
+
+def resource_version(resource):
+    cache = select_cache()
+    version = cache.get(_version_key(resource))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_version_key(resource), version, None)
+    return version
+
+
+async def aresource_version(resource):
+    cache = select_cache()
+    version = await cache.aget(_version_key(resource))
+    if version is None:
+        version = time.time_ns()
+        await cache.aset(_version_key(resource), version, None)
+    return version
+
+
+def invalidate(*resources):
+    """
+    Retire every cached payload of ``resources``. Entries are keyed by
+    version, so bumping it orphans them for all tenants at once; they
+    expire on their own.
+    """
+    cache = select_cache()
+    version = time.time_ns()
+    cache.set_many({_version_key(resource): version for resource in resources}, None)
+
+
+def select_key(resource, version, scope):
+    return f"select:{resource}:{version}:{scope}"
+
+
+def select_entry(data):
+    """
+    (data, strong ETag) as cached for a select payload.
+    """
+    body = JSONRenderer().render(data)
+    return data, '"%s"' % hashlib.sha256(body).hexdigest()
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return "*" in etags or etag in etags
+
+
+class CachedSelectMixin(ABC):
+    """
+    Caches the payload of a select endpoint per tenant scope and serves
+    a strong ETag, so clients can revalidate with If-None-Match and get
+    a 304 without the payload being rebuilt or resent.
+    """
+
+    cache_resource = None
+
+    def get_cache_scope(self, request):
+        return "all"
+
+    @abstractmethod
+    def get_select_data(self, request):
+        pass
+
+    def get(self, request):
+        cache = select_cache()
+        key = select_key(
+            self.cache_resource,
+            resource_version(self.cache_resource),
+            self.get_cache_scope(request),
+        )
+
+        entry = cache.get(key)
+        if entry is None:
+            entry = select_entry(self.get_select_data(request))
+            cache.set(key, entry, settings.SELECT_CACHE_TIMEOUT)
+
+        data, etag = entry
+        headers = {"ETag": etag}
+
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(data, headers=headers)
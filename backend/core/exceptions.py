@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.views import exception_handler as drf_exception_handler
+from rest_framework.views import set_rollback
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Conflicts with an existing booking."
+    default_code = "conflict"
+
+
+def violated_exclusion(exc):
+    """
+    The model ExclusionConstraint behind a database IntegrityError, if any.
+    """
+    name = getattr(getattr(exc.__cause__, "diag", None), "constraint_name", None)
+    if not name:
+        return None
+
+    for model in apps.get_models():
+        for constraint in model._meta.constraints:
+            if constraint.name == name and isinstance(constraint, ExclusionConstraint):
+                return constraint
+    return None
+
+
+def exception_handler(exc, context):
+    """
+    DRF's handler, plus 409 responses for booking conflicts: raised as
+    Conflict, or enforced by the database through an exclusion constraint.
+    """
+    if isinstance(exc, IntegrityError):
+        constraint = violated_exclusion(exc)
+        if constraint is not None:
+            exc = Conflict(
+                constraint.get_violation_error_message(),
+                constraint.violation_error_code,
+            )
+
+    if isinstance(exc, Conflict):
+        set_rollback()
+        return Response(
+            {"error": exc.detail, "code": exc.detail.code},
+            status=exc.status_code,
+        )
+
+    return drf_exception_handler(exc, context)
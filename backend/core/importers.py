@@ -0,0 +1,229 @@
+"""
+Chunked CSV upserts of equipment and work centers.
+
+Rows are parsed straight off the stream ``chunk_size`` at a time,
+validated with the model fields' own ``clean``, and written with one
+``bulk_create(update_conflicts=True)`` per chunk keyed on the natural
+key (``serial_number`` / ``code``). References are given by name (or
+email for employees) and resolved through lookup dicts: small tables
+are loaded once, users per chunk. Only the current chunk and the first
+``MAX_REPORTED_ERRORS`` errors are held, so memory does not grow with
+the file.
+"""
+
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, reset_queries, transaction
+
+from accounts.models import Company, Department, User
+from .cache import invalidate
+from .models import Equipment, EquipmentCategory, WorkCenter
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class CsvImporter:
+    """
+    Subclasses declare the model, its natural key, the plain columns
+    (named after model fields) and the reference columns as
+    ``column: (model, lookup field, loaded per chunk)``.
+    """
+
+    model = None
+    unique_field = None
+    columns = []
+    references = {}
+    cache_resources = []
+
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+        self.fields = {
+            column: self.model._meta.get_field(column)
+            for column in [*self.columns, *self.references]
+        }
+        self.lookups = {
+            column: self.load_lookup(column)
+            for column, (_, _, per_chunk) in self.references.items()
+            if not per_chunk
+        }
+
+    @property
+    def required_columns(self):
+        return [
+            column for column, field in self.fields.items()
+            if not field.null and not field.has_default() and not field.blank
+        ]
+
+    def load_lookup(self, column, values=None):
+        model, key, _ = self.references[column]
+        queryset = model.objects.all()
+        if values is not None:
+            queryset = queryset.filter(**{f"{key}__in": values})
+
+        # Lowest id wins on duplicate names
+        return dict(queryset.order_by("-id").values_list(key, "id"))
+
+    def read_header(self, lines):
+        """
+        csv.DictReader over ``lines`` once the header has every required
+        column; raises ValueError otherwise.
+        """
+        reader = csv.DictReader(lines)
+        header = reader.fieldnames or []
+        missing = [column for column in self.required_columns if column not in header]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        return reader
+
+    def parse(self, raw, lookups):
+        values, errors = {}, {}
+
+        for column in self.columns:
+            field = self.fields[column]
+            value = (raw.get(column) or "").strip()
+            if value == "" and field.has_default():
+                values[column] = field.get_default()
+                continue
+            if value == "" and not isinstance(field, models.CharField):
+                value = None
+            try:
+                values[column] = field.clean(value, None)
+            except ValidationError as exc:
+                errors[column] = exc.messages
+
+        for column in self.references:
+            name = (raw.get(column) or "").strip()
+            if not name:
+                if not self.fields[column].null:
+                    errors[column] = ["This field is required."]
+                values[f"{column}_id"] = None
+                continue
+
+            pk = lookups[column].get(name)
+            if pk is None:
+                errors[column] = [f'Unknown {column} "{name}".']
+            values[f"{column}_id"] = pk
+
+        return values, errors
+
+    def write(self, objects, update_fields):
+        """
+        Upsert one chunk; returns how many rows were new.
+        """
+        keys = [getattr(obj, self.unique_field) for obj in objects]
+        existing = self.model.objects.filter(
+            **{f"{self.unique_field}__in": keys}
+        ).count()
+
+        with transaction.atomic():
+            self.model.objects.bulk_create(
+                objects,
+                update_conflicts=True,
+                unique_fields=[self.unique_field],
+                update_fields=update_fields,
+            )
+
+        # bulk_create sends no post_save, so the select caches are
+        # retired here
+        invalidate(*self.cache_resources)
+        return len(objects) - existing
+
+    def run(self, reader):
+        """
+        Import every row of ``reader``, yielding running totals after
+        each chunk and a final report with ``done`` and the errors, plus
+        ``error`` when the file or the database failed part way.
+        """
+        totals = {"rows": 0, "created": 0, "updated": 0, "failed": 0}
+        errors = []
+
+        # Existing rows only take the columns the file actually has
+        update_fields = [
+            column for column in self.fields
+            if column in reader.fieldnames and column != self.unique_field
+        ]
+        rows = enumerate(reader, start=1)
+
+        # The response is already streaming when a chunk fails, so the
+        # failure becomes the final line; earlier chunks stay committed
+        try:
+            while chunk := list(islice(rows, self.chunk_size)):
+                lookups = dict(self.lookups)
+                for column, (_, _, per_chunk) in self.references.items():
+                    if per_chunk:
+                        lookups[column] = self.load_lookup(
+                            column, {(raw.get(column) or "").strip() for _, raw in chunk}
+                        )
+
+                # Later rows win when a key repeats inside the chunk
+                objects = {}
+                for number, raw in chunk:
+                    values, row_errors = self.parse(raw, lookups)
+                    if row_errors:
+                        totals["failed"] += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors.append({"row": number, "errors": row_errors})
+                        continue
+                    objects[values[self.unique_field]] = self.model(**values)
+
+                if objects:
+                    created = self.write(list(objects.values()), update_fields)
+                    totals["created"] += created
+                    totals["updated"] += len(objects) - created
+
+                totals["rows"] += len(chunk)
+                # Under DEBUG every INSERT would stay in the query log
+                reset_queries()
+                yield dict(totals)
+        except (UnicodeDecodeError, csv.Error, DatabaseError) as exc:
+            yield {**totals, "done": True, "errors": errors, "error": str(exc)}
+            return
+
+        yield {**totals, "done": True, "errors": errors}
+
+
+class EquipmentImporter(CsvImporter):
+    model = Equipment
+    unique_field = "serial_number"
+    columns = [
+        "serial_number",
+        "name",
+        "purchase_date",
+        "warranty_expiration",
+        "last_maintenance_service_date",
+        "maintenance_interval_days",
+    ]
+    references = {
+        "company": (Company, "name", False),
+        "category": (EquipmentCategory, "name", False),
+        "department": (Department, "name", False),
+        "employee": (User, "email", True),
+    }
+    cache_resources = ["equipment"]
+
+
+class WorkCenterImporter(CsvImporter):
+    model = WorkCenter
+    unique_field = "code"
+    columns = [
+        "code",
+        "name",
+        "tag",
+        "cost_per_hour",
+        "capacity",
+        "time_efficiency",
+        "oee_target",
+    ]
+    references = {
+        "company": (Company, "name", False),
+    }
+    cache_resources = ["work_centers"]
+
+
+IMPORTERS = {
+    "equipment": EquipmentImporter,
+    "work_centers": WorkCenterImporter,
+}
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import IMPORTERS
+
+
+class Command(BaseCommand):
+    help = "Upsert equipment or work centers from a CSV file, chunk by chunk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        importer = IMPORTERS[options["kind"]](chunk_size=options["chunk_size"])
+
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+                reader = importer.read_header(lines)
+
+                for progress in importer.run(reader):
+                    if progress.get("done"):
+                        break
+                    self.stdout.write(
+                        f"{progress['rows']} rows: {progress['created']} created, "
+                        f"{progress['updated']} updated, {progress['failed']} failed"
+                    )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in progress["errors"]:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+
+        if "error" in progress:
+            raise CommandError(
+                f"Stopped after {progress['rows']} rows "
+                f"({progress['created']} created, {progress['updated']} updated): "
+                f"{progress['error']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {progress['rows']} rows: {progress['created']} created, "
+            f"{progress['updated']} updated, {progress['failed']} failed"
+        ))
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 22:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0003_maintenanceteam'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('maintenance_interval_days__gt', 0)), fields=['last_maintenance_service_date'], name='equipment_pm_due_idx'),
+        ),
+    ]
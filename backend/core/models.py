@@ -78,6 +78,16 @@ class Equipment(models.Model):
         related_name="equipment"
     )
 
+    class Meta:
+        indexes = [
+            # Preventive generation: due-date scan over scheduled assets only
+            models.Index(
+                fields=["last_maintenance_service_date"],
+                condition=models.Q(maintenance_interval_days__gt=0),
+                name="equipment_pm_due_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key.
+
+    The cursor stores the last seen position instead of an offset, so
+    every page is an index range scan and rows inserted while a client
+    is paging never shift or duplicate entries.
+    """
+
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class CreatedAtCursorPagination(IdCursorPagination):
+    """
+    Newest first on (created_at, id); id breaks created_at ties.
+    """
+
+    ordering = ("-created_at", "-id")
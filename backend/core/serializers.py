@@ -215,6 +215,89 @@ class EquipmentViewSerializer(serializers.ModelSerializer):
         return None
 
 
+# -----------------------------
+# FLAT EQUIPMENT ROWS
+# -----------------------------
+# Read path for the equipment lists: one .values() query joins every
+# related column, and each row is reshaped into exactly the payload
+# EquipmentViewSerializer / MaintenanceEquipmentSelectSerializer would
+# render, without building model instances or per-field method calls.
+
+EQUIPMENT_SELECT_FIELDS = [
+    "id",
+    "name",
+    "serial_number",
+    "company_id",
+    "company__name",
+    "category_id",
+    "category__name",
+]
+
+EQUIPMENT_VIEW_FIELDS = EQUIPMENT_SELECT_FIELDS + [
+    "purchase_date",
+    "warranty_expiration",
+    "last_maintenance_service_date",
+    "maintenance_interval_days",
+    "company__location",
+    "employee_id",
+    "employee__email",
+    "employee__role",
+    "department_id",
+    "department__name",
+]
+
+
+def _iso_date(value):
+    # Same output as serializers.DateField
+    return value.isoformat() if value else None
+
+
+def equipment_view_row(row):
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "serial_number": row["serial_number"],
+        "purchase_date": _iso_date(row["purchase_date"]),
+        "warranty_expiration": _iso_date(row["warranty_expiration"]),
+        "last_maintenance_service_date": _iso_date(row["last_maintenance_service_date"]),
+        "maintenance_interval_days": row["maintenance_interval_days"],
+        "company": {
+            "id": row["company_id"],
+            "name": row["company__name"],
+            "location": row["company__location"],
+        },
+        "category": {
+            "id": row["category_id"],
+            "name": row["category__name"],
+        },
+        "employee": {
+            "id": row["employee_id"],
+            "email": row["employee__email"],
+            "role": row["employee__role"],
+        } if row["employee_id"] else None,
+        "department": {
+            "id": row["department_id"],
+            "name": row["department__name"],
+        } if row["department_id"] else None,
+    }
+
+
+def equipment_select_row(row):
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "serial_number": row["serial_number"],
+        "company": {
+            "id": row["company_id"],
+            "name": row["company__name"],
+        },
+        "category": {
+            "id": row["category_id"],
+            "name": row["category__name"],
+        },
+    }
+
+
 class TechnicianSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -0,0 +1,20 @@
+from django.db.models import Q
+
+from .models import Equipment
+
+
+def user_equipment(user, queryset=None):
+    """
+    Equipment owned by the user or kept by their department.
+
+    Both conditions are columns of Equipment itself, so the OR never
+    fans rows out and needs no DISTINCT, which used to force a sort
+    over every selected column.
+    """
+    if queryset is None:
+        queryset = Equipment.objects.all()
+
+    visible = Q(employee_id=user.id)
+    if user.department_id is not None:
+        visible |= Q(department_id=user.department_id)
+    return queryset.filter(visible)
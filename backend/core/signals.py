@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+
+from accounts.models import Company, Department
+from .cache import invalidate
+from .models import Equipment, EquipmentCategory, WorkCenter
+
+
+# Select payloads that embed fields of each model
+SELECT_RESOURCES = {
+    Company: ["companies", "work_centers", "equipment"],
+    Department: ["departments"],
+    WorkCenter: ["work_centers"],
+    Equipment: ["equipment"],
+    EquipmentCategory: ["equipment"],
+}
+
+
+def invalidate_select_cache(sender, **kwargs):
+    invalidate(*SELECT_RESOURCES[sender])
+
+
+def connect():
+    for model in SELECT_RESOURCES:
+        post_save.connect(
+            invalidate_select_cache, sender=model, dispatch_uid=f"select-save-{model.__name__}"
+        )
+        post_delete.connect(
+            invalidate_select_cache, sender=model, dispatch_uid=f"select-delete-{model.__name__}"
+        )
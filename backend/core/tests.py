@@ -1,3 +1,9 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
 
@@ -9,6 +15,10 @@ from core.models import (
     Equipment,
     WorkCenter,
 )
+from core.serializers import (
+    EquipmentViewSerializer,
+    MaintenanceEquipmentSelectSerializer,
+)
 
 
 class CoreViewsTestCase(APITestCase):
@@ -102,13 +112,36 @@ class CoreViewsTestCase(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get("/api/core/equipment-categories/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Small lookup lists stay unpaginated, as the web frontend reads them
+        self.assertIsInstance(response.data, list)
 
 
     def test_equipment_visibility_for_user(self):
         self.client.force_authenticate(user=self.user)
         response = self.client.get("/api/core/equipment/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_equipment_hidden_from_user_without_department(self):
+        Equipment.objects.create(
+            name="Unassigned Lathe",
+            serial_number="LATHE-01",
+            company=self.company1,
+            category=self.category,
+        )
+        loner = User.objects.create_user(
+            email="loner@test.com",
+            password="loner123",
+            role="user",
+            company=self.company1
+        )
+
+        self.client.force_authenticate(user=loner)
+        response = self.client.get("/api/core/equipment/")
+        self.assertEqual(response.data["results"], [])
+
+        response = self.client.get("/api/core/equipment/select/")
+        self.assertEqual(response.data, [])
 
     def test_equipment_admin_sees_all(self):
         self.client.force_authenticate(user=self.admin)
@@ -126,7 +159,7 @@ class CoreViewsTestCase(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get("/api/core/work-centers/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
 
     def test_equipment_select(self):
@@ -137,4 +170,316 @@ class CoreViewsTestCase(APITestCase):
     def test_work_center_select(self):
         self.client.force_authenticate(user=self.user)
         response = self.client.get("/api/core/work-centers/select/")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def _add_equipment(self, count):
+        Equipment.objects.bulk_create(
+            Equipment(
+                name=f"Pump #{i}",
+                serial_number=f"PMP-{i}",
+                company=self.company1,
+                category=self.category,
+                department=self.department1,
+                purchase_date=date(2024, 1, 1 + i),
+            )
+            for i in range(count)
+        )
+
+    def test_flat_equipment_payload_is_byte_identical(self):
+        self._add_equipment(2)
+        self.equipment.purchase_date = date(2023, 5, 17)
+        self.equipment.save()
+
+        self.client.force_authenticate(user=self.admin)
+        queryset = Equipment.objects.order_by("-id")
+        render = JSONRenderer().render
+
+        response = self.client.get("/api/core/equipment/")
+        self.assertEqual(
+            render(response.data["results"]),
+            render(EquipmentViewSerializer(queryset, many=True).data),
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get("/api/core/equipment/select/")
+        expected = MaintenanceEquipmentSelectSerializer(
+            queryset.filter(department=self.department1), many=True
+        ).data
+        self.assertEqual(
+            sorted(render(row) for row in response.data),
+            sorted(render(row) for row in expected),
+        )
+
+    def test_equipment_lists_use_constant_queries(self):
+        self.client.force_authenticate(user=self.user)
+
+        counts = []
+        for extra in (0, 10):
+            self._add_equipment(extra)
+            for url in ("/api/core/equipment/", "/api/core/equipment/select/"):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                counts.append(len(queries))
+
+        self.assertEqual(counts[:2], counts[2:])
+
+    def test_select_serves_etag_and_revalidates(self):
+        self.client.force_authenticate(user=self.user)
+        url = "/api/core/work-centers/select/"
+
+        first = self.client.get(url)
+        etag = first["ETag"]
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 0)
+
+        # Saving a work center retires the cached payload
+        WorkCenter.objects.create(
+            name="Assembly Line B",
+            code="ASM-B",
+            company=self.company1,
+            cost_per_hour=300,
+            capacity=1,
+            time_efficiency=80,
+            oee_target=90
+        )
+        fresh = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(fresh["ETag"], etag)
+        self.assertEqual(len(fresh.data), 2)
+
+    def test_select_cache_is_scoped_per_company(self):
+        other = User.objects.create_user(
+            email="other@test.com",
+            password="other123",
+            role="user",
+            department=self.department1,
+            company=self.company2
+        )
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(len(self.client.get("/api/core/work-centers/select/").data), 1)
+
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get("/api/core/work-centers/select/").data, [])
+
+    def test_public_select_is_cached_until_changed(self):
+        self.client.get("/api/core/companies/select/")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/core/companies/select/")
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(len(response.data), 2)
+
+        self.company2.delete()
+        response = self.client.get("/api/core/companies/select/")
+        self.assertEqual(len(response.data), 1)
+
+    def _import(self, path, content):
+        import json
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(
+            path,
+            {"file": SimpleUploadedFile(
+                "import.csv",
+                content if isinstance(content, bytes) else content.encode(),
+            )},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_equipment_import_upserts_and_reports_errors(self):
+        from unittest import mock
+        from core import importers
+
+        content = (
+            "serial_number,name,company,category,department,employee,"
+            "maintenance_interval_days,last_maintenance_service_date\n"
+            "CNC-12-XYZ,CNC Machine #12 (rebuilt),GearGuard Industries,CNC Machines,"
+            "Production,user@test.com,90,2026-01-15\n"
+            "LATHE-1,Lathe,GearGuard R&D,CNC Machines,,,30,\n"
+            "LATHE-2,Lathe 2,Nowhere Inc,CNC Machines,,,30,\n"
+            "LATHE-3,Lathe 3,GearGuard R&D,CNC Machines,,,-5,not-a-date\n"
+        )
+        with mock.patch.object(importers, "IMPORT_CHUNK_SIZE", 2):
+            progress = self._import("/api/core/equipment/import/", content)
+
+        # Two chunks, then the final report
+        self.assertEqual([line["rows"] for line in progress], [2, 4, 4])
+        report = progress[-1]
+        self.assertTrue(report["done"])
+        self.assertEqual(
+            (report["created"], report["updated"], report["failed"]), (1, 1, 2)
+        )
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4])
+        self.assertIn("company", report["errors"][0]["errors"])
+        self.assertEqual(
+            set(report["errors"][1]["errors"]),
+            {"maintenance_interval_days", "last_maintenance_service_date"},
+        )
+
+        self.equipment.refresh_from_db()
+        self.assertEqual(self.equipment.name, "CNC Machine #12 (rebuilt)")
+        self.assertEqual(self.equipment.maintenance_interval_days, 90)
+        self.assertEqual(self.equipment.last_maintenance_service_date, date(2026, 1, 15))
+        lathe = Equipment.objects.get(serial_number="LATHE-1")
+        self.assertEqual(lathe.company, self.company2)
+        self.assertIsNone(lathe.employee)
+
+    def test_import_keeps_columns_missing_from_the_file(self):
+        progress = self._import(
+            "/api/core/work-centers/import/",
+            "code,name,company,cost_per_hour,time_efficiency,oee_target\n"
+            "ASM-A,Assembly Line A,GearGuard Industries,500,80,90\n"
+            "ASM-B,Assembly Line B,GearGuard Industries,300,95,90\n",
+        )
+        self.assertEqual(progress[-1]["created"], 1)
+
+        # capacity is not in the file: kept on update, defaulted on create
+        self.work_center.refresh_from_db()
+        self.assertEqual(self.work_center.capacity, 3)
+        self.assertEqual(self.work_center.cost_per_hour, 500)
+        self.assertEqual(WorkCenter.objects.get(code="ASM-B").capacity, 1)
+
+    def test_import_retires_cached_selects(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(len(self.client.get("/api/core/work-centers/select/").data), 1)
+
+        self._import(
+            "/api/core/work-centers/import/",
+            "code,name,company,cost_per_hour,time_efficiency,oee_target\n"
+            "ASM-B,Assembly Line B,GearGuard Industries,300,95,90\n",
+        )
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(len(self.client.get("/api/core/work-centers/select/").data), 2)
+
+    def test_import_reports_failures_after_streaming_started(self):
+        from unittest import mock
+        from django.db import DatabaseError
+        from core import importers
+
+        header = b"code,name,company,cost_per_hour,time_efficiency,oee_target\n"
+        content = (
+            header
+            + b"ASM-B,Assembly Line B,GearGuard Industries,300,95,90\n"
+            + b"ASM-C,Assembly \xff,GearGuard Industries,300,95,90\n"
+        )
+        with mock.patch.object(importers, "IMPORT_CHUNK_SIZE", 1):
+            progress = self._import("/api/core/work-centers/import/", content)
+
+        # The first chunk is kept, the undecodable one ends the stream
+        self.assertEqual(len(progress), 2)
+        self.assertTrue(progress[-1]["done"])
+        self.assertEqual(progress[-1]["created"], 1)
+        self.assertIn("utf-8", progress[-1]["error"])
+        self.assertTrue(WorkCenter.objects.filter(code="ASM-B").exists())
+
+        with mock.patch.object(
+            importers.CsvImporter, "write", side_effect=DatabaseError("disk full")
+        ):
+            progress = self._import(
+                "/api/core/work-centers/import/",
+                header + b"ASM-D,Assembly Line D,GearGuard Industries,300,95,90\n",
+            )
+        self.assertEqual(progress, [{
+            "rows": 0, "created": 0, "updated": 0, "failed": 0,
+            "done": True, "errors": [], "error": "disk full",
+        }])
+
+    def test_import_is_admin_only_and_checks_header(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        upload = SimpleUploadedFile("import.csv", b"code,name\nX,Y\n")
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/core/work-centers/import/", {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        upload.seek(0)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(
+            "/api/core/work-centers/import/", {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("company", response.data["error"])
+
+    def test_import_command(self):
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import CommandError, call_command
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(
+                "code,name,company,cost_per_hour,time_efficiency,oee_target,capacity\n"
+                "PNT-1,Paint Shop,GearGuard R&D,200,88,80,4\n"
+            )
+        self.addCleanup(os.unlink, handle.name)
+
+        out = StringIO()
+        call_command("import_csv", "work_centers", handle.name, stdout=out)
+
+        self.assertIn("1 created", out.getvalue())
+        self.assertEqual(WorkCenter.objects.get(code="PNT-1").capacity, 4)
+
+        with open(handle.name, "ab") as appended:
+            appended.write(b"PNT-\xff,Paint Shop 2,GearGuard R&D,200,88,80,4\n")
+        with self.assertRaisesMessage(CommandError, "can't decode"):
+            call_command("import_csv", "work_centers", handle.name, stdout=StringIO())
+
+    def test_async_selects_match_sync_and_share_the_cache(self):
+        import json
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from core.async_views import (
+            AsyncCompanySelectView,
+            AsyncDepartmentSelectView,
+            AsyncEquipmentSelectView,
+            AsyncWorkCenterSelectView,
+        )
+
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.force_authenticate(user=self.user)
+
+        def async_get(view, url, **headers):
+            request = AsyncRequestFactory().get(url, headers=headers)
+            return async_to_sync(view.as_view())(request)
+
+        for view, url in (
+            (AsyncEquipmentSelectView, "/api/core/equipment/select/"),
+            (AsyncWorkCenterSelectView, "/api/core/work-centers/select/"),
+            (AsyncCompanySelectView, "/api/core/companies/select/"),
+            (AsyncDepartmentSelectView, "/api/core/departments/select/"),
+        ):
+            for async_first in (True, False):
+                cache.clear()
+                if not async_first:
+                    expected = self.client.get(url)
+                response = async_get(view, url, Authorization=f"Bearer {token}")
+                if async_first:
+                    expected = self.client.get(url)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+                self.assertEqual(response["ETag"], expected["ETag"], url)
+                self.assertEqual(
+                    json.loads(response.content), json.loads(JSONRenderer().render(expected.data))
+                )
+
+            response = async_get(
+                view, url, **{"Authorization": f"Bearer {token}", "If-None-Match": expected["ETag"]}
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+
+        response = async_get(AsyncEquipmentSelectView, "/api/core/equipment/select/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
@@ -7,6 +8,8 @@ from .views import (
     EquipmentViewSet,
     WorkCenterViewSet,
     EquipmentSelectView,
+    EquipmentImportView,
+    WorkCenterImportView,
     WorkCenterSelectView,
     CompanySelectView,
     DepartmentSelectView,
@@ -84,25 +87,45 @@ maintenance_team_detail = MaintenanceTeamViewSet.as_view({
     "delete": "destroy",
 })
 
+equipment_select = EquipmentSelectView.as_view()
+work_center_select = WorkCenterSelectView.as_view()
+company_select = CompanySelectView.as_view()
+department_select = DepartmentSelectView.as_view()
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import (
+        AsyncCompanySelectView,
+        AsyncDepartmentSelectView,
+        AsyncEquipmentSelectView,
+        AsyncWorkCenterSelectView,
+    )
+
+    equipment_select = AsyncEquipmentSelectView.as_view()
+    work_center_select = AsyncWorkCenterSelectView.as_view()
+    company_select = AsyncCompanySelectView.as_view()
+    department_select = AsyncDepartmentSelectView.as_view()
+
 urlpatterns = [
     path("departments/", department_list, name="department-list"),
     path("departments/<int:pk>/", department_detail, name="department-detail"),
-    path("departments/select/", DepartmentSelectView.as_view(), name="department-select"),  # ✅ ADDED
+    path("departments/select/", department_select, name="department-select"),  # ✅ ADDED
 
     path("companies/", company_list, name="company-list"),
     path("companies/<int:pk>/", company_detail, name="company-detail"),
-    path("companies/select/", CompanySelectView.as_view(), name="company-select"),
+    path("companies/select/", company_select, name="company-select"),
 
     path("equipment-categories/", equipment_category_list, name="equipment-category-list"),
     path("equipment-categories/<int:pk>/", equipment_category_detail, name="equipment-category-detail"),
 
     path("equipment/", equipment_list, name="equipment-list"),
     path("equipment/<int:pk>/", equipment_detail, name="equipment-detail"),
-    path("equipment/select/", EquipmentSelectView.as_view(), name="equipment-select"),
+    path("equipment/select/", equipment_select, name="equipment-select"),
+    path("equipment/import/", EquipmentImportView.as_view(), name="equipment-import"),
 
     path("work-centers/", work_center_list, name="work-center-list"),
     path("work-centers/<int:pk>/", work_center_detail, name="work-center-detail"),
-    path("work-centers/select/", WorkCenterSelectView.as_view(), name="work-center-select"),
+    path("work-centers/select/", work_center_select, name="work-center-select"),
+    path("work-centers/import/", WorkCenterImportView.as_view(), name="work-center-import"),
     
     path("maintenance-teams/", maintenance_team_list, name="maintenance-team-list"),
     path("maintenance-teams/<int:pk>/", maintenance_team_detail, name="maintenance-team-detail"),
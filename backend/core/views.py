@@ -1,6 +1,11 @@
 # core/views.py
 
-from django.db.models import Q
+import codecs
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -20,11 +25,20 @@ from .serializers import EquipmentCategorySerializer
 from .serializers import EquipmentSerializer
 from .serializers import EquipmentViewSerializer
 from .serializers import WorkCenterSerializer
-from .serializers import MaintenanceEquipmentSelectSerializer
 from .serializers import MaintenanceWorkCenterSelectSerializer
 from .serializers import MaintenanceTeamSerializer
 from .serializers import MaintenanceTeamViewSerializer
+from .serializers import (
+    EQUIPMENT_SELECT_FIELDS,
+    EQUIPMENT_VIEW_FIELDS,
+    equipment_select_row,
+    equipment_view_row,
+)
+from .cache import CachedSelectMixin
+from .importers import EquipmentImporter, WorkCenterImporter
+from .pagination import IdCursorPagination
 from .permissions import IsAdminForWriteElseRead
+from .services import user_equipment
 
 
 
@@ -48,40 +62,53 @@ class EquipmentCategoryViewSet(ModelViewSet):
 
 
 class EquipmentViewSet(ModelViewSet):
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Equipment.objects.select_related(
+            "company", "category", "employee", "department"
+        )
 
         if user.role == "admin":
-            return Equipment.objects.all()
+            return queryset
 
-        return Equipment.objects.filter(
-            Q(employee=user) |
-            Q(department=user.department)
-        ).distinct()
+        return user_equipment(user, queryset)
 
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return EquipmentViewSerializer
         return EquipmentSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Flat path: same payload as EquipmentViewSerializer
+        rows = self.get_queryset().values(*EQUIPMENT_VIEW_FIELDS)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                [equipment_view_row(row) for row in page]
+            )
+        return Response([equipment_view_row(row) for row in rows])
+
     permission_classes = [IsAdminForWriteElseRead]
 
 
-class EquipmentSelectView(APIView):
+class EquipmentSelectView(CachedSelectMixin, APIView):
+    cache_resource = "equipment"
 
-    def get(self, request):
+    def get_cache_scope(self, request):
         user = request.user
+        return f"user:{user.id}:department:{user.department_id}"
 
-        queryset = Equipment.objects.filter(
-            Q(employee=user) |
-            Q(department=user.department)
-        ).distinct()
+    def get_select_data(self, request):
+        rows = user_equipment(request.user).values(*EQUIPMENT_SELECT_FIELDS)
 
-        serializer = MaintenanceEquipmentSelectSerializer(queryset, many=True)
-        return Response(serializer.data)
+        # Flat path: same payload as MaintenanceEquipmentSelectSerializer
+        return [equipment_select_row(row) for row in rows]
 
 class WorkCenterViewSet(ModelViewSet):
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -97,33 +124,39 @@ class WorkCenterViewSet(ModelViewSet):
     permission_classes = [IsAdminForWriteElseRead]
 
 
-class WorkCenterSelectView(APIView):
+class WorkCenterSelectView(CachedSelectMixin, APIView):
+    cache_resource = "work_centers"
 
-    def get(self, request):
-        user = request.user
+    def get_cache_scope(self, request):
+        return f"company:{request.user.company_id}"
 
+    def get_select_data(self, request):
         queryset = WorkCenter.objects.filter(
-            company=user.company
-        )
+            company_id=request.user.company_id
+        ).select_related("company")
 
         serializer = MaintenanceWorkCenterSelectSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return serializer.data
 
 
-class CompanySelectView(APIView):
+class CompanySelectView(CachedSelectMixin, APIView):
     permission_classes = [AllowAny]
-    def get(self, request):
+    cache_resource = "companies"
+
+    def get_select_data(self, request):
         queryset = Company.objects.all()
         serializer = CompanySerializer(queryset, many=True)
-        return Response(serializer.data)
+        return serializer.data
 
 
-class DepartmentSelectView(APIView):
+class DepartmentSelectView(CachedSelectMixin, APIView):
     permission_classes = [AllowAny]
-    def get(self, request):
+    cache_resource = "departments"
+
+    def get_select_data(self, request):
         queryset = Department.objects.all()
         serializer = DepartmentSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return serializer.data
 
 class MaintenanceTeamViewSet(ModelViewSet):
     permission_classes = [IsAdminForWriteElseRead]
@@ -139,4 +172,43 @@ class MaintenanceTeamViewSet(ModelViewSet):
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return MaintenanceTeamViewSerializer
-        return MaintenanceTeamSerializer
\ No newline at end of file
+        return MaintenanceTeamSerializer
+
+
+class CsvImportView(APIView):
+    """
+    Admin-only CSV upsert. The ``file`` upload is parsed as it streams
+    and the response is NDJSON: running totals after every chunk, then a
+    final line with ``done`` and the per-row errors.
+    """
+
+    permission_classes = [IsAdminForWriteElseRead]
+    parser_classes = [MultiPartParser]
+    importer_class = None
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "Upload a CSV as the file field"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        importer = self.importer_class()
+        try:
+            reader = importer.read_header(codecs.iterdecode(upload, "utf-8-sig"))
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return StreamingHttpResponse(
+            (json.dumps(progress) + "\n" for progress in importer.run(reader)),
+            content_type="application/x-ndjson",
+        )
+
+
+class EquipmentImportView(CsvImportView):
+    importer_class = EquipmentImporter
+
+
+class WorkCenterImportView(CsvImportView):
+    importer_class = WorkCenterImporter
@@ -0,0 +1,235 @@
+"""
+Maintenance KPIs per equipment, equipment category and work center.
+
+- MTTR: mean hours from the start of work on a failure (a corrective
+  request) to its completion
+- MTBF: mean running hours between one repair of an equipment and its
+  next failure
+- availability: MTBF / (MTBF + MTTR)
+- OEE: availability x the work center's time efficiency; quality is not
+  tracked and counts as 100 %
+- cost: hours worked on completed requests x the work center's hourly cost
+
+The totals behind them live in MaintenanceKpiRollup, one row per
+equipment and work center. ``record_completion`` folds each request in
+as its completing work log arrives, and ``rebuild_kpi_rollups`` derives
+every row from history with one windowed query. Reports only aggregate
+the rollups, so they never scan requests or work logs.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Max, Min, Q, Sum, Window
+from django.db.models.functions import Coalesce, Lag, NullIf
+
+from .models import MaintenanceKpiRollup, MaintenanceRequest
+
+# Work log statuses that mean work has started
+WORK_STATUSES = ["in_progress", "blocked"]
+
+KPI_GROUPS = {
+    "equipment": ("equipment_id", "equipment__name"),
+    "category": ("equipment__category_id", "equipment__category__name"),
+    "work_center": ("work_center_id", "work_center__name"),
+}
+
+KPI_TOTALS = [
+    "completed",
+    "work_hours",
+    "cost",
+    "repairs",
+    "repair_hours",
+    "uptime_hours",
+    "uptime_intervals",
+]
+
+REBUILD_CHUNK_SIZE = 2000
+
+
+def hours_between(start, end):
+    return max((end - start).total_seconds() / 3600, 0.0)
+
+
+def fold(rollup, row):
+    """
+    Add one completed request to ``rollup``. ``row`` carries its type,
+    creation, work start and completion times, the completion of the
+    previous repair of the same equipment, and the hourly cost.
+    """
+    started_at = row["started_at"] or row["scheduled_start"] or row["created_at"]
+    hours = hours_between(started_at, row["completed_at"])
+
+    rollup.completed += 1
+    rollup.work_hours += hours
+    rollup.cost += round(Decimal(hours) * row["cost_per_hour"], 2)
+
+    if row["maintenance_type"] != "corrective":
+        return
+
+    rollup.repairs += 1
+    rollup.repair_hours += hours
+
+    previous = row["previous_repair_at"]
+    if previous is not None and previous < row["created_at"]:
+        rollup.uptime_hours += hours_between(previous, row["created_at"])
+        rollup.uptime_intervals += 1
+
+    if rollup.last_repaired_at is None or rollup.last_repaired_at < row["completed_at"]:
+        rollup.last_repaired_at = row["completed_at"]
+
+
+def record_completion(maintenance, completed_at):
+    """
+    Fold a request into its rollup row as it completes. Called inside
+    the transaction of the completing work log; the row is locked, so
+    concurrent completions add up.
+    """
+    started_at = maintenance.work_logs.filter(
+        status__in=WORK_STATUSES
+    ).aggregate(first=Min("created_at"))["first"]
+
+    previous_repair_at = None
+    if maintenance.maintenance_type == "corrective":
+        previous_repair_at = MaintenanceKpiRollup.objects.filter(
+            equipment_id=maintenance.equipment_id
+        ).aggregate(last=Max("last_repaired_at"))["last"]
+
+    rollup, _ = MaintenanceKpiRollup.objects.select_for_update().get_or_create(
+        equipment_id=maintenance.equipment_id,
+        work_center_id=maintenance.work_center_id,
+        defaults={"company_id": maintenance.company_id},
+    )
+    fold(rollup, {
+        "maintenance_type": maintenance.maintenance_type,
+        "created_at": maintenance.created_at,
+        "scheduled_start": maintenance.scheduled_start,
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "previous_repair_at": previous_repair_at,
+        "cost_per_hour": maintenance.work_center.cost_per_hour,
+    })
+    rollup.save()
+
+
+def completed_requests():
+    """
+    Every completed request with its work window, and the completion of
+    the previous request of the same type on the same equipment (LAG),
+    computed by the database in one pass.
+    """
+    completed_at = Coalesce(
+        Max("work_logs__created_at", filter=Q(work_logs__status="completed")),
+        F("updated_at"),
+    )
+    return (
+        MaintenanceRequest.objects.filter(status="completed")
+        .annotate(
+            started_at=Min(
+                "work_logs__created_at",
+                filter=Q(work_logs__status__in=WORK_STATUSES),
+            ),
+            completed_at=completed_at,
+        )
+        .annotate(
+            previous_repair_at=Window(
+                Lag("completed_at"),
+                partition_by=[F("equipment_id"), F("maintenance_type")],
+                order_by=F("completed_at").asc(),
+            ),
+        )
+        .order_by()
+        .values(
+            "equipment_id",
+            "work_center_id",
+            "company_id",
+            "maintenance_type",
+            "created_at",
+            "scheduled_start",
+            "started_at",
+            "completed_at",
+            "previous_repair_at",
+            cost_per_hour=F("work_center__cost_per_hour"),
+        )
+    )
+
+
+def rebuild_kpi_rollups(chunk_size=None):
+    """
+    Recompute every rollup row from history; returns how many rows were
+    written. Requests are streamed through a server-side cursor, so only
+    the rollups are held in memory.
+    """
+    rollups = {}
+    rows = completed_requests().iterator(chunk_size=chunk_size or REBUILD_CHUNK_SIZE)
+
+    for row in rows:
+        key = (row["equipment_id"], row["work_center_id"])
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = MaintenanceKpiRollup(
+                equipment_id=row["equipment_id"],
+                work_center_id=row["work_center_id"],
+                company_id=row["company_id"],
+            )
+        fold(rollup, row)
+
+    with transaction.atomic():
+        MaintenanceKpiRollup.objects.all().delete()
+        MaintenanceKpiRollup.objects.bulk_create(
+            rollups.values(), batch_size=REBUILD_CHUNK_SIZE
+        )
+
+    return len(rollups)
+
+
+def kpi_report(rollups, group):
+    """
+    KPIs of ``rollups`` per ``group`` (a KPI_GROUPS key), aggregated by
+    the database.
+    """
+    key, name = KPI_GROUPS[group]
+    fields = [key, name]
+    if group == "work_center":
+        fields += ["work_center__time_efficiency", "work_center__oee_target"]
+
+    rows = (
+        rollups.values(*fields)
+        .annotate(
+            **{f"total_{field}": Sum(field) for field in KPI_TOTALS},
+            mttr=Sum("repair_hours") / NullIf(Sum("repairs"), 0),
+            mtbf=Sum("uptime_hours") / NullIf(Sum("uptime_intervals"), 0),
+        )
+        .order_by(key)
+    )
+
+    report = []
+    for row in rows:
+        mttr, mtbf = row["mttr"], row["mtbf"]
+        availability = None
+        if mttr is not None and mtbf is not None and mttr + mtbf > 0:
+            availability = mtbf / (mtbf + mttr)
+
+        entry = {
+            "id": row[key],
+            "name": row[name],
+            "completed": row["total_completed"],
+            "repairs": row["total_repairs"],
+            "work_hours": round(row["total_work_hours"], 2),
+            "cost": row["total_cost"],
+            "mttr_hours": None if mttr is None else round(mttr, 2),
+            "mtbf_hours": None if mtbf is None else round(mtbf, 2),
+            "availability": None if availability is None else round(availability, 4),
+        }
+
+        if group == "work_center":
+            efficiency = float(row["work_center__time_efficiency"]) / 100
+            entry["oee"] = (
+                None if availability is None
+                else round(availability * efficiency * 100, 2)
+            )
+            entry["oee_target"] = row["work_center__oee_target"]
+
+        report.append(entry)
+
+    return report
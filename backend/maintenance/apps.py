@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class MaintenanceConfig(AppConfig):
     name = 'maintenance'
+
+    def ready(self):
+        from . import signals
+
+        signals.connect()
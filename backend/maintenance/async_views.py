@@ -0,0 +1,113 @@
+"""
+Async counterparts of the maintenance read endpoints, see
+core.async_views, and the stream of board change events.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from core.async_views import AsyncAPIView, json_response
+from core.pagination import CreatedAtCursorPagination
+from .events import follows, get_broker, user_channels
+from .models import MaintenanceRequest, MaintenanceWorkLog
+from .serializers import MaintenanceRequestViewSerializer, MaintenanceWorkLogViewSerializer
+from .services import avisible_maintenance_requests, technician_team_ids
+from .views import MaintenanceRequestViewSet
+
+
+class AsyncMaintenanceRequestListView(AsyncAPIView):
+    """
+    GET of MaintenanceRequestViewSet.list; other methods go to
+    ``sync_view``, the viewset's list route.
+    """
+
+    pagination_class = CreatedAtCursorPagination
+
+    async def get(self, request):
+        queryset = await avisible_maintenance_requests(
+            request.user,
+            MaintenanceRequest.objects.select_related(
+                "equipment", "work_center", "assigned_team", "assigned_technician"
+            ).only(*MaintenanceRequestViewSet.view_fields),
+        )
+
+        # DRF's cursor logic evaluates the page itself; one sync_to_async
+        # call is what an async ORM query costs anyway
+        paginator = self.pagination_class()
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, request, self)
+        results = MaintenanceRequestViewSerializer(page, many=True).data
+
+        return json_response({
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": results,
+        })
+
+
+class AsyncMaintenanceWorkLogListView(AsyncAPIView):
+    authentication_required = False
+
+    async def get(self, request, maintenance_id):
+        logs = MaintenanceWorkLog.objects.filter(
+            maintenance_request_id=maintenance_id
+        ).select_related("technician").order_by("created_at")
+
+        logs = [log async for log in logs]
+        return json_response(MaintenanceWorkLogViewSerializer(logs, many=True).data)
+
+
+class MaintenanceEventStreamView(AsyncAPIView):
+    """
+    Server-sent events of board changes (maintenance.events): a
+    technician's own and team queues, or the company board for everyone
+    else.
+
+    Needs an ASGI server; each stream holds its connection open. Clients
+    reconnect after ``retry`` ms and refetch on ``resync``.
+    """
+
+    retry_ms = 5000
+
+    async def get(self, request):
+        team_ids = ()
+        if request.user.role == "technician":
+            # Memberships changed later apply from the next connection
+            team_ids = [team_id async for team_id in technician_team_ids(request.user)]
+
+        response = StreamingHttpResponse(
+            self.stream(user_channels(request.user, team_ids), request.user),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Unbuffered through nginx
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, channels, user):
+        # Subscribed as the body starts, so a response that is never sent
+        # holds no subscription, and before its first chunk, so nothing
+        # committed once the client sees the stream open is missed
+        subscription = get_broker().subscribe(channels)
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.MAINTENANCE_EVENT_KEEPALIVE_SECONDS
+                    )
+                except TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield b": keep-alive\n\n"
+                    continue
+
+                if follows(user, event):
+                    yield (
+                        f"event: {event['type']}\n"
+                        f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+                    ).encode()
+        finally:
+            subscription.close()
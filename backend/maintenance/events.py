@@ -0,0 +1,247 @@
+"""
+Change events of maintenance requests, pushed to boards and technician
+queues instead of having them poll the list endpoint.
+
+Events are small dicts of ids and statuses, published once the writing
+transaction commits, to the request's company channel and to the
+channel of every team and technician the change concerns. Clients fetch what
+they show through the regular endpoints, which keep applying
+visibility.
+
+The broker is MAINTENANCE_EVENT_BROKER. The default InProcessBroker only
+reaches subscribers of the process that made the change, which fits a
+single ASGI process serving both writes and streams. More processes
+need a broker with a shared backend (Redis pub/sub, Postgres
+LISTEN/NOTIFY) implementing EventBroker's ``publish``, ``subscribe``
+and ``unsubscribe``.
+"""
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from functools import cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+REQUEST_CREATED = "request.created"
+STATUS_CHANGED = "request.status_changed"
+REASSIGNED = "request.reassigned"
+WORK_LOG_ADDED = "worklog.added"
+# Sent instead of the events a slow subscriber missed
+RESYNC = "resync"
+
+
+def company_channel(company_id):
+    return f"company:{company_id}"
+
+
+def technician_channel(technician_id):
+    return f"technician:{technician_id}"
+
+
+def team_channel(team_id):
+    return f"team:{team_id}"
+
+
+class EventBroker(ABC):
+    """
+    Fans events out to the subscribers of their channels.
+
+    ``publish`` is called from request threads; ``subscribe`` from the
+    event loop of a streaming view and returns a Subscription, whose
+    ``close`` hands it back to ``unsubscribe`` (from any thread).
+    """
+
+    @abstractmethod
+    def publish(self, channels, event):
+        pass
+
+    @abstractmethod
+    def subscribe(self, channels):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        pass
+
+
+class Subscription:
+    """
+    Events of a set of channels, queued on the subscriber's event loop.
+
+    When ``queue_size`` events are waiting the queue is replaced by one
+    RESYNC event, so a stalled client costs bounded memory and learns
+    to refetch.
+    """
+
+    def __init__(self, broker, channels, queue_size):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+
+    def put(self, event):
+        # Runs on self.loop
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {"type": RESYNC}
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(EventBroker):
+    queue_size = 256
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channels, event):
+        with self.lock:
+            # A subscriber of several channels gets the event once
+            subscriptions = {
+                subscription
+                for channel in channels
+                for subscription in self.subscriptions.get(channel, ())
+            }
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Its loop has closed without unsubscribing
+                subscription.close()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, list(channels), self.queue_size)
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscriptions.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[channel]
+
+
+@cache
+def _broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _broker(settings.MAINTENANCE_EVENT_BROKER)
+
+
+def user_channels(user, team_ids=()):
+    """
+    Technicians follow their own queue and those of ``team_ids``, their
+    teams, as visible_maintenance_requests shows them; everyone else
+    their company's board.
+    """
+    if user.role == "technician":
+        return [
+            technician_channel(user.id),
+            *(team_channel(team_id) for team_id in sorted(team_ids)),
+        ]
+    if user.company_id is None:
+        return []
+    return [company_channel(user.company_id)]
+
+
+def follows(user, event):
+    """
+    Whether a user sees the request an event of their channels is about,
+    by the rules of visible_maintenance_requests.
+    """
+    if user.role != "user" or "request" not in event:
+        return True
+    return event["created_by"] == user.id or (
+        user.department_id is not None and event["department"] == user.department_id
+    )
+
+
+def request_event(event_type, maintenance, **extra):
+    return {
+        "type": event_type,
+        "request": maintenance.id,
+        "status": maintenance.status,
+        "priority": maintenance.priority,
+        "team": maintenance.assigned_team_id,
+        "technician": maintenance.assigned_technician_id,
+        "department": maintenance.department_id,
+        "created_by": maintenance.created_by_id,
+        "at": timezone.now().isoformat(),
+        **extra,
+    }
+
+
+def publish(maintenance, event, technician_ids=(), team_ids=()):
+    """
+    Publish ``event`` about ``maintenance`` once the current transaction
+    commits, to its company, to its team and ``team_ids`` and to its
+    technician and ``technician_ids``.
+    """
+    team_ids = {maintenance.assigned_team_id, *team_ids} - {None}
+    technician_ids = {maintenance.assigned_technician_id, *technician_ids} - {None}
+    channels = [
+        company_channel(maintenance.company_id),
+        *(team_channel(team_id) for team_id in sorted(team_ids)),
+        *(technician_channel(technician_id) for technician_id in sorted(technician_ids)),
+    ]
+
+    transaction.on_commit(
+        lambda: get_broker().publish(channels, event), robust=True
+    )
+
+
+def request_created(requests):
+    """
+    Events of new requests, also those written without save().
+    """
+    for maintenance in requests:
+        publish(maintenance, request_event(REQUEST_CREATED, maintenance))
+
+
+def status_changed(maintenance, previous_status):
+    publish(
+        maintenance,
+        request_event(STATUS_CHANGED, maintenance, previous_status=previous_status),
+    )
+
+
+def reassigned(maintenance, previous_technician_id, previous_team_id):
+    # The previous technician's and team's queues lose the request
+    publish(
+        maintenance,
+        request_event(
+            REASSIGNED, maintenance, previous_technician=previous_technician_id
+        ),
+        technician_ids=[previous_technician_id],
+        team_ids=[previous_team_id],
+    )
+
+
+def work_log_added(log, maintenance):
+    publish(
+        maintenance,
+        request_event(
+            WORK_LOG_ADDED, maintenance, work_log=log.id, work_log_status=log.status
+        ),
+        technician_ids=[log.technician_id],
+    )
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from maintenance.rollups import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily maintenance activity rollups from the full history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int,
+            help="Request ids aggregated per round trip",
+        )
+
+    def handle(self, *args, **options):
+        began = time.perf_counter()
+        requests = rebuild_daily_rollups(chunk_size=options["chunk_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {requests} requests in {time.perf_counter() - began:.1f}s"
+        ))
@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from maintenance.models import MaintenanceAssignment, MaintenanceRequest
+
+
+def overlapping_bookings():
+    """
+    Active bookings overlapping another of the same technician, as
+    ``(releasable, stuck)`` lists of ``(id, technician_id, overlapped_id)``.
+
+    Work in progress keeps its technician. A scheduled booking is
+    releasable when it overlaps work in progress or an earlier scheduled
+    booking that is kept; in-progress bookings overlapping each other
+    are stuck and need someone to sort them out.
+    """
+    bookings = (
+        MaintenanceRequest.objects
+        .filter(
+            status__in=["scheduled", "in_progress"],
+            assigned_technician__isnull=False,
+            scheduled_end__isnull=False,
+        )
+        .order_by("assigned_technician_id", "scheduled_start", "id")
+        .values_list("id", "assigned_technician_id", "scheduled_start", "scheduled_end", "status")
+    )
+
+    per_technician = {}
+    for booking in bookings.iterator():
+        per_technician.setdefault(booking[1], []).append(booking)
+
+    releasable, stuck = [], []
+    for technician_id, technician_bookings in per_technician.items():
+        kept = []
+        # Work in progress first, so only scheduled bookings give way
+        for booking_id, _, start, end, status in sorted(
+            technician_bookings, key=lambda booking: booking[4] != "in_progress"
+        ):
+            overlapped = next(
+                (other for other, other_start, other_end in kept
+                 if start < other_end and other_start < end),
+                None,
+            )
+            if overlapped is None:
+                kept.append((booking_id, start, end))
+            elif status == "scheduled":
+                releasable.append((booking_id, technician_id, overlapped))
+            else:
+                stuck.append((booking_id, technician_id, overlapped))
+                kept.append((booking_id, start, end))
+
+    return releasable, stuck
+
+
+class Command(BaseCommand):
+    help = (
+        "List technician bookings that overlap, which migration "
+        "maintenance.0005 refuses, and optionally release the scheduled ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--release", action="store_true",
+            help="Unassign the overlapping scheduled bookings and set them back to new",
+        )
+
+    def handle(self, *args, **options):
+        releasable, stuck = overlapping_bookings()
+
+        for booking_id, technician_id, overlapped in releasable:
+            self.stdout.write(
+                f"Request {booking_id} (scheduled) overlaps request {overlapped} "
+                f"of technician {technician_id}"
+            )
+        for booking_id, technician_id, overlapped in stuck:
+            self.stdout.write(self.style.WARNING(
+                f"Request {booking_id} (in progress) overlaps request {overlapped} "
+                f"of technician {technician_id}; reschedule one of them by hand"
+            ))
+
+        if not options["release"] or not releasable:
+            self.stdout.write(
+                f"{len(releasable)} releasable, {len(stuck)} in progress"
+                + (" (run with --release to release them)" if releasable else "")
+            )
+            return
+
+        ids = [booking_id for booking_id, _, _ in releasable]
+        with transaction.atomic():
+            MaintenanceAssignment.objects.filter(
+                maintenance_request_id__in=ids, is_active=True
+            ).update(is_active=False)
+            MaintenanceRequest.objects.filter(id__in=ids, status="scheduled").update(
+                status="new", assigned_technician=None
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Released {len(ids)} scheduled bookings back to new; "
+            f"{len(stuck)} in-progress overlaps left"
+        ))
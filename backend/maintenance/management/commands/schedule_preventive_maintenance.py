@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from core.exceptions import Conflict
+from maintenance.preventive import schedule_preventive_maintenance
+from maintenance.services import ASSIGNMENT_POLICIES
+
+
+class Command(BaseCommand):
+    help = "Create preventive maintenance requests for every asset that is due"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days", type=int,
+            help="Schedule assets due within this many days",
+        )
+        parser.add_argument(
+            "--duration-hours", type=int,
+            help="Duration of each preventive job",
+        )
+        parser.add_argument(
+            "--max-delay-days", type=int,
+            help="How far past its due day a job may be moved",
+        )
+        parser.add_argument("--policy", choices=ASSIGNMENT_POLICIES)
+        parser.add_argument(
+            "--created-by",
+            help="Email of the requester (defaults to the first admin)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Plan the jobs without writing them",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["created_by"]:
+            created_by = users.filter(email=options["created_by"]).first()
+        else:
+            created_by = users.filter(role="admin").order_by("id").first()
+        if created_by is None:
+            raise CommandError("No requester found for preventive maintenance")
+
+        began = time.perf_counter()
+        try:
+            summary = schedule_preventive_maintenance(
+                created_by,
+                horizon_days=options["horizon_days"],
+                duration_hours=options["duration_hours"],
+                max_delay_days=options["max_delay_days"],
+                policy=options["policy"],
+                dry_run=options["dry_run"],
+            )
+        except Conflict as exc:
+            raise CommandError(
+                f"{exc.detail} Bookings kept changing while jobs were planned; "
+                "nothing was written, run the command again."
+            )
+        elapsed = time.perf_counter() - began
+
+        prefix = "Planned" if options["dry_run"] else "Scheduled"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {summary['scheduled']} of {summary['due']} due assets "
+            f"in {elapsed:.2f}s ({summary['unassigned']} without a free slot)"
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0003_maintenanceteam'),
+        ('maintenance', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['assigned_technician', 'status', 'scheduled_start'], include=('duration_hours',), name='mr_tech_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(condition=models.Q(('status__in', ['scheduled', 'in_progress'])), fields=['scheduled_start'], include=('work_center', 'duration_hours'), name='mr_active_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(condition=models.Q(('status__in', ['scheduled', 'in_progress'])), fields=['work_center', 'scheduled_start'], include=('duration_hours',), name='mr_active_wc_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['-created_at'], name='mr_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['company', '-created_at'], name='mr_company_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['department', '-created_at'], name='mr_department_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['created_by', '-created_at'], name='mr_creator_created_idx'),
+        ),
+    ]
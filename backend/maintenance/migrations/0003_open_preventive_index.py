@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 22:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0004_preventive_due_index'),
+        ('maintenance', '0002_scheduling_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(condition=models.Q(('maintenance_type', 'preventive'), ('status__in', ['new', 'scheduled', 'in_progress'])), fields=['equipment'], name='mr_open_preventive_idx'),
+        ),
+    ]
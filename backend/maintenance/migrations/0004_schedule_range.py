@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-17 23:10
+
+import django.contrib.postgres.indexes
+import maintenance.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0004_preventive_due_index'),
+        ('maintenance', '0003_open_preventive_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='maintenancerequest',
+            name='mr_tech_status_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='maintenancerequest',
+            name='mr_active_start_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='maintenancerequest',
+            name='mr_active_wc_start_idx',
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='scheduled_end',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE maintenance_maintenancerequest
+            SET scheduled_end = scheduled_start + duration_hours * interval '1 hour'
+            WHERE scheduled_start IS NOT NULL AND duration_hours IS NOT NULL
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['assigned_technician', 'status', 'scheduled_start'], include=('duration_hours', 'scheduled_end'), name='mr_tech_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(condition=models.Q(('status__in', ['scheduled', 'in_progress'])), fields=['scheduled_start'], include=('work_center', 'duration_hours', 'scheduled_end'), name='mr_active_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(condition=models.Q(('status__in', ['scheduled', 'in_progress'])), fields=['work_center', 'scheduled_start'], include=('duration_hours', 'scheduled_end'), name='mr_active_wc_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=django.contrib.postgres.indexes.GistIndex(maintenance.models.TsTzRange('scheduled_start', 'scheduled_end'), condition=models.Q(('scheduled_start__isnull', False)), name='mr_schedule_range_idx'),
+        ),
+    ]
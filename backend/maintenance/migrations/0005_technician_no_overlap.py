@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-17 23:55
+
+import django.contrib.postgres.constraints
+import maintenance.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def refuse_overlapping_bookings(apps, schema_editor):
+    """
+    Availability used to miss bookings that started before the requested
+    window, so a technician may hold overlapping active bookings, which
+    the constraint would reject. Fail with them listed instead of
+    changing anyone's work here.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT a.assigned_technician_id, a.id, b.id
+            FROM maintenance_maintenancerequest a
+            JOIN maintenance_maintenancerequest b
+              ON b.assigned_technician_id = a.assigned_technician_id
+             AND b.id > a.id
+             AND tstzrange(a.scheduled_start, a.scheduled_end)
+                 && tstzrange(b.scheduled_start, b.scheduled_end)
+            WHERE a.status IN ('scheduled', 'in_progress')
+              AND b.status IN ('scheduled', 'in_progress')
+              AND a.scheduled_end IS NOT NULL
+              AND b.scheduled_end IS NOT NULL
+            ORDER BY 1, 2, 3
+            """
+        )
+        overlaps = cursor.fetchall()
+
+    if overlaps:
+        lines = "\n".join(
+            f"  technician {technician_id}: requests {first} and {second}"
+            for technician_id, first, second in overlaps
+        )
+        raise RuntimeError(
+            f"Technicians hold {len(overlaps)} pairs of overlapping bookings:\n{lines}\n"
+            "Reschedule or unassign them (manage.py release_overlapping_bookings "
+            "lists them and can release the scheduled ones), then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0004_preventive_due_index'),
+        ('maintenance', '0004_schedule_range'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(refuse_overlapping_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='maintenancerequest',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('assigned_technician__isnull', False), ('scheduled_end__isnull', False), ('status__in', ['scheduled', 'in_progress'])), expressions=[(maintenance.models.SingletonRange('assigned_technician'), '&&'), (maintenance.models.TsTzRange('scheduled_start', 'scheduled_end'), '&&')], name='mr_technician_no_overlap', violation_error_code='technician_booked', violation_error_message='Technician is already booked at this time.'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0004_preventive_due_index'),
+        ('maintenance', '0005_technician_no_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceKpiRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('work_hours', models.FloatField(default=0)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('repairs', models.PositiveIntegerField(default=0)),
+                ('repair_hours', models.FloatField(default=0)),
+                ('uptime_hours', models.FloatField(default=0)),
+                ('uptime_intervals', models.PositiveIntegerField(default=0)),
+                ('last_repaired_at', models.DateTimeField(blank=True, null=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.company')),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kpi_rollups', to='core.equipment')),
+                ('work_center', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kpi_rollups', to='core.workcenter')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'work_center'], name='kpi_rollup_company_wc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('equipment', 'work_center'), name='kpi_rollup_equipment_wc_uniq')],
+            },
+        ),
+    ]
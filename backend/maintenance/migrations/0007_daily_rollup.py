@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 01:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def require_nulls_not_distinct(apps, schema_editor):
+    # Rollup keys have NULL departments and teams; the upsert relies on
+    # them being equal in the unique key, which needs PostgreSQL 15
+    if schema_editor.connection.pg_version < 150000:
+        raise RuntimeError(
+            "The daily maintenance rollups need PostgreSQL 15 or newer "
+            "(UNIQUE NULLS NOT DISTINCT)."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_company_department_user_company_and_more'),
+        ('core', '0004_preventive_due_index'),
+        ('maintenance', '0006_kpi_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(require_nulls_not_distinct, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='MaintenanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('scheduled', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('hours_booked', models.PositiveIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.company')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='accounts.department')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.maintenanceteam')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'day'], name='daily_rollup_company_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'company', 'department', 'team'), name='daily_rollup_key_uniq', nulls_distinct=False)],
+            },
+        ),
+    ]
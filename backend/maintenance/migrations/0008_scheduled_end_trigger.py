@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0007_daily_rollup'),
+    ]
+
+    operations = [
+        # scheduled_end follows scheduled_start and duration_hours on every
+        # write, including QuerySet.update() and bulk_update()
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION maintenance_scheduled_end() RETURNS trigger AS $$
+            BEGIN
+                NEW.scheduled_end := NEW.scheduled_start + NEW.duration_hours * interval '1 hour';
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER mr_scheduled_end
+            BEFORE INSERT OR UPDATE ON maintenance_maintenancerequest
+            FOR EACH ROW EXECUTE FUNCTION maintenance_scheduled_end();
+
+            UPDATE maintenance_maintenancerequest
+            SET scheduled_end = scheduled_start + duration_hours * interval '1 hour'
+            WHERE scheduled_end IS DISTINCT FROM scheduled_start + duration_hours * interval '1 hour';
+            """,
+            """
+            DROP TRIGGER mr_scheduled_end ON maintenance_maintenancerequest;
+            DROP FUNCTION maintenance_scheduled_end();
+            """,
+        ),
+    ]
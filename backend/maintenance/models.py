@@ -1,3 +1,12 @@
+from datetime import timedelta
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    BigIntegerRangeField,
+    DateTimeRangeField,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
 from django.conf import settings
 from core.models import (
@@ -7,6 +16,35 @@ from core.models import (
 )
 from accounts.models import Department, Company, User
 
+
+# Statuses that occupy a technician / work center slot
+ACTIVE_STATUSES = ["scheduled", "in_progress"]
+
+# Statuses of a request that still has to be carried out
+OPEN_STATUSES = ["new", "scheduled", "in_progress"]
+
+
+class TsTzRange(models.Func):
+    """
+    tstzrange(start, end): the [start, end) window of a booking.
+    """
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class SingletonRange(models.Func):
+    """
+    int8range(id, id, '[]'): overlaps another only when the ids are
+    equal, so an exclusion constraint can compare ids with ``&&``
+    without the btree_gist extension.
+    """
+
+    function = "INT8RANGE"
+    template = "%(function)s(%(expressions)s, %(expressions)s, '[]')"
+    output_field = BigIntegerRangeField()
+
+
 class MaintenanceRequest(models.Model):
     # ----------------------------- 
     # ENUMS
@@ -117,6 +155,10 @@ class MaintenanceRequest(models.Model):
     scheduled_start = models.DateTimeField(null=True, blank=True)
     duration_hours = models.PositiveIntegerField(null=True, blank=True)
 
+    # scheduled_start + duration_hours, kept by a database trigger on every
+    # write (see migration 0008); save() mirrors it on the instance
+    scheduled_end = models.DateTimeField(null=True, blank=True, editable=False)
+
     # -----------------------------
     # TIMESTAMPS
     # -----------------------------
@@ -130,10 +172,90 @@ class MaintenanceRequest(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Availability + workload: technician bookings by status / start
+            models.Index(
+                fields=["assigned_technician", "status", "scheduled_start"],
+                include=["duration_hours", "scheduled_end"],
+                name="mr_tech_status_start_idx",
+            ),
+            # Overlap scans over active bookings only, covering work_center_id
+            models.Index(
+                fields=["scheduled_start"],
+                include=["work_center", "duration_hours", "scheduled_end"],
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+                name="mr_active_start_idx",
+            ),
+            models.Index(
+                fields=["work_center", "scheduled_start"],
+                include=["duration_hours", "scheduled_end"],
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+                name="mr_active_wc_start_idx",
+            ),
+            # Calendar: bookings whose window overlaps a date range
+            GistIndex(
+                TsTzRange("scheduled_start", "scheduled_end"),
+                condition=models.Q(scheduled_start__isnull=False),
+                name="mr_schedule_range_idx",
+            ),
+            # Preventive generation: equipment that already has an open job
+            models.Index(
+                fields=["equipment"],
+                condition=models.Q(
+                    maintenance_type="preventive", status__in=OPEN_STATUSES
+                ),
+                name="mr_open_preventive_idx",
+            ),
+            # List endpoints: newest first, optionally per tenant / owner
+            models.Index(fields=["-created_at"], name="mr_created_idx"),
+            models.Index(
+                fields=["company", "-created_at"], name="mr_company_created_idx"
+            ),
+            models.Index(
+                fields=["department", "-created_at"], name="mr_department_created_idx"
+            ),
+            models.Index(
+                fields=["created_by", "-created_at"], name="mr_creator_created_idx"
+            ),
+        ]
+        constraints = [
+            # A technician works one active booking at a time. Work
+            # centers have a capacity, which is checked under a row lock
+            # instead (services.work_center_conflict).
+            ExclusionConstraint(
+                name="mr_technician_no_overlap",
+                expressions=[
+                    (SingletonRange("assigned_technician"), RangeOperators.OVERLAPS),
+                    (TsTzRange("scheduled_start", "scheduled_end"), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(
+                    status__in=ACTIVE_STATUSES,
+                    assigned_technician__isnull=False,
+                    scheduled_end__isnull=False,
+                ),
+                violation_error_code="technician_booked",
+                violation_error_message="Technician is already booked at this time.",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.equipment.name})"
 
+    @staticmethod
+    def end_of(start, duration_hours):
+        if start is None or duration_hours is None:
+            return None
+        return start + timedelta(hours=duration_hours)
+
+    def save(self, *args, **kwargs):
+        self.scheduled_end = self.end_of(self.scheduled_start, self.duration_hours)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"scheduled_start", "duration_hours"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "scheduled_end"}
+
+        super().save(*args, **kwargs)
+
 
 class MaintenanceAssignment(models.Model):
     maintenance_request = models.ForeignKey(
@@ -197,4 +319,107 @@ class MaintenanceWorkLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Log by {self.technician.email}"
\ No newline at end of file
+        return f"Log by {self.technician.email}"
+
+class MaintenanceKpiRollup(models.Model):
+    """
+    Running repair totals per equipment and work center, the source of
+    the MTTR / MTBF / OEE analytics. Folded in as requests complete and
+    rebuilt from history by the ``rebuild_kpi_rollups`` command.
+    """
+
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name="kpi_rollups"
+    )
+
+    work_center = models.ForeignKey(
+        WorkCenter,
+        on_delete=models.CASCADE,
+        related_name="kpi_rollups"
+    )
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE
+    )
+
+    # Every completed request: hours worked and their cost
+    completed = models.PositiveIntegerField(default=0)
+    work_hours = models.FloatField(default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Completed corrective requests (failures)
+    repairs = models.PositiveIntegerField(default=0)
+    repair_hours = models.FloatField(default=0)
+
+    # Running time between a repair and the next failure of the equipment
+    uptime_hours = models.FloatField(default=0)
+    uptime_intervals = models.PositiveIntegerField(default=0)
+
+    last_repaired_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["equipment", "work_center"],
+                name="kpi_rollup_equipment_wc_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["company", "work_center"], name="kpi_rollup_company_wc_idx"),
+        ]
+
+    def __str__(self):
+        return f"KPIs of {self.equipment_id} at {self.work_center_id}"
+
+
+class MaintenanceDailyRollup(models.Model):
+    """
+    Request activity per day, company, department and team. Counters
+    are added to as requests are created and change status (see
+    maintenance.rollups) and rebuilt by ``rebuild_daily_rollups``.
+    """
+
+    day = models.DateField()
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE
+    )
+
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    team = models.ForeignKey(
+        MaintenanceTeam,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    created = models.PositiveIntegerField(default=0)
+    scheduled = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    hours_booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "company", "department", "team"],
+                nulls_distinct=False,
+                name="daily_rollup_key_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["company", "day"], name="daily_rollup_company_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"Activity of {self.company_id} on {self.day}"
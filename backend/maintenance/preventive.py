@@ -0,0 +1,337 @@
+"""
+Preventive maintenance generation from Equipment.maintenance_interval_days.
+
+One query finds the candidate assets, NumPy turns their service history
+into due dates, and a SlotAllocator per company places every job on a
+free technician and work center before everything is bulk-inserted.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from core.exceptions import Conflict, violated_exclusion
+from core.models import Equipment, MaintenanceTeam
+from . import events
+from .models import OPEN_STATUSES, MaintenanceAssignment, MaintenanceRequest
+from .rollups import record_created
+from .serializers import WORK_CENTER_FULL
+from .services import (
+    BULK_BATCH_SIZE,
+    NO_TECHNICIAN,
+    SlotAllocator,
+    work_center_conflict,
+)
+
+# Plans tried before a run gives up on concurrent bookings
+PLAN_ATTEMPTS = 3
+
+DUE_FIELDS = [
+    "id",
+    "name",
+    "company_id",
+    "department_id",
+    "category__default_technician_id",
+    "last_maintenance_service_date",
+    "purchase_date",
+    "maintenance_interval_days",
+]
+
+
+def due_equipment(until):
+    """
+    Assets that may be due on or before ``until`` and have no open
+    preventive request, as value rows of ``DUE_FIELDS``.
+
+    A positive interval means the last service happened before
+    ``until``; never serviced assets are resolved in ``due_dates``.
+    The filter matches ``equipment_pm_due_idx`` and the open-job check
+    is an anti-join on ``mr_open_preventive_idx``.
+    """
+    open_preventive = MaintenanceRequest.objects.filter(
+        equipment=OuterRef("pk"),
+        maintenance_type="preventive",
+        status__in=OPEN_STATUSES,
+    )
+    return (
+        Equipment.objects
+        .filter(maintenance_interval_days__gt=0)
+        .filter(
+            Q(last_maintenance_service_date__lt=until)
+            | Q(last_maintenance_service_date__isnull=True)
+        )
+        .filter(~Exists(open_preventive))
+        .order_by()
+        .values_list(*DUE_FIELDS)
+    )
+
+
+def due_dates(last_service, purchased, intervals, earliest):
+    """
+    Next service day of every asset as a ``datetime64[D]`` array.
+
+    The interval counts from the last service, else from the purchase.
+    Assets with neither, and overdue ones, are due on ``earliest``.
+    """
+    baseline = np.where(np.isnat(last_service), purchased, last_service)
+    due = baseline + intervals.astype("timedelta64[D]")
+    due[np.isnat(due)] = earliest
+    return np.maximum(due, earliest)
+
+
+def team_lookup(company_ids):
+    """
+    Per company, the team of each member and the fallback team (lowest
+    id), read from two narrow queries.
+    """
+    fallback = {}
+    for team_id, company_id in (
+        MaintenanceTeam.objects.filter(company_id__in=company_ids)
+        .order_by("id")
+        .values_list("id", "company_id")
+    ):
+        fallback.setdefault(company_id, team_id)
+
+    membership = {}
+    for team_id, company_id, user_id in (
+        MaintenanceTeam.members.through.objects
+        .filter(maintenanceteam__company_id__in=company_ids)
+        .order_by("maintenanceteam_id")
+        .values_list("maintenanceteam_id", "maintenanceteam__company_id", "user_id")
+    ):
+        membership.setdefault((company_id, user_id), team_id)
+
+    return fallback, membership
+
+
+def slot_offsets(duration_hours, max_delay_days):
+    """
+    Start offsets from midnight tried for every job, in order: each
+    working slot of the due day, then of the following days.
+    """
+    start_hour = settings.MAINTENANCE_WORKDAY_START_HOUR
+    end_hour = settings.MAINTENANCE_WORKDAY_END_HOUR
+    hours = list(range(start_hour, end_hour - duration_hours + 1, duration_hours))
+
+    return [
+        timedelta(days=day, hours=hour)
+        for day in range(max_delay_days + 1)
+        for hour in hours or [start_hour]
+    ]
+
+
+def schedule_preventive_maintenance(
+    created_by,
+    today=None,
+    horizon_days=None,
+    duration_hours=None,
+    max_delay_days=None,
+    policy=None,
+    dry_run=False,
+):
+    """
+    Create a scheduled preventive request, with its assignment, for every
+    asset due within ``horizon_days``. Jobs start from tomorrow; a job
+    whose due day is full moves to the next free slot within
+    ``max_delay_days`` and is reported as unassigned past that.
+
+    Jobs are planned from a snapshot of the schedule. When another writer
+    takes a planned seat or technician before the jobs are written, the
+    run plans again from a fresh snapshot, up to PLAN_ATTEMPTS times, and
+    raises Conflict after that.
+
+    Returns ``{"due", "scheduled", "unassigned"}`` counts.
+    """
+    for attempt in range(1, PLAN_ATTEMPTS + 1):
+        try:
+            return _schedule(
+                created_by, today, horizon_days, duration_hours,
+                max_delay_days, policy, dry_run,
+            )
+        except Conflict:
+            if attempt == PLAN_ATTEMPTS:
+                raise
+
+
+def _schedule(
+    created_by, today, horizon_days, duration_hours, max_delay_days, policy, dry_run
+):
+    today = today or timezone.localdate()
+    horizon_days = (
+        settings.MAINTENANCE_PREVENTIVE_HORIZON_DAYS
+        if horizon_days is None else horizon_days
+    )
+    duration_hours = duration_hours or settings.MAINTENANCE_PREVENTIVE_DURATION_HOURS
+    max_delay_days = (
+        settings.MAINTENANCE_PREVENTIVE_MAX_DELAY_DAYS
+        if max_delay_days is None else max_delay_days
+    )
+
+    earliest = today + timedelta(days=1)
+    until = today + timedelta(days=horizon_days)
+
+    rows = list(due_equipment(until))
+    if not rows:
+        return {"due": 0, "scheduled": 0, "unassigned": 0}
+
+    (
+        ids, names, companies, departments, default_technicians,
+        last_service, purchased, intervals,
+    ) = zip(*rows)
+
+    due = due_dates(
+        np.array(last_service, dtype="datetime64[D]"),
+        np.array(purchased, dtype="datetime64[D]"),
+        np.array(intervals, dtype=np.int64),
+        np.datetime64(earliest, "D"),
+    )
+    selected = np.flatnonzero(due <= np.datetime64(until, "D"))
+    # Earliest due first, so every schedule grows in start order
+    selected = selected[np.argsort(due[selected], kind="stable")]
+
+    tz = timezone.get_current_timezone()
+    midnights = [
+        day.replace(tzinfo=tz)
+        for day in due[selected].astype("datetime64[m]").tolist()
+    ]
+
+    by_company = defaultdict(list)
+    for position, midnight in zip(selected.tolist(), midnights):
+        by_company[companies[position]].append((position, midnight))
+
+    fallback, membership = team_lookup(list(by_company))
+    offsets = slot_offsets(duration_hours, max_delay_days)
+    duration = timedelta(hours=duration_hours)
+    window = (
+        datetime.combine(earliest, time(), tzinfo=tz),
+        datetime.combine(until, time(), tzinfo=tz)
+        + timedelta(days=max_delay_days + 1),
+    )
+
+    requests = []
+    for company_id, jobs in by_company.items():
+        teams = {}
+        for position, _ in jobs:
+            team = membership.get(
+                (company_id, default_technicians[position]),
+                fallback.get(company_id),
+            )
+            if team is not None:
+                teams[position] = team
+        if not teams:
+            continue
+
+        allocator = SlotAllocator(
+            company_id,
+            [
+                {"team": team, "equipment": ids[position]}
+                for position, team in teams.items()
+            ],
+            policy=policy,
+            window=window,
+        )
+
+        # Bookings only ever add load, so a slot found full stays full:
+        # (team, start) when no member was free, (None, start) when no
+        # work center was. Per (team, due day), the first offset not
+        # known full, so every slot is probed until full at most once
+        # and jobs past a full window are skipped without probing.
+        full = set()
+        first_open = {}
+
+        for position, midnight in jobs:
+            team = teams.get(position)
+            if team is None:
+                continue
+
+            index = first_open.get((team, midnight), 0)
+            while index < len(offsets):
+                start = midnight + offsets[index]
+                if (team, start) not in full and (None, start) not in full:
+                    slot = {
+                        "team": team,
+                        "equipment": ids[position],
+                        "start": start,
+                        "end": start + duration,
+                    }
+                    technician, work_center, error = allocator.allocate(slot)
+                    if error is None:
+                        break
+                    full.add((team if error == NO_TECHNICIAN else None, start))
+                index += 1
+
+            first_open[(team, midnight)] = index
+            if index == len(offsets):
+                continue
+
+            requests.append(MaintenanceRequest(
+                title=f"Preventive maintenance: {names[position]}",
+                description=f"Service every {intervals[position]} days",
+                maintenance_type="preventive",
+                priority="medium",
+                status="scheduled",
+                equipment_id=ids[position],
+                work_center=work_center,
+                company_id=company_id,
+                department_id=departments[position],
+                created_by=created_by,
+                assigned_team_id=team,
+                assigned_technician=technician,
+                scheduled_start=start,
+                duration_hours=duration_hours,
+                scheduled_end=start + duration,
+            ))
+
+    if not dry_run:
+        write_jobs(requests, created_by)
+
+    return {
+        "due": len(selected),
+        "scheduled": len(requests),
+        "unassigned": len(selected) - len(requests),
+    }
+
+
+def write_jobs(requests, created_by):
+    """
+    Insert planned jobs and their assignments in one transaction, or
+    raise Conflict when a work center or technician was taken since the
+    jobs were planned.
+    """
+    try:
+        with transaction.atomic():
+            # Planned from a snapshot; re-check capacity under lock
+            if work_center_conflict([
+                (request.work_center_id, request.scheduled_start, request.scheduled_end)
+                for request in requests
+            ]):
+                raise Conflict(WORK_CENTER_FULL, "work_center_full")
+
+            MaintenanceRequest.objects.bulk_create(requests, batch_size=BULK_BATCH_SIZE)
+            record_created(requests)
+            events.request_created(requests)
+            MaintenanceAssignment.objects.bulk_create(
+                (
+                    MaintenanceAssignment(
+                        maintenance_request=request,
+                        assigned_team_id=request.assigned_team_id,
+                        assigned_technician=request.assigned_technician,
+                        assigned_by=created_by,
+                    )
+                    for request in requests
+                ),
+                batch_size=BULK_BATCH_SIZE,
+            )
+    except IntegrityError as exc:
+        # A technician booked concurrently trips mr_technician_no_overlap
+        constraint = violated_exclusion(exc)
+        if constraint is None:
+            raise
+        raise Conflict(
+            constraint.get_violation_error_message(), constraint.violation_error_code
+        ) from exc
@@ -0,0 +1,320 @@
+"""
+Daily request activity per company, department and team.
+
+Every request event adds to the counters of a day: ``created`` when
+the request is written and ``scheduled`` (with its ``hours_booked``)
+when its status changes to scheduled count on the day it was created,
+``completed`` or ``cancelled`` on the day its status changes to that
+value. An open request moved to another department or team, or given
+another duration, takes its creation-day counters along, so backlogs
+follow the work and match a rebuild.
+Increments are summed per key and written with one
+``INSERT ... ON CONFLICT DO UPDATE`` in the transaction of the event, so
+reports never have to scan requests or work logs.
+
+``rebuild_daily_rollups`` backfills the counters from history, one id
+range of requests at a time.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import (
+    Coalesce,
+    Greatest,
+    TruncDate,
+    TruncMonth,
+    TruncWeek,
+)
+from django.utils import timezone
+
+from .models import MaintenanceDailyRollup, MaintenanceRequest, MaintenanceWorkLog
+
+ROLLUP_COUNTERS = ["created", "scheduled", "completed", "cancelled", "hours_booked"]
+
+# Statuses that close a request, each with its own counter
+CLOSED_STATUSES = ["completed", "cancelled"]
+
+# Counted on the day the request was created, as by the rebuild
+CREATED_DAY_COUNTERS = ["created", "scheduled", "hours_booked"]
+
+REBUILD_CHUNK_SIZE = 50000
+
+ROLLUP_GROUPS = {
+    "company": ("company_id", "company__name"),
+    "department": ("department_id", "department__name"),
+    "team": ("team_id", "team__name"),
+}
+
+ROLLUP_INTERVALS = {
+    "day": F("day"),
+    "week": TruncWeek("day"),
+    "month": TruncMonth("day"),
+}
+
+
+def activity(maintenance, previous_status=None, created=False):
+    """
+    Counter increments for one request being written with its current
+    status, coming from ``previous_status``.
+    """
+    counts = Counter()
+    if created:
+        counts["created"] += 1
+
+    if maintenance.status != previous_status:
+        if maintenance.status == "scheduled":
+            counts["scheduled"] += 1
+            counts["hours_booked"] += maintenance.duration_hours or 0
+        elif maintenance.status in CLOSED_STATUSES:
+            counts[maintenance.status] += 1
+
+    return counts
+
+
+def rollup_key(maintenance, day=None):
+    return (
+        day or timezone.localdate(),
+        maintenance.company_id,
+        maintenance.department_id,
+        maintenance.assigned_team_id,
+    )
+
+
+def carried(status, duration_hours):
+    """
+    Creation-day counters an open request with ``status`` holds.
+    """
+    counts = Counter(created=1)
+    if status != "new":
+        counts["scheduled"] = 1
+        counts["hours_booked"] = duration_hours or 0
+    return counts
+
+
+def request_changes(maintenance, previous=None, created=False):
+    """
+    Signed counter changes, ``{key: Counter}``, of one request being
+    written; ``previous`` is its ``(status, department_id, team_id,
+    duration_hours)`` as last written.
+    """
+    changes = defaultdict(Counter)
+    created_day = timezone.localdate(maintenance.created_at)
+    previous_status = None if created else previous[0]
+
+    for counter, value in activity(maintenance, previous_status, created=created).items():
+        day = created_day if counter in CREATED_DAY_COUNTERS else None
+        changes[rollup_key(maintenance, day)][counter] += value
+
+    if not created and previous_status not in CLOSED_STATUSES:
+        status, department_id, team_id, duration_hours = previous
+        # Counter.subtract/update, as + and - would drop negative counts
+        changes[(created_day, maintenance.company_id, department_id, team_id)].subtract(
+            carried(status, duration_hours)
+        )
+        changes[rollup_key(maintenance, created_day)].update(
+            carried(status, maintenance.duration_hours)
+        )
+
+    return changes
+
+
+def apply_changes(changes):
+    """
+    Write signed ``{key: Counter}`` changes. The counters are unsigned,
+    so decrements update existing rows in place instead of going through
+    the upsert of ``add_to_rollups``.
+    """
+    increments = {}
+    for key, counts in changes.items():
+        decrements = {counter: -value for counter, value in counts.items() if value < 0}
+        if decrements:
+            day, company_id, department_id, team_id = key
+            MaintenanceDailyRollup.objects.filter(
+                day=day, company_id=company_id, department_id=department_id, team_id=team_id,
+            ).update(**{
+                counter: Greatest(F(counter) - value, 0)
+                for counter, value in decrements.items()
+            })
+        increments[key] = Counter({
+            counter: value for counter, value in counts.items() if value > 0
+        })
+    add_to_rollups(increments)
+
+
+def add_to_rollups(increments):
+    """
+    Add ``{(day, company, department, team): Counter}`` to the daily
+    rollups, creating missing rows, in one statement per 1000 keys.
+    """
+    rows = [
+        (*key, *(counts.get(counter, 0) for counter in ROLLUP_COUNTERS))
+        for key, counts in increments.items()
+        if any(counts.values())
+    ]
+    if not rows:
+        return
+
+    table = connection.ops.quote_name(MaintenanceDailyRollup._meta.db_table)
+    columns = ["day", "company_id", "department_id", "team_id", *ROLLUP_COUNTERS]
+    updates = ", ".join(
+        f"{counter} = {table}.{counter} + EXCLUDED.{counter}" for counter in ROLLUP_COUNTERS
+    )
+    placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+
+    with connection.cursor() as cursor:
+        for first in range(0, len(rows), 1000):
+            batch = rows[first:first + 1000]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES {', '.join([placeholder] * len(batch))} "
+                f"ON CONFLICT ON CONSTRAINT daily_rollup_key_uniq DO UPDATE SET {updates}",
+                [value for row in batch for value in row],
+            )
+
+
+def record_created(requests):
+    """
+    Count requests written without save(), e.g. by bulk_create.
+    """
+    increments = defaultdict(Counter)
+    for maintenance in requests:
+        increments[rollup_key(maintenance)] += activity(maintenance, created=True)
+    add_to_rollups(increments)
+
+
+def created_activity(requests):
+    """
+    ``created`` and ``scheduled`` counters of ``requests``, by creation day.
+    """
+    return (
+        requests
+        .values(
+            "company_id",
+            "department_id",
+            "assigned_team_id",
+            day=TruncDate("created_at"),
+        )
+        .annotate(
+            created=Count("id"),
+            scheduled=Count("id", filter=Q(scheduled_start__isnull=False) & ~Q(status="new")),
+            hours_booked=Coalesce(
+                Sum("duration_hours", filter=Q(scheduled_start__isnull=False) & ~Q(status="new")),
+                0,
+            ),
+        )
+        .order_by()
+    )
+
+
+def closed_activity(requests):
+    """
+    ``completed`` and ``cancelled`` counters of ``requests``, by the day of
+    their completing work log (or last update).
+    """
+    completed_at = Coalesce(
+        Subquery(
+            MaintenanceWorkLog.objects.filter(
+                maintenance_request=OuterRef("pk"), status="completed"
+            ).order_by("-created_at").values("created_at")[:1]
+        ),
+        F("updated_at"),
+    )
+    return (
+        requests.filter(status__in=CLOSED_STATUSES)
+        .values(
+            "company_id",
+            "department_id",
+            "assigned_team_id",
+            day=TruncDate(completed_at),
+        )
+        .annotate(
+            completed=Count("id", filter=Q(status="completed")),
+            cancelled=Count("id", filter=Q(status="cancelled")),
+        )
+        .order_by()
+    )
+
+
+def rebuild_daily_rollups(chunk_size=None):
+    """
+    Recompute the daily rollups from history, aggregating one id range
+    of requests per round trip; returns how many requests were read.
+    """
+    chunk_size = chunk_size or REBUILD_CHUNK_SIZE
+    bounds = MaintenanceRequest.objects.order_by("id").values_list("id", flat=True)
+    last = bounds.last()
+    counted = 0
+
+    with transaction.atomic():
+        MaintenanceDailyRollup.objects.all().delete()
+
+        first = bounds.first()
+        while first is not None and first <= last:
+            requests = MaintenanceRequest.objects.filter(
+                id__gte=first, id__lt=first + chunk_size
+            )
+
+            increments = defaultdict(Counter)
+            for rows in (created_activity(requests), closed_activity(requests)):
+                for row in rows:
+                    key = (
+                        row.pop("day"),
+                        row.pop("company_id"),
+                        row.pop("department_id"),
+                        row.pop("assigned_team_id"),
+                    )
+                    increments[key] += Counter(row)
+
+            counted += sum(counts["created"] for counts in increments.values())
+            add_to_rollups(increments)
+            first += chunk_size
+
+    return counted
+
+
+def activity_report(rollups, group, interval):
+    """
+    Counters of ``rollups`` per ``interval`` period and ``group``, with
+    the completion rate of each.
+    """
+    key, name = ROLLUP_GROUPS[group]
+    rows = (
+        rollups.annotate(period=ROLLUP_INTERVALS[interval])
+        .values("period", key, name)
+        .annotate(**{f"total_{counter}": Sum(counter) for counter in ROLLUP_COUNTERS})
+        .order_by("period", key)
+    )
+
+    report = []
+    for row in rows:
+        entry = {
+            "period": row["period"],
+            "id": row[key],
+            "name": row[name],
+            **{counter: row[f"total_{counter}"] for counter in ROLLUP_COUNTERS},
+        }
+        entry["completion_rate"] = (
+            round(entry["completed"] / entry["created"], 4) if entry["created"] else None
+        )
+        report.append(entry)
+    return report
+
+
+def backlog(rollups, group, until):
+    """
+    Requests still open before ``until`` per ``group``: created minus
+    completed and cancelled, over every earlier day.
+    """
+    key, name = ROLLUP_GROUPS[group]
+    rows = (
+        rollups.filter(day__lt=until)
+        .values(key, name)
+        .annotate(open=Sum(F("created") - F("completed") - F("cancelled")))
+        .order_by(key)
+    )
+    return [
+        {"id": row[key], "name": row[name], "open": row["open"]}
+        for row in rows
+    ]
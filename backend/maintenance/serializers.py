@@ -1,8 +1,29 @@
+from datetime import timedelta
+
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 
-from .models import MaintenanceRequest, MaintenanceAssignment, MaintenanceWorkLog
-from core.models import MaintenanceTeam
+from . import events
+from .analytics import record_completion
+from .models import (
+    ACTIVE_STATUSES,
+    MaintenanceRequest,
+    MaintenanceAssignment,
+    MaintenanceWorkLog,
+)
+from .rollups import record_created
+from .services import (
+    BULK_BATCH_SIZE,
+    technician_schedule,
+    work_center_conflict,
+    work_center_schedule,
+)
+from accounts.models import User
+from core.exceptions import Conflict
+from core.models import Equipment, MaintenanceTeam, WorkCenter
+
+WORK_CENTER_FULL = "Work center is fully booked at this time."
 
 
 class MaintenanceRequestCreateSerializer(serializers.ModelSerializer):
@@ -51,7 +72,226 @@ class MaintenanceRequestCreateSerializer(serializers.ModelSerializer):
         validated_data["department"] = user.department
         validated_data["status"] = "scheduled"
 
-        return super().create(validated_data)
+        with transaction.atomic():
+            self.check_work_center(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            if instance.status in ACTIVE_STATUSES:
+                booking = {
+                    "work_center": instance.work_center,
+                    "scheduled_start": instance.scheduled_start,
+                    "duration_hours": instance.duration_hours,
+                    **validated_data,
+                }
+                self.check_work_center(booking, instance)
+            return super().update(instance, validated_data)
+
+    def check_work_center(self, data, instance=None):
+        """
+        Capacity re-check under a lock on the work center; technician
+        overlaps are enforced by the database constraint.
+        """
+        start = data["scheduled_start"]
+        booking = (
+            data["work_center"].id,
+            start,
+            MaintenanceRequest.end_of(start, data["duration_hours"]),
+        )
+        exclude_request = instance.id if instance is not None else None
+
+        if work_center_conflict([booking], exclude_request=exclude_request):
+            raise Conflict(WORK_CENTER_FULL, "work_center_full")
+
+
+class MaintenanceRequestBulkCreateSerializer(serializers.ListSerializer):
+    """
+    Validates a whole list of rows in one pass and writes it in one
+    transaction.
+
+    Relations are fetched with a few ``in_bulk`` queries and the
+    bookings of every referenced technician and work center with one
+    query each. Valid rows are booked into that snapshot, so rows of
+    the same payload cannot collide either. Errors are reported per row,
+    aligned with the input; nothing is written unless every row is valid.
+    """
+
+    relations = {
+        "equipment": Equipment,
+        "work_center": WorkCenter,
+        "assigned_team": MaintenanceTeam,
+        "assigned_technician": User,
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError("Expected a list of rows.")
+
+        rows, errors = [], []
+        for item in data:
+            try:
+                rows.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                rows.append(None)
+                errors.append(exc.detail)
+
+        self.validate_rows(rows, errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def load_relations(self, rows):
+        user = self.context["request"].user
+        valid = [row for row in rows if row is not None]
+
+        loaded = {}
+        for field, model in self.relations.items():
+            queryset = model.objects.all()
+            if model is User:
+                queryset = queryset.filter(role="technician")
+            loaded[field] = queryset.in_bulk(
+                {row[field] for row in valid if row.get(field)}
+            )
+
+        memberships = set(
+            MaintenanceTeam.members.through.objects.filter(
+                maintenanceteam_id__in=loaded["assigned_team"]
+            ).values_list("maintenanceteam_id", "user_id")
+        )
+
+        return user, loaded, memberships
+
+    def validate_rows(self, rows, errors):
+        user, loaded, memberships = self.load_relations(rows)
+
+        spans = [
+            (row["scheduled_start"],
+             row["scheduled_start"] + timedelta(hours=row["duration_hours"]))
+            for row in rows if row is not None
+        ]
+        if not spans:
+            return
+        start = min(span[0] for span in spans)
+        end = max(span[1] for span in spans)
+
+        technicians = technician_schedule(list(loaded["assigned_technician"]), start, end)
+        work_centers = work_center_schedule(list(loaded["work_center"]), start, end)
+
+        does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages[
+            "does_not_exist"
+        ]
+
+        for row, row_errors in zip(rows, errors):
+            if row is None:
+                continue
+
+            for field in self.relations:
+                pk = row.get(field)
+                if pk is None:
+                    continue
+                instance = loaded[field].get(pk)
+                if instance is None:
+                    row_errors[field] = [does_not_exist.format(pk_value=pk)]
+                elif field != "assigned_technician" and instance.company_id != user.company_id:
+                    row_errors[field] = ["Belongs to another company."]
+            if row_errors:
+                continue
+
+            row_start = row["scheduled_start"]
+            row_end = row_start + timedelta(hours=row["duration_hours"])
+            technician = row["assigned_technician"]
+            work_center = loaded["work_center"][row["work_center"]]
+
+            problems = []
+            team = row.get("assigned_team")
+            if team is not None and (team, technician) not in memberships:
+                problems.append("Technician is not a member of the assigned team.")
+            if not technicians.is_free(technician, row_start, row_end):
+                problems.append("Technician is already booked at this time.")
+            if not work_centers.is_free(
+                work_center.id, row_start, row_end, capacity=work_center.capacity
+            ):
+                problems.append(WORK_CENTER_FULL)
+
+            if problems:
+                row_errors["non_field_errors"] = problems
+                continue
+
+            technicians.book(technician, row_start, row_end)
+            work_centers.book(work_center.id, row_start, row_end)
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        ends = [
+            MaintenanceRequest.end_of(row["scheduled_start"], row["duration_hours"])
+            for row in validated_data
+        ]
+
+        requests = [
+            MaintenanceRequest(
+                title=row["title"],
+                description=row.get("description", ""),
+                maintenance_type=row["maintenance_type"],
+                priority=row.get("priority", "medium"),
+                status="scheduled",
+                equipment_id=row["equipment"],
+                work_center_id=row["work_center"],
+                assigned_team_id=row.get("assigned_team"),
+                assigned_technician_id=row["assigned_technician"],
+                scheduled_start=row["scheduled_start"],
+                duration_hours=row["duration_hours"],
+                scheduled_end=end,
+                created_by=user,
+                company=user.company,
+                department=user.department,
+            )
+            for row, end in zip(validated_data, ends)
+        ]
+
+        with transaction.atomic():
+            # Validation read a snapshot; re-check capacity under lock
+            if work_center_conflict([
+                (row["work_center"], row["scheduled_start"], end)
+                for row, end in zip(validated_data, ends)
+            ]):
+                raise Conflict(WORK_CENTER_FULL, "work_center_full")
+
+            MaintenanceRequest.objects.bulk_create(requests, batch_size=BULK_BATCH_SIZE)
+            record_created(requests)
+            events.request_created(requests)
+            MaintenanceAssignment.objects.bulk_create(
+                (
+                    MaintenanceAssignment(
+                        maintenance_request=request,
+                        assigned_team_id=request.assigned_team_id,
+                        assigned_technician_id=request.assigned_technician_id,
+                        assigned_by=user,
+                    )
+                    for request in requests
+                ),
+                batch_size=BULK_BATCH_SIZE,
+            )
+
+        return requests
+
+
+class MaintenanceRequestBulkRowSerializer(MaintenanceRequestCreateSerializer):
+    """
+    One row of a bulk create. Relations stay plain ids here; the list
+    serializer resolves them for every row at once.
+    """
+
+    equipment = serializers.IntegerField()
+    work_center = serializers.IntegerField()
+    assigned_team = serializers.IntegerField(required=False, allow_null=True)
+    assigned_technician = serializers.IntegerField()
+    duration_hours = serializers.IntegerField(min_value=1)
+
+    class Meta(MaintenanceRequestCreateSerializer.Meta):
+        list_serializer_class = MaintenanceRequestBulkCreateSerializer
 
 
 class MaintenanceRequestViewSerializer(serializers.ModelSerializer):
@@ -118,6 +358,8 @@ class MaintenanceReassignmentSerializer(serializers.Serializer):
         data["maintenance"] = maintenance
         return data
 
+    # One transaction, so a conflicting booking leaves nothing half-done
+    @transaction.atomic
     def save(self):
         request = self.context["request"]
         maintenance = self.validated_data["maintenance"]
@@ -138,7 +380,9 @@ class MaintenanceReassignmentSerializer(serializers.Serializer):
         technician = pick_technician_from_team(
             team=new_team,
             start=maintenance.scheduled_start,
-            duration=maintenance.duration_hours
+            duration=maintenance.duration_hours,
+            exclude_request=maintenance.id,
+            equipment=maintenance.equipment_id,
         )
 
         if not technician:
@@ -160,10 +404,13 @@ class MaintenanceReassignmentSerializer(serializers.Serializer):
         # -----------------------------
         # Update maintenance request
         # -----------------------------
+        previous_technician_id = maintenance.assigned_technician_id
+        previous_team_id = maintenance.assigned_team_id
         maintenance.assigned_team = new_team
         maintenance.assigned_technician = technician
         maintenance.priority = "critical"
         maintenance.save()
+        events.reassigned(maintenance, previous_technician_id, previous_team_id)
 
         return maintenance
 
@@ -200,6 +447,7 @@ class MaintenanceWorkLogCreateSerializer(serializers.ModelSerializer):
         data["maintenance"] = maintenance
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         maintenance = validated_data.pop("maintenance")
         validated_data.pop("maintenance_id", None)
@@ -218,6 +466,10 @@ class MaintenanceWorkLogCreateSerializer(serializers.ModelSerializer):
             maintenance.status = "completed"
 
         maintenance.save()
+        events.work_log_added(log, maintenance)
+
+        if log.status == "completed":
+            record_completion(maintenance, log.created_at)
 
         return log
     
@@ -1,22 +1,629 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
 from datetime import timedelta
-from django.db.models import Q
 
-from .models import MaintenanceRequest
+from django.conf import settings
+from django.utils import timezone
+from django.db.models import (
+    Count,
+    Max,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+
+from accounts.models import User
+from core.models import Equipment, MaintenanceTeam, WorkCenter
+from .models import (
+    ACTIVE_STATUSES,
+    MaintenanceAssignment,
+    MaintenanceRequest,
+    TsTzRange,
+)
+
+
+# Statuses whose hours count towards a technician's workload
+LOAD_STATUSES = ["scheduled", "in_progress", "completed"]
+
+ASSIGNMENT_POLICIES = ["least_loaded", "round_robin", "skill_weighted"]
+
+# Rows per INSERT for bulk writers
+BULK_BATCH_SIZE = 1000
+
+NO_TECHNICIAN = "No available technician in selected team"
+NO_WORK_CENTER = "No available work center"
+
+
+def visible_maintenance_requests(user, queryset=None):
+    """
+    Requests a user may see: admins see everything, technicians what is
+    assigned to them or to one of their teams, other users what they
+    created or what belongs to their department.
+
+    Team ids are read from the membership table first, so the filter is
+    an OR of two indexed FK lookups: no join through the M2M, and no
+    request is returned twice.
+    """
+    team_ids = None
+    if user.role == "technician":
+        team_ids = list(technician_team_ids(user))
+    return _visible(user, team_ids, queryset)
+
+
+async def avisible_maintenance_requests(user, queryset=None):
+    """
+    visible_maintenance_requests for async views.
+    """
+    team_ids = None
+    if user.role == "technician":
+        team_ids = [team_id async for team_id in technician_team_ids(user)]
+    return _visible(user, team_ids, queryset)
+
+
+def technician_team_ids(user):
+    return MaintenanceTeam.members.through.objects.filter(
+        user_id=user.id
+    ).values_list("maintenanceteam_id", flat=True)
+
+
+def _visible(user, team_ids, queryset):
+    if queryset is None:
+        queryset = MaintenanceRequest.objects.all()
+
+    if user.role == "admin":
+        return queryset
+
+    if user.role == "technician":
+        return queryset.filter(
+            Q(assigned_technician_id=user.id) | Q(assigned_team_id__in=team_ids)
+        )
+
+    visible = Q(created_by_id=user.id)
+    if user.department_id is not None:
+        visible |= Q(department_id=user.department_id)
+    return queryset.filter(visible)
+
+
+def overlapping_bookings(start, end):
+    """
+    Active bookings whose [scheduled_start, scheduled_end) window
+    intersects [start, end).
+    """
+    return MaintenanceRequest.objects.filter(
+        status__in=ACTIVE_STATUSES,
+        scheduled_start__lt=end,
+        scheduled_end__gt=start,
+    )
+
+
+def calendar_window(queryset, start, end):
+    """
+    Requests of ``queryset`` whose booked window overlaps [start, end),
+    matched with ``&&`` against the GiST index on their tstzrange. The
+    probe range is built in SQL too, so no driver range type is needed.
+    """
+    return queryset.annotate(
+        window=TsTzRange("scheduled_start", "scheduled_end")
+    ).filter(
+        scheduled_start__isnull=False,
+        window__overlap=TsTzRange(Value(start), Value(end)),
+    )
+
+
+class ScheduleIndex:
+    """
+    In-memory interval index of booked slots, keyed by resource id.
+
+    Slots are kept sorted by start next to a running maximum of their
+    end times, so an overlap probe is one bisect: the slots starting
+    before ``end`` form a prefix, and the window is free when the
+    largest end in that prefix is not after ``start``.
+    """
+
+    def __init__(self):
+        self._slots = defaultdict(list)
+        self._starts = {}
+        self._max_ends = {}
+        self._longest = {}
+        self._dirty = set()
+
+    @classmethod
+    def from_rows(cls, rows):
+        index = cls()
+        for key, start, end in rows:
+            index._slots[key].append((start, end))
+        for key in index._slots:
+            index._slots[key].sort()
+        index._dirty.update(index._slots)
+        return index
+
+    def book(self, key, start, end):
+        slots = self._slots[key]
+        if key in self._dirty or (slots and (start, end) < slots[-1]):
+            insort(slots, (start, end))
+            self._dirty.add(key)
+            return
+
+        # Booking in start order (batch schedulers) extends the index in place
+        if not slots:
+            self._starts[key] = []
+            self._max_ends[key] = []
+            self._longest[key] = end - start
+        max_ends = self._max_ends[key]
+        slots.append((start, end))
+        self._starts[key].append(start)
+        max_ends.append(end if not max_ends or end > max_ends[-1] else max_ends[-1])
+        self._longest[key] = max(self._longest[key], end - start)
+
+    def _reindex(self, key):
+        slots = self._slots[key]
+        max_ends = []
+        latest = None
+        for _, end in slots:
+            latest = end if latest is None or end > latest else latest
+            max_ends.append(latest)
+
+        self._starts[key] = [start for start, _ in slots]
+        self._max_ends[key] = max_ends
+        self._longest[key] = max(end - start for start, end in slots)
+        self._dirty.discard(key)
+
+    def overlaps(self, key, start, end):
+        if not self._slots.get(key):
+            return False
+        if key in self._dirty:
+            self._reindex(key)
+
+        position = bisect_left(self._starts[key], end)
+        return position > 0 and self._max_ends[key][position - 1] > start
+
+    def peak_load(self, key, start, end):
+        """
+        Largest number of slots running at the same time inside
+        [start, end), found with a sweep over the clipped endpoints.
+        """
+        if not self._slots.get(key):
+            return 0
+        if key in self._dirty:
+            self._reindex(key)
+
+        # Slots starting more than the longest booking before ``start``
+        # have ended by then, so only the tail of the prefix is swept
+        starts = self._starts[key]
+        first = bisect_left(starts, start - self._longest[key])
+        position = bisect_left(starts, end)
+        events = []
+        for slot_start, slot_end in self._slots[key][first:position]:
+            if slot_end > start:
+                events.append((max(slot_start, start), 1))
+                events.append((min(slot_end, end), -1))
+
+        # Ends sort before starts at the same instant: slots are half-open
+        events.sort()
+        load = peak = 0
+        for _, delta in events:
+            load += delta
+            peak = max(peak, load)
+        return peak
+
+    def is_free(self, key, start, end, capacity=1):
+        if capacity <= 1:
+            return not self.overlaps(key, start, end)
+        return self.peak_load(key, start, end) < capacity
+
+
+def _load_schedule(field, ids, start, end, exclude_request=None):
+    bookings = overlapping_bookings(start, end).filter(**{f"{field}__in": ids})
+    if exclude_request is not None:
+        bookings = bookings.exclude(id=exclude_request)
+
+    return ScheduleIndex.from_rows(
+        bookings.order_by().values_list(field, "scheduled_start", "scheduled_end")
+    )
+
+
+def technician_schedule(technician_ids, start, end, exclude_request=None):
+    """
+    Load every active booking of the given technicians that touches
+    [start, end) in a single query.
+    """
+    return _load_schedule(
+        "assigned_technician_id", technician_ids, start, end, exclude_request
+    )
+
+
+def work_center_schedule(work_center_ids, start, end, exclude_request=None):
+    """
+    Load every active booking of the given work centers that touches
+    [start, end) in a single query.
+    """
+    return _load_schedule(
+        "work_center_id", work_center_ids, start, end, exclude_request
+    )
+
+
+def work_center_conflict(bookings, exclude_request=None):
+    """
+    First of ``bookings`` — (work_center_id, start, end) — that does not
+    fit the capacity of its work center, or None.
+
+    The work centers are locked with SELECT ... FOR UPDATE (in id order)
+    before their bookings are read, so concurrent writers of the same
+    centers are serialised and cannot both take the last seat. Must run
+    inside the transaction that writes the bookings.
+    """
+    if not bookings:
+        return None
+
+    capacities = dict(
+        WorkCenter.objects.select_for_update()
+        .filter(id__in={work_center for work_center, _, _ in bookings})
+        .order_by("id")
+        .values_list("id", "capacity")
+    )
+    schedule = work_center_schedule(
+        list(capacities),
+        min(start for _, start, _ in bookings),
+        max(end for _, _, end in bookings),
+        exclude_request=exclude_request,
+    )
+
+    for booking in bookings:
+        work_center, start, end = booking
+        if not schedule.is_free(work_center, start, end, capacity=capacities[work_center]):
+            return booking
+        schedule.book(work_center, start, end)
+    return None
 
 
 def is_technician_available(technician, start, duration):
     end = start + timedelta(hours=duration)
 
-    return not MaintenanceRequest.objects.filter(
+    return not overlapping_bookings(start, end).filter(
         assigned_technician=technician,
-        scheduled_start__lt=end,
-        scheduled_start__gte=start,
-        status__in=["scheduled", "in_progress"],
     ).exists()
 
 
-def pick_technician_from_team(team, start, duration):
-    for technician in team.members.all():
-        if is_technician_available(technician, start, duration):
+def technician_scores(technician_ids, start, policy=None, equipment=None):
+    """
+    Ranking score per technician for an assignment ``policy``, computed
+    with one aggregate query. Lower scores are picked first.
+
+    - least_loaded: hours booked within the rolling load window
+    - round_robin: time of the technician's latest assignment
+    - skill_weighted: booked hours discounted by completed jobs on
+      equipment of the same category
+    """
+    policy = policy or settings.MAINTENANCE_ASSIGNMENT_POLICY
+    if policy not in ASSIGNMENT_POLICIES:
+        raise ValueError(f"Unknown assignment policy: {policy}")
+
+    if policy == "round_robin":
+        rows = (
+            MaintenanceAssignment.objects
+            .filter(assigned_technician_id__in=technician_ids)
+            .values("assigned_technician_id")
+            .annotate(last_assigned=Max("assigned_at"))
+            .order_by()
+        )
+        # Never assigned technicians go first
+        scores = dict.fromkeys(technician_ids, float("-inf"))
+        for row in rows:
+            scores[row["assigned_technician_id"]] = row["last_assigned"].timestamp()
+        return scores
+
+    window = timedelta(days=settings.MAINTENANCE_LOAD_WINDOW_DAYS)
+    in_window = Q(
+        status__in=LOAD_STATUSES,
+        scheduled_start__gte=start - window,
+        scheduled_start__lt=start + window,
+    )
+    relevant = in_window
+    annotations = {"booked_hours": Sum("duration_hours", filter=in_window)}
+
+    if policy == "skill_weighted" and equipment is not None:
+        same_category = Q(
+            status="completed",
+            equipment__category_id=Subquery(
+                Equipment.objects.filter(
+                    pk=getattr(equipment, "pk", equipment)
+                ).values("category_id")[:1]
+            ),
+        )
+        relevant |= same_category
+        annotations["experience"] = Count("id", filter=same_category)
+
+    rows = (
+        MaintenanceRequest.objects
+        .filter(relevant, assigned_technician_id__in=technician_ids)
+        .values("assigned_technician_id")
+        .annotate(**annotations)
+        .order_by()
+    )
+
+    scores = dict.fromkeys(technician_ids, 0)
+    for row in rows:
+        hours = row["booked_hours"] or 0
+        scores[row["assigned_technician_id"]] = hours / (1 + row.get("experience", 0))
+    return scores
+
+
+def technician_experience(technician_ids, equipment_ids):
+    """
+    Completed jobs per (technician, equipment category) over the
+    categories of ``equipment_ids``, and the category of every piece of
+    equipment, in two queries.
+    """
+    categories = dict(
+        Equipment.objects.filter(id__in=equipment_ids).values_list("id", "category_id")
+    )
+    rows = (
+        MaintenanceRequest.objects
+        .filter(
+            status="completed",
+            assigned_technician_id__in=technician_ids,
+            equipment__category_id__in=set(categories.values()) - {None},
+        )
+        .values_list("assigned_technician_id", "equipment__category_id")
+        .annotate(jobs=Count("id"))
+        .order_by()
+    )
+    return {(technician, category): jobs for technician, category, jobs in rows}, categories
+
+
+def select_technician(members, schedule, start, end, scores=None):
+    if scores is not None:
+        members = sorted(
+            members, key=lambda technician: (scores[technician.id], technician.id)
+        )
+
+    # Best ranked first, so the first free member wins
+    for technician in members:
+        if schedule.is_free(technician.id, start, end):
             return technician
-    return None
\ No newline at end of file
+    return None
+
+
+def pick_technician_from_team(
+    team,
+    start,
+    duration,
+    exclude_request=None,
+    policy=None,
+    equipment=None,
+):
+    end = start + timedelta(hours=duration)
+    members = list(team.members.order_by("id"))
+    technician_ids = [member.id for member in members]
+
+    schedule = technician_schedule(
+        technician_ids,
+        start,
+        end,
+        exclude_request=exclude_request,
+    )
+    scores = technician_scores(
+        technician_ids,
+        start,
+        policy=policy,
+        equipment=equipment,
+    )
+
+    return select_technician(members, schedule, start, end, scores=scores)
+
+
+def work_center_rank(work_center):
+    # Cheapest first, then the most efficient
+    return (work_center.cost_per_hour, -work_center.time_efficiency, work_center.id)
+
+
+class WorkCenterAllocator:
+    """
+    Capacity-aware work-center allocation for one company.
+
+    A work center is free while fewer than ``capacity`` bookings run
+    concurrently in the window. When the preferred center is full, its
+    ``alternative_work_centers`` are tried in ``work_center_rank`` order.
+    All bookings of the company's centers are loaded in one query.
+    """
+
+    def __init__(self, company, start, end, exclude_request=None):
+        self.work_centers = {
+            work_center.id: work_center
+            for work_center in WorkCenter.objects.filter(company=company)
+            .prefetch_related("alternative_work_centers")
+            .order_by("id")
+        }
+
+        work_center_ids = set(self.work_centers)
+        for work_center in self.work_centers.values():
+            work_center_ids.update(
+                alternative.id
+                for alternative in work_center.alternative_work_centers.all()
+            )
+
+        self.ranked = sorted(self.work_centers.values(), key=work_center_rank)
+        self._first_free = {}
+        self.schedule = work_center_schedule(
+            work_center_ids, start, end, exclude_request=exclude_request
+        )
+
+    def is_free(self, work_center, start, end):
+        return self.schedule.is_free(
+            work_center.id, start, end, capacity=work_center.capacity
+        )
+
+    def available(self, start, end):
+        return [
+            work_center
+            for work_center in self.work_centers.values()
+            if self.is_free(work_center, start, end)
+        ]
+
+    def choose(self, start, end, preferred=None):
+        main = self.work_centers.get(preferred)
+
+        if main is None:
+            return self._choose_ranked(start, end)
+        if self.is_free(main, start, end):
+            return main
+
+        candidates = sorted(main.alternative_work_centers.all(), key=work_center_rank)
+        for work_center in candidates:
+            if self.is_free(work_center, start, end):
+                return work_center
+        return None
+
+    def _choose_ranked(self, start, end):
+        # Bookings only add load, so centers once full for this exact
+        # window are skipped on the next call
+        position = self._first_free.get((start, end), 0)
+        while position < len(self.ranked):
+            work_center = self.ranked[position]
+            if self.is_free(work_center, start, end):
+                break
+            position += 1
+        self._first_free[(start, end)] = position
+        return self.ranked[position] if position < len(self.ranked) else None
+
+    def book(self, work_center, start, end):
+        self.schedule.book(work_center.id, start, end)
+
+
+class SlotAllocator:
+    """
+    Resolves many slot requests against one preloaded schedule snapshot.
+
+    Teams, members, bookings, workload scores and work centers are
+    loaded once for the whole batch. Every assignment is booked back
+    into the snapshot, so later slots of the same batch never receive a
+    technician or work center that is already taken at that time.
+
+    Each slot is a dict with ``team`` (id), ``start``, ``end``, an
+    optional preferred ``work_center`` (id) and, for skill_weighted, its
+    ``equipment`` (id). ``window`` widens the snapshot when slots may be
+    moved past the span of ``slots``.
+    """
+
+    def __init__(self, company, slots, policy=None, window=None):
+        self.policy = policy or settings.MAINTENANCE_ASSIGNMENT_POLICY
+
+        team_ids = {slot["team"] for slot in slots}
+        self.teams = MaintenanceTeam.objects.prefetch_related(
+            Prefetch("members", queryset=User.objects.order_by("id"))
+        ).in_bulk(team_ids)
+
+        technician_ids = sorted({
+            member.id
+            for team in self.teams.values()
+            for member in team.members.all()
+        })
+
+        # Snapshot window covering every slot of the batch
+        if window is not None:
+            start, end = window
+        else:
+            start = min((slot["start"] for slot in slots), default=None)
+            end = max((slot["end"] for slot in slots), default=None)
+        if start is None:
+            start = end = timezone.now()
+
+        self.technician_schedule = technician_schedule(technician_ids, start, end)
+        self.work_centers = WorkCenterAllocator(company, start, end)
+
+        # skill_weighted divides booked hours by experience on the slot's
+        # equipment category, so hours and experience are kept apart and
+        # combined per slot
+        self.experience, self.categories = {}, {}
+        if self.policy == "skill_weighted":
+            self.scores = technician_scores(technician_ids, start, policy="least_loaded")
+            self.experience, self.categories = technician_experience(
+                technician_ids,
+                {slot["equipment"] for slot in slots if slot.get("equipment") is not None},
+            )
+        else:
+            self.scores = technician_scores(technician_ids, start, policy=self.policy)
+        # Round-robin turn counter, past every recorded assignment
+        self._turn = max(
+            (score for score in self.scores.values() if score != float("-inf")),
+            default=0,
+        )
+
+        # Members of every team (and category, for skill_weighted) kept
+        # sorted by (score, id), re-ranked in place on each booking
+        # instead of sorted per slot
+        self._rankings = {}
+        self._rankings_of = defaultdict(list)
+
+    def _score(self, technician_id, category):
+        score = self.scores[technician_id]
+        if self.policy == "skill_weighted":
+            score /= 1 + self.experience.get((technician_id, category), 0)
+        return score
+
+    def _ranking(self, team, slot):
+        category = None
+        if self.policy == "skill_weighted":
+            category = self.categories.get(slot.get("equipment"))
+
+        key = (team.id, category)
+        if key not in self._rankings:
+            self._rankings[key] = sorted(
+                (self._score(member.id, category), member.id, member)
+                for member in team.members.all()
+            )
+            for member in team.members.all():
+                self._rankings_of[member.id].append(key)
+        return self._rankings[key]
+
+    def _rescore(self, technician, score):
+        previous = {
+            key: (self._score(technician.id, key[1]), technician.id)
+            for key in self._rankings_of[technician.id]
+        }
+        self.scores[technician.id] = score
+        for key, entry in previous.items():
+            ranking = self._rankings[key]
+            del ranking[bisect_left(ranking, entry)]
+            insort(ranking, (self._score(technician.id, key[1]), technician.id, technician))
+
+    def _book(self, technician, work_center, slot):
+        start, end = slot["start"], slot["end"]
+        self.technician_schedule.book(technician.id, start, end)
+        self.work_centers.book(work_center, start, end)
+
+        # Keep the ranking honest for the rest of the batch
+        if self.policy == "round_robin":
+            self._turn += 1
+            self._rescore(technician, self._turn)
+        else:
+            hours = (end - start).total_seconds() / 3600
+            self._rescore(technician, self.scores[technician.id] + hours)
+
+    def allocate(self, slot):
+        """
+        Returns ``(technician, work_center, error)`` for one slot.
+        """
+        team = self.teams.get(slot["team"])
+        if team is None:
+            return None, None, "Invalid maintenance team"
+
+        technician = select_technician(
+            (member for _, _, member in self._ranking(team, slot)),
+            self.technician_schedule,
+            slot["start"],
+            slot["end"],
+        )
+        if technician is None:
+            return None, None, NO_TECHNICIAN
+
+        work_center = self.work_centers.choose(
+            slot["start"], slot["end"], preferred=slot.get("work_center")
+        )
+        if work_center is None:
+            return None, None, NO_WORK_CENTER
+
+        self._book(technician, work_center, slot)
+        return technician, work_center, None
@@ -0,0 +1,66 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_init, post_save
+
+from . import events
+from .models import MaintenanceRequest
+from .rollups import apply_changes, request_changes
+
+
+def remember_status(sender, instance, **kwargs):
+    # Left out of __dict__ when the field is deferred
+    instance._rollup_status = instance.__dict__.get("status")
+    instance._rollup_department = instance.__dict__.get("department_id", DEFERRED)
+    instance._rollup_team = instance.__dict__.get("assigned_team_id", DEFERRED)
+    instance._rollup_duration = instance.__dict__.get("duration_hours", DEFERRED)
+
+
+def publish_changes(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        events.request_created([instance])
+        return
+
+    previous = instance._rollup_status
+    if previous is not None and previous != instance.status:
+        events.status_changed(instance, previous)
+
+
+def count_activity(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = instance._rollup_status
+    if previous is None:
+        # Status was never loaded, so it cannot have changed here
+        previous = instance.status
+
+    # Nor can other fields that were never loaded
+    remembered = [
+        (instance._rollup_department, instance.department_id),
+        (instance._rollup_team, instance.assigned_team_id),
+        (instance._rollup_duration, instance.duration_hours),
+    ]
+    previous = (previous, *(
+        current if value is DEFERRED else value for value, current in remembered
+    ))
+
+    apply_changes(request_changes(instance, previous, created=created))
+    instance._rollup_status = instance.status
+    instance._rollup_department = instance.department_id
+    instance._rollup_team = instance.assigned_team_id
+    instance._rollup_duration = instance.duration_hours
+
+
+def connect():
+    post_init.connect(
+        remember_status, sender=MaintenanceRequest, dispatch_uid="rollup-status"
+    )
+    # Before count_activity, which moves the remembered status forward
+    post_save.connect(
+        publish_changes, sender=MaintenanceRequest, dispatch_uid="request-events"
+    )
+    post_save.connect(
+        count_activity, sender=MaintenanceRequest, dispatch_uid="rollup-activity"
+    )
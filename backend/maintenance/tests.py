@@ -1,5 +1,11 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, override_settings
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
 from datetime import timedelta
 
@@ -12,13 +18,40 @@ from core.models import (
     WorkCenter,
     MaintenanceTeam,
 )
+from maintenance.async_views import (
+    AsyncMaintenanceRequestListView,
+    AsyncMaintenanceWorkLogListView,
+    MaintenanceEventStreamView,
+)
+from maintenance.events import (
+    RESYNC,
+    STATUS_CHANGED,
+    InProcessBroker,
+    get_broker,
+    request_event,
+    user_channels,
+)
+from maintenance.views import MaintenanceRequestViewSet
 from maintenance.models import (
+    MaintenanceDailyRollup,
+    MaintenanceKpiRollup,
     MaintenanceRequest,
     MaintenanceAssignment,
     MaintenanceWorkLog,
 )
 
 
+class RecordingBroker(InProcessBroker):
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, channels, event):
+        self.published.append((channels, event))
+        super().publish(channels, event)
+
+
 class MaintenanceFlowTestCase(APITestCase):
 
     def setUp(self):
@@ -277,17 +310,17 @@ class MaintenanceFlowTestCase(APITestCase):
         # Technician sees it
         self.client.force_authenticate(user=self.tech1)
         response = self.client.get("/api/maintenance/")
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
         # User sees it
         self.client.force_authenticate(user=self.user)
         response = self.client.get("/api/maintenance/")
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
         # Admin sees it
         self.client.force_authenticate(user=self.admin)
         response = self.client.get("/api/maintenance/")
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     # =====================================================
     # 6️⃣ View Work Log Timeline
@@ -404,4 +437,1471 @@ class MaintenanceFlowTestCase(APITestCase):
             format="json"
         )
 
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # =====================================================
+    # 9️⃣ Overlap Detection & Schedule Index
+    # =====================================================
+
+    def _technician(self, email):
+        return User.objects.create_user(
+            email=email, password="tech123", role="technician", company=self.company
+        )
+
+    def _book(self, technician, start, duration, **extra):
+        return MaintenanceRequest.objects.create(
+            title="Booked Slot",
+            maintenance_type="corrective",
+            priority=extra.pop("priority", "medium"),
+            status=extra.pop("status", "scheduled"),
+            equipment=self.equipment,
+            work_center=extra.pop("work_center", self.work_center),
+            assigned_team=extra.pop("team", self.team1),
+            assigned_technician=technician,
+            scheduled_start=start,
+            duration_hours=duration,
+            company=self.company,
+            department=self.department,
+            created_by=self.user,
+            **extra
+        )
+
+    def test_availability_detects_booking_started_before_window(self):
+        # Booked 1h before the requested window and still running in it
+        self._book(self.tech1, self.start_time - timedelta(hours=1), 3)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/availability/",
+            {
+                "equipment": self.equipment.id,
+                "maintenance_team": self.team1.id,
+                "scheduled_start": self.start_time.isoformat(),
+                "duration_hours": 2
+            },
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_availability_accepts_naive_start(self):
+        # The web client posts datetime-local values, without an offset
+        self.team1.members.add(self.tech2)
+        self._book(self.tech1, self.start_time - timedelta(hours=1), 3)
+        naive = timezone.make_naive(self.start_time).isoformat(timespec="minutes")
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/availability/",
+            {
+                "equipment": self.equipment.id,
+                "maintenance_team": self.team1.id,
+                "scheduled_start": naive,
+                "duration_hours": 2
+            },
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assigned_technician"]["id"], self.tech2.id)
+
+        response = self.client.post(
+            "/api/maintenance/availability/",
+            {
+                "equipment": self.equipment.id,
+                "maintenance_team": self.team1.id,
+                "scheduled_start": "next tuesday",
+                "duration_hours": 2
+            },
+            format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(MAINTENANCE_ASSIGNMENT_POLICY="skill_weighted")
+    def test_availability_rejects_non_numeric_ids(self):
+        self.client.force_authenticate(user=self.user)
+        for field in ["equipment", "maintenance_team"]:
+            payload = {
+                "equipment": self.equipment.id,
+                "maintenance_team": self.team1.id,
+                "scheduled_start": self.start_time.isoformat(),
+                "duration_hours": 2,
+            }
+            payload[field] = "pump"
+            response = self.client.post(
+                "/api/maintenance/availability/", payload, format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, field)
+
+    def test_pick_technician_uses_single_schedule_query(self):
+        from maintenance.services import pick_technician_from_team
+
+        self.team1.members.add(self.tech2)
+        self._book(self.tech2, self.start_time - timedelta(hours=1), 2)
+
+        # members + bookings + workload scores, whatever the team size
+        with self.assertNumQueries(3):
+            technician = pick_technician_from_team(
+                self.team1, self.start_time, 2
+            )
+
+        self.assertEqual(technician, self.tech1)
+
+        # Back-to-back booking ending exactly at start does not clash
+        with self.assertNumQueries(3):
+            technician = pick_technician_from_team(
+                self.team1, self.start_time + timedelta(hours=1), 2,
+                policy="round_robin",
+            )
+
+        self.assertEqual(technician, self.tech1)
+
+    # =====================================================
+    # 🔟 Load-Balanced Technician Selection
+    # =====================================================
+
+    def test_least_loaded_policy_prefers_idle_technician(self):
+        from maintenance.services import pick_technician_from_team
+
+        self.team1.members.add(self.tech2)
+        # tech1 (lowest id) already carries work later in the week
+        self._book(self.tech1, self.start_time + timedelta(days=2), 6)
+
+        technician = pick_technician_from_team(
+            self.team1, self.start_time, 2, policy="least_loaded"
+        )
+        self.assertEqual(technician, self.tech2)
+
+    def test_round_robin_policy_prefers_longest_idle(self):
+        from maintenance.services import pick_technician_from_team
+
+        self.team1.members.add(self.tech2)
+        maintenance = self._book(self.tech1, self.start_time + timedelta(days=2), 2)
+        MaintenanceAssignment.objects.create(
+            maintenance_request=maintenance,
+            assigned_team=self.team1,
+            assigned_technician=self.tech1,
+            assigned_by=self.admin,
+        )
+
+        technician = pick_technician_from_team(
+            self.team1, self.start_time, 2, policy="round_robin"
+        )
+        self.assertEqual(technician, self.tech2)
+
+    def test_skill_weighted_policy_prefers_experience(self):
+        from maintenance.services import pick_technician_from_team
+
+        self.team1.members.add(self.tech2)
+        # Equal load, but tech2 has completed CNC jobs before
+        self._book(self.tech1, self.start_time + timedelta(days=2), 4)
+        self._book(self.tech2, self.start_time + timedelta(days=3), 4)
+        for _ in range(3):
+            self._book(
+                self.tech2,
+                self.start_time - timedelta(days=30),
+                1,
+                status="completed",
+            )
+
+        technician = pick_technician_from_team(
+            self.team1,
+            self.start_time,
+            2,
+            policy="skill_weighted",
+            equipment=self.equipment,
+        )
+        self.assertEqual(technician, self.tech2)
+
+    # =====================================================
+    # 1️⃣1️⃣ Batch Availability
+    # =====================================================
+
+    def _batch_slots(self, count, team=None):
+        return [
+            {
+                "equipment": self.equipment.id,
+                "maintenance_team": (team or self.team1).id,
+                "scheduled_start": self.start_time.isoformat(),
+                "duration_hours": 2,
+            }
+            for _ in range(count)
+        ]
+
+    def test_batch_availability_never_double_books(self):
+        self.team1.members.add(self.tech2)
+        second_center = WorkCenter.objects.create(
+            name="Assembly Line B",
+            code="ASM-B",
+            company=self.company,
+            cost_per_hour=400,
+            capacity=1,
+            time_efficiency=80,
+            oee_target=90
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/availability/",
+            {"slots": self._batch_slots(3)},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second, third = response.data["assignments"]
+
+        self.assertEqual(
+            {first["assigned_technician"]["id"], second["assigned_technician"]["id"]},
+            {self.tech1.id, self.tech2.id},
+        )
+        self.assertEqual(
+            {first["work_center"]["id"], second["work_center"]["id"]},
+            {self.work_center.id, second_center.id},
+        )
+        # Both technicians are taken by the first two jobs
+        self.assertIn("error", third)
+
+    def test_batch_availability_mixes_naive_and_aware_starts(self):
+        self.team1.members.add(self.tech2)
+        self._book(self.tech1, self.start_time - timedelta(hours=1), 3)
+        slots = self._batch_slots(3)
+        slots[0]["scheduled_start"] = timezone.make_naive(self.start_time).isoformat()
+        slots[2]["scheduled_start"] = "soon"
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/availability/",
+            {"slots": slots},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        naive, aware, invalid = response.data["assignments"]
+        self.assertEqual(naive["assigned_technician"]["id"], self.tech2.id)
+        self.assertEqual(naive["scheduled_start"], self.start_time)
+        # tech1 is booked and tech2 was taken by the first slot
+        self.assertIn("error", aware)
+        self.assertEqual(invalid["error"], "Invalid slot values")
+
+    @override_settings(MAINTENANCE_ASSIGNMENT_POLICY="skill_weighted")
+    def test_batch_availability_weighs_skill_per_slot(self):
+        self.team1.members.add(self.tech2)
+        # Equal load, but tech2 has completed three CNC jobs
+        self._book(self.tech1, self.start_time + timedelta(days=2), 4)
+        self._book(self.tech2, self.start_time + timedelta(days=3), 4)
+        for _ in range(3):
+            self._book(
+                self.tech2, self.start_time - timedelta(days=30), 1, status="completed"
+            )
+
+        slots = self._batch_slots(3)
+        for number, slot in enumerate(slots):
+            slot["scheduled_start"] = (self.start_time + timedelta(hours=3 * number)).isoformat()
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/availability/",
+            {"slots": slots},
+            format="json"
+        )
+
+        # Booked hours stay discounted by experience: 4/4, 6/4, 8/4 < 4
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["assigned_technician"]["id"] for row in response.data["assignments"]],
+            [self.tech2.id] * 3,
+        )
+
+    def test_batch_availability_query_count_is_flat(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.team1.members.add(self.tech2)
+        self.client.force_authenticate(user=self.user)
+
+        counts = []
+        for size in (1, 10):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    "/api/maintenance/availability/",
+                    {"slots": self._batch_slots(size) + self._batch_slots(size, self.team2)},
+                    format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    # =====================================================
+    # 1️⃣2️⃣ Capacity-Aware Work Centers
+    # =====================================================
+
+    def _availability(self, **extra):
+        self.client.force_authenticate(user=self.user)
+        return self.client.post(
+            "/api/maintenance/availability/",
+            {
+                "equipment": self.equipment.id,
+                "maintenance_team": self.team2.id,
+                "scheduled_start": self.start_time.isoformat(),
+                "duration_hours": 2,
+                **extra
+            },
+            format="json"
+        )
+
+    def test_work_center_available_until_capacity_is_reached(self):
+        # capacity=2: one overlapping job leaves room for another
+        self._book(self.tech1, self.start_time - timedelta(hours=1), 2)
+        response = self._availability()
+        self.assertEqual(
+            [wc["id"] for wc in response.data["available_work_centers"]],
+            [self.work_center.id],
+        )
+
+        # Second job overlaps the first between 00:30 and 01:00
+        self._book(self._technician("tech3@test.com"), self.start_time + timedelta(minutes=30), 2)
+        response = self._availability()
+        self.assertEqual(response.data["available_work_centers"], [])
+
+    def test_sequential_jobs_do_not_count_as_concurrent(self):
+        self._book(self.tech1, self.start_time - timedelta(hours=1), 1)
+        self._book(self.tech1, self.start_time + timedelta(minutes=30), 1)
+        self._book(self.tech2, self.start_time + timedelta(hours=1), 1, team=self.team2)
+
+        # Peak concurrency is 2 only between 01:00 and 01:30
+        response = self._availability(duration_hours=1)
+        self.assertEqual(len(response.data["available_work_centers"]), 1)
+
+    def test_full_work_center_falls_back_to_ranked_alternative(self):
+        expensive = WorkCenter.objects.create(
+            name="Backup Line", code="BKP", company=self.company,
+            cost_per_hour=900, capacity=1, time_efficiency=99, oee_target=90
+        )
+        cheap = WorkCenter.objects.create(
+            name="Spare Line", code="SPR", company=self.company,
+            cost_per_hour=300, capacity=1, time_efficiency=70, oee_target=90
+        )
+        self.work_center.alternative_work_centers.add(expensive, cheap)
+
+        self._book(self.tech1, self.start_time, 2)
+        self._book(self._technician("tech3@test.com"), self.start_time, 2)
+
+        response = self._availability(work_center=self.work_center.id)
+        self.assertEqual(response.data["suggested_work_center"]["id"], cheap.id)
+
+        self._book(self._technician("tech4@test.com"), self.start_time, 2, work_center=cheap)
+        response = self._availability(work_center=self.work_center.id)
+        self.assertEqual(response.data["suggested_work_center"]["id"], expensive.id)
+
+    # =====================================================
+    # 1️⃣3️⃣ Query Count Must Not Grow With Rows
+    # =====================================================
+
+    def _count_queries(self, user, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_list_query_count_is_independent_of_row_count(self):
+        first = self._book(self.tech1, self.start_time, 1)
+        MaintenanceWorkLog.objects.create(
+            maintenance_request=first, technician=self.tech1,
+            note="Started", status="in_progress"
+        )
+
+        endpoints = [
+            (self.admin, "/api/maintenance/"),
+            (self.tech1, "/api/maintenance/"),
+            (self.user, "/api/maintenance/"),
+            (self.admin, f"/api/maintenance/{first.id}/"),
+            (self.tech1, f"/api/maintenance/{first.id}/worklogs/"),
+        ]
+        baseline = [self._count_queries(user, url) for user, url in endpoints]
+
+        other_center = WorkCenter.objects.create(
+            name="Paint Shop", code="PNT", company=self.company,
+            cost_per_hour=200, capacity=5, time_efficiency=80, oee_target=85
+        )
+        for offset in range(1, 6):
+            self._book(
+                self.tech2 if offset % 2 else self.tech1,
+                self.start_time + timedelta(days=offset),
+                1,
+                team=self.team2 if offset % 2 else self.team1,
+                work_center=other_center,
+            )
+            MaintenanceWorkLog.objects.create(
+                maintenance_request=first, technician=self.tech2,
+                note=f"Update {offset}", status="in_progress"
+            )
+
+        grown = [self._count_queries(user, url) for user, url in endpoints]
+        self.assertEqual(baseline, grown)
+
+    # =====================================================
+    # 1️⃣4️⃣ Cursor Pagination
+    # =====================================================
+
+    def test_cursor_pages_stay_stable_while_rows_are_inserted(self):
+        for offset in range(5):
+            self._book(self.tech1, self.start_time + timedelta(days=offset), 1)
+
+        self.client.force_authenticate(user=self.admin)
+        page = self.client.get("/api/maintenance/?page_size=2").data
+        seen = [row["id"] for row in page["results"]]
+
+        # A new row lands at the head of the list mid-iteration
+        self._book(self.tech1, self.start_time + timedelta(days=9), 1)
+
+        while page["next"]:
+            page = self.client.get(page["next"]).data
+            seen += [row["id"] for row in page["results"]]
+
+        expected = list(
+            MaintenanceRequest.objects.order_by("-created_at", "-id")
+            .values_list("id", flat=True)[1:]
+        )
+        self.assertEqual(seen, expected)
+
+    def test_page_size_is_capped(self):
+        from unittest import mock
+        from core.pagination import CreatedAtCursorPagination
+
+        for offset in range(3):
+            self._book(self.tech1, self.start_time + timedelta(days=offset), 1)
+
+        self.client.force_authenticate(user=self.admin)
+        with mock.patch.object(CreatedAtCursorPagination, "max_page_size", 2):
+            response = self.client.get("/api/maintenance/?page_size=100000")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    # =====================================================
+    # 1️⃣5️⃣ Technician Visibility Without Duplicates
+    # =====================================================
+
+    def test_technician_sees_each_request_once(self):
+        # Assigned to tech1 directly AND through a multi-member team
+        self.team1.members.add(self.tech2)
+        maintenance = self._book(self.tech1, self.start_time, 1)
+
+        self.client.force_authenticate(user=self.tech1)
+        response = self.client.get("/api/maintenance/")
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [maintenance.id],
+        )
+
+        # tech2 sees it through team1 only
+        self.client.force_authenticate(user=self.tech2)
+        response = self.client.get("/api/maintenance/")
+        self.assertEqual(len(response.data["results"]), 1)
+
+    # =====================================================
+    # 1️⃣6️⃣ Preventive Maintenance Scheduler
+    # =====================================================
+
+    def _asset(self, serial, last_service=None, interval=30, **extra):
+        return Equipment.objects.create(
+            name=f"Asset {serial}",
+            serial_number=serial,
+            company=self.company,
+            category=self.category,
+            department=self.department,
+            last_maintenance_service_date=last_service,
+            maintenance_interval_days=interval,
+            **extra,
+        )
+
+    def test_preventive_scheduler_creates_due_jobs(self):
+        from maintenance.preventive import schedule_preventive_maintenance
+
+        today = timezone.localdate()
+        due = self._asset("PM-DUE", last_service=today - timedelta(days=30))
+        self._asset("PM-LATER", last_service=today, interval=90)
+        self._asset("PM-NONE", last_service=today - timedelta(days=400), interval=None)
+        busy = self._asset("PM-BUSY", last_service=today - timedelta(days=60))
+        MaintenanceRequest.objects.create(
+            title="Open preventive",
+            maintenance_type="preventive",
+            equipment=busy,
+            work_center=self.work_center,
+            company=self.company,
+            created_by=self.admin,
+        )
+
+        summary = schedule_preventive_maintenance(self.admin, today=today)
+        self.assertEqual(summary, {"due": 1, "scheduled": 1, "unassigned": 0})
+
+        job = MaintenanceRequest.objects.get(equipment=due)
+        self.assertEqual(job.maintenance_type, "preventive")
+        self.assertEqual(job.status, "scheduled")
+        # The category's default technician and their team
+        self.assertEqual(job.assigned_technician, self.tech1)
+        self.assertEqual(job.assigned_team, self.team1)
+        self.assertEqual(job.work_center, self.work_center)
+        self.assertEqual(job.scheduled_start.date(), today + timedelta(days=1))
+        self.assertEqual(job.scheduled_start.hour, 9)
+        self.assertTrue(
+            MaintenanceAssignment.objects.filter(
+                maintenance_request=job, assigned_technician=self.tech1
+            ).exists()
+        )
+
+        # The open job now holds the asset back
+        summary = schedule_preventive_maintenance(self.admin, today=today)
+        self.assertEqual(summary["due"], 0)
+
+    def test_preventive_jobs_never_double_book(self):
+        from maintenance.preventive import schedule_preventive_maintenance
+
+        today = timezone.localdate()
+        for i in range(3):
+            self._asset(f"PM-{i}", last_service=today - timedelta(days=30))
+
+        schedule_preventive_maintenance(self.admin, today=today)
+
+        jobs = list(
+            MaintenanceRequest.objects.filter(maintenance_type="preventive")
+            .order_by("scheduled_start")
+        )
+        self.assertEqual(len(jobs), 3)
+        self.assertEqual({job.assigned_technician_id for job in jobs}, {self.tech1.id})
+        self.assertEqual([job.scheduled_start.hour for job in jobs], [9, 11, 13])
+
+    def test_preventive_scheduler_query_count_is_flat(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from maintenance.preventive import schedule_preventive_maintenance
+
+        today = timezone.localdate()
+        counts = []
+        for size in (2, 20):
+            for i in range(size):
+                self._asset(f"PM-{size}-{i}", last_service=today - timedelta(days=30))
+
+            with CaptureQueriesContext(connection) as captured:
+                summary = schedule_preventive_maintenance(self.admin, today=today)
+            self.assertEqual(summary["scheduled"], size)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_preventive_command_dry_run(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self._asset("PM-DRY", last_service=timezone.localdate() - timedelta(days=30))
+
+        out = StringIO()
+        call_command("schedule_preventive_maintenance", "--dry-run", stdout=out)
+
+        self.assertIn("Planned 1 of 1 due assets", out.getvalue())
+        self.assertFalse(
+            MaintenanceRequest.objects.filter(maintenance_type="preventive").exists()
+        )
+
+    def test_preventive_scheduler_replans_after_concurrent_booking(self):
+        from datetime import datetime, time
+        from unittest import mock
+        from maintenance import preventive
+
+        today = timezone.localdate()
+        due = self._asset("PM-RACE", last_service=today - timedelta(days=30))
+        nine = timezone.make_aware(datetime.combine(today + timedelta(days=1), time(9)))
+
+        write_jobs = preventive.write_jobs
+
+        def booked_meanwhile(requests, created_by):
+            # Another writer takes tech1 at 09:00 after the first plan
+            if not MaintenanceRequest.objects.filter(title="Booked Slot").exists():
+                self._book(self.tech1, nine, 2)
+            return write_jobs(requests, created_by)
+
+        with mock.patch.object(preventive, "write_jobs", side_effect=booked_meanwhile):
+            summary = preventive.schedule_preventive_maintenance(self.admin, today=today)
+
+        self.assertEqual(summary["scheduled"], 1)
+        job = MaintenanceRequest.objects.get(equipment=due)
+        self.assertEqual(job.assigned_technician, self.tech1)
+        self.assertEqual(job.scheduled_start, nine + timedelta(hours=2))
+
+    def test_preventive_scheduler_gives_up_after_repeated_conflicts(self):
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import CommandError, call_command
+        from maintenance import preventive
+
+        self._asset("PM-FULL", last_service=timezone.localdate() - timedelta(days=30))
+
+        with mock.patch.object(
+            preventive, "work_center_conflict", side_effect=lambda bookings: bookings[0]
+        ) as check:
+            with self.assertRaises(CommandError):
+                call_command("schedule_preventive_maintenance", stdout=StringIO())
+
+        self.assertEqual(check.call_count, preventive.PLAN_ATTEMPTS)
+        self.assertFalse(
+            MaintenanceRequest.objects.filter(maintenance_type="preventive").exists()
+        )
+
+    # =====================================================
+    # 1️⃣7️⃣ Bulk Create
+    # =====================================================
+
+    def _bulk_row(self, technician, start, duration=1, **extra):
+        row = {
+            "title": "Shutdown job",
+            "maintenance_type": "preventive",
+            "equipment": self.equipment.id,
+            "work_center": self.work_center.id,
+            "assigned_team": self.team1.id,
+            "assigned_technician": technician.id,
+            "scheduled_start": start.isoformat(),
+            "duration_hours": duration,
+        }
+        row.update(extra)
+        return row
+
+    def test_bulk_create_writes_requests_and_assignments(self):
+        self.client.force_authenticate(user=self.user)
+
+        rows = [
+            self._bulk_row(self.tech1, self.start_time + timedelta(hours=2 * i))
+            for i in range(5)
+        ]
+        response = self.client.post("/api/maintenance/", rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 5)
+
+        created = MaintenanceRequest.objects.filter(id__in=response.data["ids"])
+        self.assertEqual(created.count(), 5)
+        self.assertFalse(created.exclude(status="scheduled").exists())
+        self.assertFalse(created.exclude(created_by=self.user).exists())
+        self.assertEqual(
+            MaintenanceAssignment.objects.filter(
+                maintenance_request__in=created,
+                assigned_technician=self.tech1,
+                assigned_by=self.user,
+            ).count(),
+            5,
+        )
+
+    def test_bulk_create_reports_errors_per_row_and_writes_nothing(self):
+        self._book(self.tech2, self.start_time, 2, team=self.team2)
+        self.client.force_authenticate(user=self.user)
+
+        rows = [
+            self._bulk_row(self.tech1, self.start_time),
+            # Same technician, overlapping the row above
+            self._bulk_row(self.tech1, self.start_time + timedelta(minutes=30)),
+            self._bulk_row(self.tech1, self.start_time, equipment=999999),
+            # tech2 is busy and is not in team1
+            self._bulk_row(self.tech2, self.start_time),
+            self._bulk_row(self.tech1, self.start_time, title=""),
+        ]
+        response = self.client.post("/api/maintenance/", rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error["index"]: error for error in response.data["errors"]}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertIn("non_field_errors", errors[1])
+        self.assertIn("equipment", errors[2])
+        self.assertIn(
+            "Technician is not a member of the assigned team.",
+            errors[3]["non_field_errors"],
+        )
+        self.assertIn(
+            "Technician is already booked at this time.",
+            errors[3]["non_field_errors"],
+        )
+        self.assertIn("title", errors[4])
+
+        self.assertEqual(MaintenanceRequest.objects.count(), 1)
+
+    def test_bulk_create_query_count_is_flat(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_authenticate(user=self.user)
+
+        counts = []
+        for offset, size in ((0, 3), (100, 30)):
+            rows = [
+                self._bulk_row(
+                    self.tech1, self.start_time + timedelta(hours=2 * (offset + i))
+                )
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.post("/api/maintenance/", rows, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
+
+    # =====================================================
+    # 1️⃣8️⃣ Streaming History Export
+    # =====================================================
+
+    def _export(self, query=""):
+        response = self.client.get(f"/api/maintenance/export/{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson_nests_logs_and_assignments(self):
+        import json
+
+        maintenance = self._book(self.tech1, self.start_time, 2)
+        MaintenanceAssignment.objects.create(
+            maintenance_request=maintenance,
+            assigned_team=self.team1,
+            assigned_technician=self.tech1,
+            assigned_by=self.admin,
+        )
+        MaintenanceWorkLog.objects.create(
+            maintenance_request=maintenance,
+            technician=self.tech1,
+            note="Started",
+            status="in_progress",
+        )
+        self._book(self.tech2, self.start_time, 1, team=self.team2)
+
+        self.client.force_authenticate(user=self.admin)
+        lines = self._export().splitlines()
+        rows = [json.loads(line) for line in lines]
+
+        self.assertEqual(len(rows), 2)
+        first = rows[0]
+        self.assertEqual(first["id"], maintenance.id)
+        self.assertEqual(first["assigned_technician_email"], self.tech1.email)
+        self.assertEqual(first["work_logs"][0]["note"], "Started")
+        self.assertEqual(first["assignments"][0]["assigned_technician_id"], self.tech1.id)
+        self.assertEqual(rows[1]["work_logs"], [])
+
+    def test_export_csv_and_filters(self):
+        import csv
+        import io
+
+        old = self._book(self.tech1, self.start_time, 1)
+        MaintenanceRequest.objects.filter(id=old.id).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+        recent = self._book(self.tech1, self.start_time + timedelta(hours=3), 1)
+
+        self.client.force_authenticate(user=self.admin)
+        since = (timezone.localdate() - timedelta(days=1)).isoformat()
+        content = self._export(f"?output=csv&from={since}&company={self.company.id}")
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([int(row["id"]) for row in rows], [recent.id])
+        self.assertEqual(rows[0]["work_logs"], "[]")
+
+        # Another company's filter returns only the header
+        content = self._export(f"?output=csv&company={self.company.id + 1000}")
+        self.assertEqual(len(content.splitlines()), 1)
+
+    def test_export_respects_visibility_and_validates_params(self):
+        self._book(self.tech1, self.start_time, 1)
+
+        # Neither the creator nor in the requests' department
+        outsider = User.objects.create_user(
+            email="outsider@test.com", password="x", role="user",
+            company=self.company,
+        )
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self._export(), "")
+
+        response = self.client.get("/api/maintenance/export/?output=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/maintenance/export/?from=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # =====================================================
+    # 1️⃣9️⃣ Kanban Board
+    # =====================================================
+
+    def test_board_counts_and_newest_cards_per_column(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        scheduled = [
+            self._book(self.tech1, self.start_time + timedelta(hours=i), 1)
+            for i in range(3)
+        ]
+        self._book(self.tech2, self.start_time, 1, status="completed", priority="high")
+        self._book(self.tech2, self.start_time, 1, status="new", team=self.team2)
+
+        self.client.force_authenticate(user=self.admin)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get("/api/maintenance/board/?cards=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(captured), 2)
+
+        columns = {column["status"]: column for column in response.data["columns"]}
+        self.assertEqual(
+            list(columns), ["new", "scheduled", "in_progress", "completed", "cancelled"]
+        )
+        self.assertEqual(response.data["total"], 5)
+        self.assertEqual(columns["scheduled"]["count"], 3)
+        self.assertEqual(columns["scheduled"]["priorities"]["medium"], 3)
+        self.assertEqual(columns["completed"]["priorities"]["high"], 1)
+        self.assertEqual(columns["cancelled"]["count"], 0)
+
+        # Newest first, capped per column
+        self.assertEqual(
+            [card["id"] for card in columns["scheduled"]["cards"]],
+            [scheduled[2].id, scheduled[1].id],
+        )
+        self.assertEqual(
+            columns["completed"]["cards"][0]["technician_email"], self.tech2.email
+        )
+
+    def test_board_follows_visibility(self):
+        self._book(self.tech1, self.start_time, 1)
+        self._book(self.tech2, self.start_time, 1, team=self.team2)
+
+        self.client.force_authenticate(user=self.tech2)
+        response = self.client.get("/api/maintenance/board/")
+        self.assertEqual(response.data["total"], 1)
+
+        response = self.client.get("/api/maintenance/board/?cards=1000")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # =====================================================
+    # 2️⃣0️⃣ Calendar Feed
+    # =====================================================
+
+    def _calendar(self, query):
+        self.client.force_authenticate(user=self.admin)
+        return self.client.get(f"/api/maintenance/calendar/{query}")
+
+    def test_calendar_returns_overlapping_events(self):
+        window = self.start_time.isoformat().replace("+00:00", "Z")
+        window_end = (self.start_time + timedelta(hours=4)).isoformat().replace("+00:00", "Z")
+
+        # Starts before the window and runs into it
+        early = self._book(self.tech1, self.start_time - timedelta(hours=1), 2)
+        inside = self._book(self.tech2, self.start_time + timedelta(hours=1), 1, team=self.team2)
+        # Ends exactly where the window starts
+        self._book(self.tech2, self.start_time - timedelta(hours=2), 2, team=self.team2)
+        # Starts exactly where the window ends
+        self._book(self.tech1, self.start_time + timedelta(hours=4), 1)
+
+        self.assertEqual(early.scheduled_end, early.scheduled_start + timedelta(hours=2))
+
+        query = f"?from={window}&to={window_end}"
+        response = self._calendar(query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event["id"] for event in response.data["events"]], [early.id, inside.id])
+        self.assertEqual(response.data["events"][0]["assigned_technician_email"], self.tech1.email)
+
+        response = self._calendar(query + f"&technician={self.tech2.id}&layout=columns")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["columns"]["id"], [inside.id])
+        self.assertEqual(response.data["columns"]["duration_hours"], [1])
+
+    def test_calendar_follows_rescheduling(self):
+        maintenance = self._book(self.tech1, self.start_time, 1)
+        maintenance.scheduled_start = self.start_time + timedelta(days=10)
+        maintenance.save(update_fields=["scheduled_start"])
+        maintenance.refresh_from_db()
+        self.assertEqual(
+            maintenance.scheduled_end, self.start_time + timedelta(days=10, hours=1)
+        )
+
+        day = self.start_time.date()
+        response = self._calendar(f"?from={day}&to={day + timedelta(days=7)}")
+        self.assertEqual(response.data["count"], 0)
+        response = self._calendar(f"?from={day}&to={day + timedelta(days=14)}")
+        self.assertEqual(response.data["count"], 1)
+
+    def test_calendar_rejects_bad_windows(self):
+        day = self.start_time.date()
+        for query in (
+            "",
+            f"?from={day}",
+            f"?from={day}&to={day}",
+            f"?from={day}&to={day + timedelta(days=400)}",
+            f"?from={day}&to={day + timedelta(days=1)}&team=abc",
+            f"?from={day}&to={day + timedelta(days=1)}&layout=grid",
+        ):
+            response = self._calendar(query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    # =====================================================
+    # 2️⃣1️⃣ Double-Booking Enforced By The Database
+    # =====================================================
+
+    def test_overlapping_technician_booking_is_a_conflict(self):
+        self._book(self.tech1, self.start_time, 2)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            "/api/maintenance/",
+            self._bulk_row(self.tech1, self.start_time + timedelta(hours=1)),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["code"], "technician_booked")
+        self.assertEqual(MaintenanceRequest.objects.count(), 1)
+
+        # Back to back is fine
+        response = self.client.post(
+            "/api/maintenance/",
+            self._bulk_row(self.tech1, self.start_time + timedelta(hours=2)),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_constraint_ignores_inactive_bookings(self):
+        from django.db import IntegrityError, transaction
+
+        self._book(self.tech1, self.start_time, 2, status="completed")
+        self._book(self.tech1, self.start_time, 2, status="cancelled")
+        active = self._book(self.tech1, self.start_time, 2)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._book(self.tech1, self.start_time + timedelta(minutes=30), 1)
+
+        # Rescheduling the active booking onto itself is not an overlap
+        active.duration_hours = 3
+        active.save()
+
+    def test_scheduled_end_follows_queryset_updates(self):
+        from django.db import IntegrityError, transaction
+
+        first = self._book(self.tech1, self.start_time, 1)
+        second = self._book(self.tech1, self.start_time + timedelta(hours=2), 1)
+
+        MaintenanceRequest.objects.filter(id=first.id).update(duration_hours=2)
+        first.refresh_from_db()
+        self.assertEqual(first.scheduled_end, self.start_time + timedelta(hours=2))
+
+        second.scheduled_start = self.start_time + timedelta(hours=4)
+        MaintenanceRequest.objects.bulk_update([second], ["scheduled_start"])
+        second.refresh_from_db()
+        self.assertEqual(second.scheduled_end, self.start_time + timedelta(hours=5))
+
+        # The constraint sees the end the update implies
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MaintenanceRequest.objects.filter(id=first.id).update(duration_hours=5)
+
+        MaintenanceRequest.objects.filter(id=second.id).update(scheduled_start=None)
+        second.refresh_from_db()
+        self.assertIsNone(second.scheduled_end)
+
+    def test_release_overlapping_bookings_keeps_work_in_progress(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from django.db import connection
+
+        # Bookings from before the constraint; rolled back with the test
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ALTER TABLE maintenance_maintenancerequest "
+                "DROP CONSTRAINT mr_technician_no_overlap"
+            )
+        started = self._book(self.tech1, self.start_time + timedelta(hours=1), 2, status="in_progress")
+        overlapping = self._book(self.tech1, self.start_time, 2)
+        MaintenanceAssignment.objects.create(
+            maintenance_request=overlapping, assigned_team=self.team1,
+            assigned_technician=self.tech1, assigned_by=self.admin, is_active=True,
+        )
+        after = self._book(self.tech1, self.start_time + timedelta(hours=3), 1)
+        self._book(self.tech2, self.start_time, 2, status="in_progress", team=self.team2)
+        stuck = self._book(self.tech2, self.start_time, 1, status="in_progress", team=self.team2)
+
+        out = StringIO()
+        call_command("release_overlapping_bookings", stdout=out)
+        self.assertIn("1 releasable, 1 in progress", out.getvalue())
+        overlapping.refresh_from_db()
+        self.assertEqual(overlapping.status, "scheduled")
+
+        out = StringIO()
+        call_command("release_overlapping_bookings", "--release", stdout=out)
+        self.assertIn(f"Request {stuck.id} (in progress)", out.getvalue())
+
+        overlapping.refresh_from_db()
+        self.assertEqual((overlapping.status, overlapping.assigned_technician), ("new", None))
+        self.assertFalse(overlapping.assignments.filter(is_active=True).exists())
+        for booking in (started, after, stuck):
+            booking.refresh_from_db()
+            self.assertIsNotNone(booking.assigned_technician_id)
+
+    def test_full_work_center_is_a_conflict(self):
+        self.work_center.capacity = 1
+        self.work_center.save()
+        self._book(self.tech2, self.start_time, 2, team=self.team2)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/",
+            self._bulk_row(self.tech1, self.start_time),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["code"], "work_center_full")
+        self.assertEqual(MaintenanceRequest.objects.count(), 1)
+
+    # =====================================================
+    # 2️⃣2️⃣ MTTR / MTBF / OEE Analytics
+    # =====================================================
+
+    def _log(self, maintenance, log_status):
+        self.client.force_authenticate(user=self.tech1)
+        return self.client.post(
+            "/api/maintenance/worklog/",
+            {"maintenance_id": maintenance.id, "note": log_status, "status": log_status},
+            format="json",
+        )
+
+    def test_completing_work_log_updates_rollup(self):
+        from maintenance.analytics import rebuild_kpi_rollups
+
+        first = self._book(self.tech1, self.start_time, 1)
+        second = self._book(self.tech1, self.start_time + timedelta(hours=2), 1)
+        for maintenance in (first, second):
+            self._log(maintenance, "in_progress")
+            self._log(maintenance, "completed")
+
+        rollup = MaintenanceKpiRollup.objects.get(
+            equipment=self.equipment, work_center=self.work_center
+        )
+        self.assertEqual((rollup.completed, rollup.repairs), (2, 2))
+        self.assertIsNotNone(rollup.last_repaired_at)
+
+        # A rebuild from history lands on the same totals
+        incremental = (rollup.completed, rollup.repairs, rollup.uptime_intervals, rollup.cost)
+        self.assertEqual(rebuild_kpi_rollups(), 1)
+        rollup = MaintenanceKpiRollup.objects.get()
+        self.assertEqual(
+            (rollup.completed, rollup.repairs, rollup.uptime_intervals, rollup.cost),
+            incremental,
+        )
+
+    def test_kpis_from_rebuilt_history(self):
+        from maintenance.analytics import rebuild_kpi_rollups
+
+        t0 = timezone.now() - timedelta(days=2)
+        # Repairs of 2h and 4h, with 10h of running time in between
+        for created, started, completed in ((0, 1, 3), (13, 14, 18)):
+            maintenance = self._book(self.tech1, self.start_time, 1, status="completed")
+            MaintenanceRequest.objects.filter(id=maintenance.id).update(
+                created_at=t0 + timedelta(hours=created)
+            )
+            for log_status, at in (("in_progress", started), ("completed", completed)):
+                log = MaintenanceWorkLog.objects.create(
+                    maintenance_request=maintenance, technician=self.tech1,
+                    note=log_status, status=log_status,
+                )
+                MaintenanceWorkLog.objects.filter(id=log.id).update(
+                    created_at=t0 + timedelta(hours=at)
+                )
+
+        rebuild_kpi_rollups()
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get("/api/maintenance/kpis/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (equipment,) = response.data["results"]
+        self.assertEqual(equipment["id"], self.equipment.id)
+        self.assertEqual(equipment["mttr_hours"], 3)
+        self.assertEqual(equipment["mtbf_hours"], 10)
+        self.assertEqual(equipment["availability"], 0.7692)
+        self.assertEqual(equipment["cost"], 3000)
+
+        response = self.client.get("/api/maintenance/kpis/?group=work_center")
+        (work_center,) = response.data["results"]
+        self.assertEqual(work_center["oee"], 69.23)
+
+        response = self.client.get("/api/maintenance/kpis/?group=category")
+        self.assertEqual(response.data["results"][0]["name"], "CNC")
+
+        response = self.client.get("/api/maintenance/kpis/?group=team")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # =====================================================
+    # 2️⃣3️⃣ Daily Activity Rollups
+    # =====================================================
+
+    def _rollup_totals(self):
+        from django.db.models import Sum
+
+        return MaintenanceDailyRollup.objects.aggregate(
+            created=Sum("created"),
+            scheduled=Sum("scheduled"),
+            completed=Sum("completed"),
+            cancelled=Sum("cancelled"),
+            hours_booked=Sum("hours_booked"),
+        )
+
+    def test_rollups_follow_request_events(self):
+        from maintenance.rollups import rebuild_daily_rollups
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/maintenance/", self._bulk_row(self.tech1, self.start_time, 2), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.post(
+            "/api/maintenance/",
+            [
+                self._bulk_row(self.tech1, self.start_time + timedelta(hours=3)),
+                self._bulk_row(self.tech1, self.start_time + timedelta(hours=5)),
+            ],
+            format="json",
+        )
+
+        first = MaintenanceRequest.objects.order_by("id").first()
+        self._log(first, "in_progress")
+        self._log(first, "completed")
+        cancelled = MaintenanceRequest.objects.order_by("id").last()
+        cancelled.status = "cancelled"
+        cancelled.save()
+
+        expected = {
+            "created": 3, "scheduled": 3, "completed": 1, "cancelled": 1, "hours_booked": 4,
+        }
+        self.assertEqual(self._rollup_totals(), expected)
+        rollup = MaintenanceDailyRollup.objects.get()
+        self.assertEqual(
+            (rollup.day, rollup.company_id, rollup.team_id),
+            (timezone.localdate(), self.company.id, self.team1.id),
+        )
+
+        # Backfilling from history lands on the same counters
+        self.assertEqual(rebuild_daily_rollups(chunk_size=2), 3)
+        self.assertEqual(self._rollup_totals(), expected)
+
+    def test_rollups_follow_reassignment(self):
+        from maintenance.rollups import ROLLUP_COUNTERS, backlog, rebuild_daily_rollups
+
+        done = self._book(self.tech1, self.start_time, 1)
+        still_open = self._book(self.tech1, self.start_time + timedelta(hours=2), 1)
+
+        self.client.force_authenticate(user=self.tech1)
+        for maintenance in (done, still_open):
+            response = self.client.post(
+                "/api/maintenance/reassign/",
+                {"maintenance_id": maintenance.id, "new_team": self.team2.id, "reason": "Electrical"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        done = MaintenanceRequest.objects.get(id=done.id)
+        done.status = "completed"
+        done.save()
+        still_open = MaintenanceRequest.objects.get(id=still_open.id)
+        still_open.duration_hours = 3
+        still_open.save()
+
+        def rows():
+            return sorted(
+                row for row in MaintenanceDailyRollup.objects.values_list(
+                    "day", "company_id", "department_id", "team_id", *ROLLUP_COUNTERS
+                )
+                if any(row[4:])
+            )
+
+        def open_counts():
+            tomorrow = timezone.localdate() + timedelta(days=1)
+            return {
+                group: {
+                    row["id"]: row["open"]
+                    for row in backlog(MaintenanceDailyRollup.objects.all(), group, tomorrow)
+                    if row["open"]
+                }
+                for group in ("team", "department")
+            }
+
+        incremental = open_counts()
+        self.assertEqual(
+            incremental,
+            {"team": {self.team2.id: 1}, "department": {self.department.id: 1}},
+        )
+        counters = rows()
+        self.assertEqual(
+            [row[3:] for row in counters],
+            [(self.team2.id, 2, 2, 1, 0, 4)],
+        )
+
+        rebuild_daily_rollups()
+        self.assertEqual(open_counts(), incremental)
+        self.assertEqual(rows(), counters)
+
+    def test_activity_report_reads_rollups_only(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        today = timezone.localdate()
+        MaintenanceDailyRollup.objects.create(
+            day=today - timedelta(days=1), company=self.company, team=self.team1,
+            created=4, scheduled=4, completed=2, hours_booked=8,
+        )
+        MaintenanceDailyRollup.objects.create(
+            day=today, company=self.company, team=self.team2, created=2, cancelled=1,
+        )
+        MaintenanceDailyRollup.objects.create(
+            day=today - timedelta(days=90), company=self.company, team=self.team1, created=1,
+        )
+
+        self.client.force_authenticate(user=self.admin)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get("/api/maintenance/activity/?group=team")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(captured), 2)
+
+        results = response.data["results"]
+        self.assertEqual([row["id"] for row in results], [self.team1.id, self.team2.id])
+        self.assertEqual(results[0]["completion_rate"], 0.5)
+        self.assertEqual(
+            {row["id"]: row["open"] for row in response.data["backlog"]},
+            {self.team1.id: 3, self.team2.id: 1},
+        )
+
+        response = self.client.get(
+            f"/api/maintenance/activity/?interval=month&from={today - timedelta(days=120)}"
+        )
+        self.assertEqual(sum(row["created"] for row in response.data["results"]), 7)
+
+        response = self.client.get("/api/maintenance/activity/?interval=year")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # =====================================================
+    # 2️⃣4️⃣ Technician Workload Heatmap
+    # =====================================================
+
+    def test_heatmap_rasterizes_team_bookings(self):
+        import base64
+
+        start = (timezone.now() + timedelta(days=1)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        self.team1.members.add(self.tech2)
+        # 1.5h from the start of the window, then a booking from before it
+        self._book(self.tech2, start + timedelta(minutes=30), 2, team=self.team2)
+        self._book(self.tech1, start - timedelta(minutes=45), 1)
+        # Other statuses do not occupy anyone
+        self._book(self.tech1, start + timedelta(hours=5), 1, status="cancelled")
+
+        self.client.force_authenticate(user=self.admin)
+        query = f"?team={self.team1.id}&from={start.isoformat().replace('+00:00', 'Z')}&days=1"
+        response = self.client.get("/api/maintenance/heatmap/" + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [member["id"] for member in response.data["technicians"]],
+            [self.tech1.id, self.tech2.id],
+        )
+        self.assertEqual(response.data["shape"], [2, 24])
+
+        cells = list(base64.b64decode(response.data["matrix"]))
+        self.assertEqual(cells[:24], [25] + [0] * 23)
+        self.assertEqual(cells[24:48], [50, 100, 50] + [0] * 21)
+
+        response = self.client.get("/api/maintenance/heatmap/" + query + "&encoding=rle")
+        self.assertEqual(response.data["matrix"]["values"], [25, 0, 50, 100, 50, 0])
+        self.assertEqual(response.data["matrix"]["lengths"], [1, 23, 1, 1, 1, 21])
+
+    def test_heatmap_validates_params(self):
+        self.client.force_authenticate(user=self.admin)
+        for query in (
+            "",
+            f"?team={self.team1.id}&days=60",
+            f"?team={self.team1.id}&bucket_minutes=7",
+            f"?team={self.team1.id}&encoding=png",
+        ):
+            response = self.client.get("/api/maintenance/heatmap/" + query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+        response = self.client.get("/api/maintenance/heatmap/?team=999999")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # =====================================================
+    # 2️⃣5️⃣ Async Read Views
+    # =====================================================
+
+    def _async_request(self, view, path, user=None, method="get", **kwargs):
+        headers = {}
+        if user is not None:
+            headers["Authorization"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+        factory = AsyncRequestFactory()
+        if method == "post":
+            request = factory.post(path, "[]", content_type="application/json", headers=headers)
+        else:
+            request = factory.get(path, headers=headers)
+        response = async_to_sync(view)(request, **kwargs)
+        # The request handler renders DRF responses of the sync fallback
+        if hasattr(response, "render"):
+            response.render()
+        return response.status_code, json.loads(response.content)
+
+    def test_async_request_list_matches_sync_list(self):
+        for hour in range(3):
+            self._book(self.tech1, self.start_time + timedelta(hours=hour * 3), 1)
+        # Visible to tech1 through team1 only
+        self._book(self._technician("tech3@test.com"), self.start_time, 1)
+        self._book(self.tech2, self.start_time, 1, team=self.team2)
+
+        view = AsyncMaintenanceRequestListView.as_view()
+        self.client.force_authenticate(user=self.tech1)
+        path = "/api/maintenance/?page_size=2"
+
+        while path:
+            expected = self.client.get(path).json()
+            code, data = self._async_request(view, path, self.tech1)
+            self.assertEqual(code, status.HTTP_200_OK)
+            self.assertEqual(data, expected)
+            path = data["next"]
+        self.assertIsNotNone(data["previous"])
+
+        # A bad cursor is DRF's 404, not a server error
+        path = "/api/maintenance/?cursor=garbage"
+        expected = self.client.get(path)
+        code, data = self._async_request(view, path, self.tech1)
+        self.assertEqual(expected.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual((code, data), (expected.status_code, expected.json()))
+
+        code, data = self._async_request(view, "/api/maintenance/")
+        self.assertEqual(code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_request_list_passes_writes_to_sync_view(self):
+        view = AsyncMaintenanceRequestListView.as_view(
+            sync_view=MaintenanceRequestViewSet.as_view({"get": "list", "post": "create"})
+        )
+        code, data = self._async_request(view, "/api/maintenance/", self.user, method="post")
+        self.assertEqual(code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non-empty list", data["error"])
+
+    def test_async_work_log_list_matches_sync(self):
+        maintenance = self._book(self.tech1, self.start_time, 1)
+        self._log(maintenance, "in_progress")
+        self._log(maintenance, "completed")
+
+        path = f"/api/maintenance/{maintenance.id}/worklogs/"
+        expected = self.client.get(path).json()
+        code, data = self._async_request(
+            AsyncMaintenanceWorkLogListView.as_view(), path, maintenance_id=maintenance.id
+        )
+        self.assertEqual(code, status.HTTP_200_OK)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data, expected)
+
+    # =====================================================
+    # 2️⃣6️⃣ Board Events
+    # =====================================================
+
+    @override_settings(MAINTENANCE_EVENT_BROKER="maintenance.tests.RecordingBroker")
+    def test_request_changes_publish_board_events(self):
+        broker = get_broker()
+        broker.published.clear()
+        company = f"company:{self.company.id}"
+        tech1, tech2 = f"technician:{self.tech1.id}", f"technician:{self.tech2.id}"
+        team1, team2 = f"team:{self.team1.id}", f"team:{self.team2.id}"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            maintenance = self._book(self.tech1, self.start_time, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log(maintenance, "in_progress")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/maintenance/reassign/",
+                {"maintenance_id": maintenance.id, "new_team": self.team2.id, "reason": "Electrical"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # A failed write publishes nothing
+        with self.captureOnCommitCallbacks(execute=True):
+            self._log(maintenance, "in_progress")
+
+        self.assertEqual(
+            [(event["type"], channels) for channels, event in broker.published],
+            [
+                ("request.created", [company, team1, tech1]),
+                ("request.status_changed", [company, team1, tech1]),
+                ("worklog.added", [company, team1, tech1]),
+                ("request.reassigned", [company, team1, team2, tech1, tech2]),
+            ],
+        )
+        changed, logged, moved = (event for _, event in broker.published[1:])
+        self.assertEqual((changed["previous_status"], changed["status"]), ("scheduled", "in_progress"))
+        self.assertEqual(logged["work_log_status"], "in_progress")
+        self.assertEqual((moved["previous_technician"], moved["technician"]), (self.tech1.id, self.tech2.id))
+        self.assertEqual(moved["team"], self.team2.id)
+
+    def _stream(self, user, event, channels=None):
+        """
+        Chunks the event stream sends ``user`` for ``event`` published to
+        ``channels`` (by default their own), up to a resync.
+        """
+        view = MaintenanceEventStreamView.as_view()
+        headers = {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+        async def read():
+            response = await view(AsyncRequestFactory().get("/api/maintenance/events/", headers=headers))
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            chunks = aiter(response.streaming_content)
+            received = [await anext(chunks)]
+
+            # Published from request threads
+            broker = get_broker()
+            await asyncio.to_thread(broker.publish, channels or user_channels(user), event)
+            await asyncio.to_thread(broker.publish, user_channels(user), {"type": RESYNC})
+            while not received[-1].startswith(b"event: resync"):
+                received.append(await anext(chunks))
+
+            await chunks.aclose()
+            return received
+
+        return async_to_sync(read)()
+
+    def test_event_stream_sends_followed_events(self):
+        maintenance = self._book(self.tech1, self.start_time, 1)
+        event = request_event(STATUS_CHANGED, maintenance, previous_status="scheduled")
+        outsider = User.objects.create_user(
+            email="outsider@test.com", password="user123", role="user", company=self.company
+        )
+
+        received = self._stream(self.tech1, event)
+        self.assertEqual(received[0], b"retry: 5000\n\n")
+        self.assertEqual(len(received), 3)
+        name, data = received[1].decode().strip().split("\n")
+        self.assertEqual(name, "event: request.status_changed")
+        self.assertEqual(json.loads(data.removeprefix("data: ")), event)
+
+        # Users see their department's events; others only the resync
+        self.assertEqual(len(self._stream(self.user, event)), 3)
+        self.assertEqual(len(self._stream(outsider, event)), 2)
+        self.assertEqual(get_broker().subscriptions, {})
+
+    def test_unsent_event_stream_holds_no_subscription(self):
+        view = MaintenanceEventStreamView.as_view()
+        headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.tech1).access_token}"}
+
+        async def disconnect_early():
+            response = await view(AsyncRequestFactory().get("/api/maintenance/events/", headers=headers))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # The client went away before the body was read
+            response.close()
+
+        async_to_sync(disconnect_early)()
+        self.assertEqual(get_broker().subscriptions, {})
+
+    def test_event_stream_sends_team_events_to_members(self):
+        # Visible to team1's technicians while nobody is assigned yet
+        maintenance = self._book(None, self.start_time, 1, status="new")
+        event = request_event(STATUS_CHANGED, maintenance, previous_status="new")
+        channels = [f"company:{self.company.id}", f"team:{self.team1.id}"]
+
+        self.assertEqual(len(self._stream(self.tech1, event, channels)), 3)
+        self.assertEqual(len(self._stream(self.tech2, event, channels)), 2)
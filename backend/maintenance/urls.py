@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
     MaintenanceRequestViewSet,
+    MaintenanceActivityView,
     MaintenanceAvailabilityView,
+    MaintenanceBoardView,
+    MaintenanceCalendarView,
+    MaintenanceExportView,
+    MaintenanceHeatmapView,
+    MaintenanceKpiView,
     MaintenanceReassignmentView,
     MaintenanceWorkLogCreateView,
     MaintenanceWorkLogListView,
@@ -13,6 +20,28 @@ maintenance_list = MaintenanceRequestViewSet.as_view({
     "post": "create",
 })
 
+worklog_list = MaintenanceWorkLogListView.as_view()
+
+# The event stream holds a connection open, so it is only routed under ASGI
+async_urlpatterns = []
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import (
+        AsyncMaintenanceRequestListView,
+        AsyncMaintenanceWorkLogListView,
+        MaintenanceEventStreamView,
+    )
+
+    maintenance_list = AsyncMaintenanceRequestListView.as_view(sync_view=maintenance_list)
+    worklog_list = AsyncMaintenanceWorkLogListView.as_view()
+    async_urlpatterns.append(
+        path(
+            "events/",
+            MaintenanceEventStreamView.as_view(),
+            name="maintenance-events",
+        )
+    )
+
 maintenance_detail = MaintenanceRequestViewSet.as_view({
     "get": "retrieve",
     "put": "update",
@@ -22,11 +51,41 @@ maintenance_detail = MaintenanceRequestViewSet.as_view({
 urlpatterns = [
     path("", maintenance_list, name="maintenance-list"),
     path("<int:pk>/", maintenance_detail, name="maintenance-detail"),
+    path(
+        "activity/",
+        MaintenanceActivityView.as_view(),
+        name="maintenance-activity",
+    ),
     path(
         "availability/",
         MaintenanceAvailabilityView.as_view(),
         name="maintenance-availability",
     ),
+    path(
+        "board/",
+        MaintenanceBoardView.as_view(),
+        name="maintenance-board",
+    ),
+    path(
+        "calendar/",
+        MaintenanceCalendarView.as_view(),
+        name="maintenance-calendar",
+    ),
+    path(
+        "export/",
+        MaintenanceExportView.as_view(),
+        name="maintenance-export",
+    ),
+    path(
+        "heatmap/",
+        MaintenanceHeatmapView.as_view(),
+        name="maintenance-heatmap",
+    ),
+    path(
+        "kpis/",
+        MaintenanceKpiView.as_view(),
+        name="maintenance-kpis",
+    ),
     path(
         "reassign/",
         MaintenanceReassignmentView.as_view(),
@@ -39,7 +98,8 @@ urlpatterns = [
     ),
     path(
         "<int:maintenance_id>/worklogs/",
-        MaintenanceWorkLogListView.as_view(),
+        worklog_list,
         name="maintenance-worklog-list",
     ),
+    *async_urlpatterns,
 ]
\ No newline at end of file
@@ -4,21 +4,57 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Q
-
-from .models import MaintenanceRequest, MaintenanceWorkLog
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .analytics import KPI_GROUPS, kpi_report
+from .exports import EXPORT_FORMATS, stream_export
+from .heatmap import HEATMAP_ENCODINGS, encode_base64, encode_rle, team_heatmap, to_percent
+from .models import (
+    MaintenanceDailyRollup,
+    MaintenanceKpiRollup,
+    MaintenanceRequest,
+    MaintenanceWorkLog,
+)
+from .rollups import ROLLUP_GROUPS, ROLLUP_INTERVALS, activity_report, backlog
 from .serializers import (
+    MaintenanceRequestBulkRowSerializer,
     MaintenanceRequestCreateSerializer,
     MaintenanceRequestViewSerializer,
     MaintenanceReassignmentSerializer,
     MaintenanceWorkLogCreateSerializer,
     MaintenanceWorkLogViewSerializer
 )
-from .services import pick_technician_from_team
+from .services import (
+    SlotAllocator,
+    WorkCenterAllocator,
+    calendar_window,
+    pick_technician_from_team,
+    visible_maintenance_requests,
+)
+
+from accounts.context import user_context
+from core.models import MaintenanceTeam
+from core.pagination import CreatedAtCursorPagination
 
-from core.models import WorkCenter, MaintenanceTeam
+
+def parse_bound(value):
+    """
+    Aware datetime from an ISO date or datetime; ValueError otherwise.
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 
 class MaintenanceAvailabilityView(APIView):
@@ -26,11 +62,18 @@ class MaintenanceAvailabilityView(APIView):
     PRE-CREATION VIEW
     - Auto-assign technician
     - Return available work centers
+    - Batch mode: {"slots": [...]} resolves many jobs in one call
     """
 
     permission_classes = [IsAuthenticated]
 
+    max_batch_slots = 500
+    slot_fields = ["equipment", "maintenance_team", "scheduled_start", "duration_hours"]
+
     def post(self, request):
+        if "slots" in request.data:
+            return self.post_batch(request)
+
         data = request.data
 
         equipment = data.get("equipment")
@@ -44,8 +87,19 @@ class MaintenanceAvailabilityView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        scheduled_start = timezone.datetime.fromisoformat(start)
-        duration = int(duration)
+        try:
+            scheduled_start = parse_bound(start)
+            duration = int(duration)
+            equipment = int(equipment)
+            team_id = int(team_id)
+        except (TypeError, ValueError):
+            return Response(
+                {
+                    "error": "scheduled_start must be an ISO datetime; "
+                    "duration_hours, equipment and maintenance_team integers"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         scheduled_end = scheduled_start + timedelta(hours=duration)
 
         team = MaintenanceTeam.objects.filter(id=team_id).first()
@@ -55,22 +109,22 @@ class MaintenanceAvailabilityView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        technician = pick_technician_from_team(team, scheduled_start, duration)
+        technician = pick_technician_from_team(
+            team,
+            scheduled_start,
+            duration,
+            equipment=equipment,
+        )
         if not technician:
             return Response(
                 {"error": "No available technician in selected team"},
                 status=status.HTTP_409_CONFLICT,
             )
 
-        busy_work_centers = MaintenanceRequest.objects.filter(
-            scheduled_start__lt=scheduled_end,
-            scheduled_start__gte=scheduled_start,
-            status__in=["scheduled", "in_progress"],
-        ).values_list("work_center_id", flat=True)
-
-        available_work_centers = WorkCenter.objects.filter(
-            company=request.user.company
-        ).exclude(id__in=busy_work_centers)
+        work_centers = WorkCenterAllocator(
+            user_context(request).company, scheduled_start, scheduled_end
+        )
+        available_work_centers = work_centers.available(scheduled_start, scheduled_end)
 
         return Response(
             {
@@ -86,28 +140,146 @@ class MaintenanceAvailabilityView(APIView):
                     }
                     for wc in available_work_centers
                 ],
+                "suggested_work_center": self.suggest_work_center(
+                    work_centers, data.get("work_center"), scheduled_start, scheduled_end
+                ),
             },
             status=status.HTTP_200_OK,
         )
 
+    def suggest_work_center(self, work_centers, preferred, start, end):
+        """
+        Preferred center when it has capacity left, else its cheapest,
+        most efficient alternative; without a preference, the best ranked
+        center of the company.
+        """
+        try:
+            preferred = int(preferred) if preferred else None
+        except (TypeError, ValueError):
+            preferred = None
+
+        wc = work_centers.choose(start, end, preferred=preferred)
+        if wc is None:
+            return None
+        return {"id": wc.id, "name": wc.name, "code": wc.code}
+
+    def parse_slot(self, item):
+        if not isinstance(item, dict) or not all(item.get(f) for f in self.slot_fields):
+            return None, f"{', '.join(self.slot_fields)} are required"
+
+        try:
+            start = parse_bound(item["scheduled_start"])
+            duration = int(item["duration_hours"])
+            team = int(item["maintenance_team"])
+            equipment = int(item["equipment"])
+            work_center = int(item["work_center"]) if item.get("work_center") else None
+        except (TypeError, ValueError):
+            return None, "Invalid slot values"
+
+        if duration <= 0:
+            return None, "duration_hours must be positive"
+
+        return {
+            "team": team,
+            "equipment": equipment,
+            "work_center": work_center,
+            "start": start,
+            "end": start + timedelta(hours=duration),
+        }, None
+
+    def post_batch(self, request):
+        items = request.data.get("slots")
+
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "slots must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(items) > self.max_batch_slots:
+            return Response(
+                {"error": f"At most {self.max_batch_slots} slots per batch"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        parsed = [self.parse_slot(item) for item in items]
+        allocator = SlotAllocator(
+            user_context(request).company,
+            [slot for slot, error in parsed if slot],
+        )
+
+        assignments = []
+        for index, (slot, error) in enumerate(parsed):
+            if slot:
+                technician, work_center, error = allocator.allocate(slot)
+
+            if error:
+                assignments.append({"index": index, "error": error})
+                continue
+
+            assignments.append(
+                {
+                    "index": index,
+                    "equipment": slot["equipment"],
+                    "scheduled_start": slot["start"],
+                    "assigned_technician": {
+                        "id": technician.id,
+                        "email": technician.email,
+                    },
+                    "work_center": {
+                        "id": work_center.id,
+                        "name": work_center.name,
+                        "code": work_center.code,
+                    },
+                }
+            )
+
+        return Response({"assignments": assignments}, status=status.HTTP_200_OK)
+
 
 class MaintenanceRequestViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    max_bulk_rows = 5000
+
+    # Columns read by MaintenanceRequestViewSerializer, joins included
+    view_fields = [
+        "id",
+        "title",
+        "description",
+        "maintenance_type",
+        "priority",
+        "status",
+        "equipment",
+        "equipment__name",
+        "work_center",
+        "work_center__name",
+        "assigned_team",
+        "assigned_team__name",
+        "assigned_technician",
+        "assigned_technician__email",
+        "scheduled_start",
+        "duration_hours",
+        "created_at",
+    ]
+
+    def get_base_queryset(self):
+        queryset = MaintenanceRequest.objects.all()
 
-    def get_queryset(self):
-        user = self.request.user
-
-        if user.role == "admin":
-            return MaintenanceRequest.objects.all()
+        if self.action in ["list", "retrieve"]:
+            queryset = queryset.select_related(
+                "equipment",
+                "work_center",
+                "assigned_team",
+                "assigned_technician",
+            ).only(*self.view_fields)
 
-        if user.role == "technician":
-            return MaintenanceRequest.objects.filter(
-                Q(assigned_technician=user)
-                | Q(assigned_team__members=user)
-            )
+        return queryset
 
-        return MaintenanceRequest.objects.filter(
-            Q(created_by=user) | Q(department=user.department)
+    def get_queryset(self):
+        return visible_maintenance_requests(
+            self.request.user, self.get_base_queryset()
         )
 
     def get_serializer_class(self):
@@ -115,6 +287,136 @@ class MaintenanceRequestViewSet(ModelViewSet):
             return MaintenanceRequestViewSerializer
         return MaintenanceRequestCreateSerializer
 
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def bulk_create(self, request):
+        """
+        A list payload creates every row, with its assignment, or none.
+        """
+        rows = request.data
+
+        if not rows:
+            return Response(
+                {"error": "Expected a non-empty list of maintenance requests"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(rows) > self.max_bulk_rows:
+            return Response(
+                {"error": f"At most {self.max_bulk_rows} rows per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = MaintenanceRequestBulkRowSerializer(
+            data=rows,
+            many=True,
+            context=self.get_serializer_context(),
+        )
+
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "errors": [
+                        {"index": index, **row_errors}
+                        for index, row_errors in enumerate(serializer.errors)
+                        if row_errors
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created = serializer.save()
+
+        return Response(
+            {
+                "created": len(created),
+                "ids": [maintenance.id for maintenance in created],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class MaintenanceBoardView(APIView):
+    """
+    Kanban board: one column per status with its count per priority and
+    its newest ``cards`` requests (default 20).
+
+    Counts come from one GROUP BY and cards from one ROW_NUMBER() window
+    partitioned by status, both over the list endpoint's visibility.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    default_cards = 20
+    max_cards = 100
+
+    def get(self, request):
+        try:
+            per_column = int(request.query_params.get("cards", self.default_cards))
+        except ValueError:
+            per_column = -1
+        if not 0 <= per_column <= self.max_cards:
+            return Response(
+                {"error": f"cards must be between 0 and {self.max_cards}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        visible = visible_maintenance_requests(request.user)
+
+        columns = {
+            key: {
+                "status": key,
+                "label": label,
+                "count": 0,
+                "priorities": {
+                    priority: 0 for priority, _ in MaintenanceRequest.PRIORITY_CHOICES
+                },
+                "cards": [],
+            }
+            for key, label in MaintenanceRequest.STATUS_CHOICES
+        }
+
+        counts = (
+            visible.order_by()
+            .values("status", "priority")
+            .annotate(count=Count("id"))
+        )
+        for row in counts:
+            column = columns[row["status"]]
+            column["count"] += row["count"]
+            column["priorities"][row["priority"]] = row["count"]
+
+        if per_column:
+            cards = (
+                visible
+                .select_related(
+                    "equipment", "work_center", "assigned_team", "assigned_technician"
+                )
+                .only(*MaintenanceRequestViewSet.view_fields)
+                .annotate(
+                    position=Window(
+                        RowNumber(),
+                        partition_by=[F("status")],
+                        order_by=[F("created_at").desc(), F("id").desc()],
+                    )
+                )
+                .filter(position__lte=per_column)
+                .order_by("status", "position")
+            )
+            for card in MaintenanceRequestViewSerializer(cards, many=True).data:
+                columns[card["status"]]["cards"].append(card)
+
+        return Response(
+            {
+                "total": sum(column["count"] for column in columns.values()),
+                "columns": list(columns.values()),
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class MaintenanceReassignmentView(APIView):
     """
@@ -185,7 +487,349 @@ class MaintenanceWorkLogListView(APIView):
     def get(self, request, maintenance_id):
         logs = MaintenanceWorkLog.objects.filter(
             maintenance_request_id=maintenance_id
-        ).order_by("created_at")
+        ).select_related("technician").order_by("created_at")
 
         serializer = MaintenanceWorkLogViewSerializer(logs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MaintenanceExportView(APIView):
+    """
+    Streams the visible maintenance history, with work logs and
+    assignments, as NDJSON (default) or CSV.
+
+    Query params:
+    - output: ndjson | csv
+    - from / to: created_at range [from, to), dates or datetimes
+    - company: company id
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The stream sets its own content type; errors still render as JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        params = request.query_params
+        output = params.get("output", "ndjson")
+
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = visible_maintenance_requests(request.user)
+
+        try:
+            if params.get("from"):
+                queryset = queryset.filter(created_at__gte=parse_bound(params["from"]))
+            if params.get("to"):
+                queryset = queryset.filter(created_at__lt=parse_bound(params["to"]))
+            if params.get("company"):
+                queryset = queryset.filter(company_id=int(params["company"]))
+        except ValueError:
+            return Response(
+                {"error": "from and to must be ISO dates, company an id"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        response = StreamingHttpResponse(
+            stream_export(queryset, output),
+            content_type=EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="maintenance-history.{output}"'
+        )
+        return response
+
+
+class MaintenanceCalendarView(APIView):
+    """
+    Scheduled requests whose window overlaps [from, to), for week and
+    month calendars.
+
+    Query params:
+    - from / to: required, dates or datetimes, at most ``max_days`` apart
+    - technician / team / work_center: ids to narrow the feed
+    - status: comma separated statuses
+    - layout: events (default) | columns, one array per field
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    max_days = 92
+
+    filters = {
+        "technician": "assigned_technician_id",
+        "team": "assigned_team_id",
+        "work_center": "work_center_id",
+    }
+
+    fields = [
+        "id",
+        "title",
+        "status",
+        "priority",
+        "maintenance_type",
+        "scheduled_start",
+        "scheduled_end",
+        "duration_hours",
+        "equipment_id",
+        "equipment_name",
+        "work_center_id",
+        "work_center_name",
+        "assigned_team_id",
+        "assigned_technician_id",
+        "assigned_technician_email",
+    ]
+
+    def get(self, request):
+        params = request.query_params
+        layout = params.get("layout", "events")
+
+        if layout not in ("events", "columns"):
+            return Response(
+                {"error": "layout must be events or columns"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            start = parse_bound(params["from"])
+            end = parse_bound(params["to"])
+            lookups = {
+                field: int(params[param])
+                for param, field in self.filters.items()
+                if params.get(param)
+            }
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "from and to are required ISO dates; technician, team and work_center are ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not start < end <= start + timedelta(days=self.max_days):
+            return Response(
+                {"error": f"to must be after from and at most {self.max_days} days later"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = visible_maintenance_requests(request.user).filter(**lookups)
+        if params.get("status"):
+            queryset = queryset.filter(status__in=params["status"].split(","))
+
+        events = list(
+            calendar_window(queryset, start, end)
+            .order_by("scheduled_start", "id")
+            .values(
+                *[
+                    field for field in self.fields
+                    if not field.endswith(("_name", "_email"))
+                ],
+                equipment_name=F("equipment__name"),
+                work_center_name=F("work_center__name"),
+                assigned_technician_email=F("assigned_technician__email"),
+            )
+        )
+
+        if layout == "columns":
+            return Response(
+                {
+                    "count": len(events),
+                    "columns": {
+                        field: [event[field] for event in events]
+                        for field in self.fields
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        return Response(
+            {"count": len(events), "events": events},
+            status=status.HTTP_200_OK,
+        )
+
+
+def company_rollups(request, rollups):
+    """
+    Rollups of the user's company; admins see every company or the one
+    in ``?company=``. Raises ValueError on a malformed id.
+    """
+    if request.user.role != "admin":
+        return rollups.filter(company_id=request.user.company_id)
+    if request.query_params.get("company"):
+        return rollups.filter(company_id=int(request.query_params["company"]))
+    return rollups
+
+
+class MaintenanceKpiView(APIView):
+    """
+    MTTR, MTBF, availability, cost and (per work center) OEE, read from
+    the KPI rollups only.
+
+    Query params:
+    - group: equipment (default) | category | work_center
+    - company: company id (admins; other users see their own company)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group = request.query_params.get("group", "equipment")
+        if group not in KPI_GROUPS:
+            return Response(
+                {"error": f"group must be one of {', '.join(KPI_GROUPS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            rollups = company_rollups(request, MaintenanceKpiRollup.objects.all())
+        except ValueError:
+            return Response(
+                {"error": "company must be an id"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {"group": group, "results": kpi_report(rollups, group)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class MaintenanceActivityView(APIView):
+    """
+    Request volume, completion rate and backlog, read from the daily
+    rollups only.
+
+    Query params:
+    - from / to: day range [from, to), default the last 30 days
+    - group: company (default) | department | team
+    - interval: day (default) | week | month
+    - company: company id (admins; other users see their own company)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    default_days = 30
+
+    def get(self, request):
+        params = request.query_params
+        group = params.get("group", "company")
+        interval = params.get("interval", "day")
+
+        if group not in ROLLUP_GROUPS or interval not in ROLLUP_INTERVALS:
+            return Response(
+                {
+                    "error": f"group must be one of {', '.join(ROLLUP_GROUPS)}, "
+                             f"interval one of {', '.join(ROLLUP_INTERVALS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            end = timezone.localdate() + timedelta(days=1)
+            if params.get("to"):
+                end = parse_date(params["to"])
+            start = end - timedelta(days=self.default_days) if end else None
+            if params.get("from"):
+                start = parse_date(params["from"])
+            if start is None or end is None:
+                raise ValueError("from / to")
+            rollups = company_rollups(request, MaintenanceDailyRollup.objects.all())
+        except ValueError:
+            return Response(
+                {"error": "from and to must be ISO dates, company an id"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                "from": start,
+                "to": end,
+                "group": group,
+                "interval": interval,
+                "results": activity_report(
+                    rollups.filter(day__gte=start, day__lt=end), group, interval
+                ),
+                "backlog": backlog(rollups, group, end),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MaintenanceHeatmapView(APIView):
+    """
+    Technician x time-bucket utilization of a team, in whole percents.
+
+    Query params:
+    - team: required team id
+    - from: window start, date or datetime (default: this hour)
+    - days: window length, 1 to ``max_days`` (default 14)
+    - bucket_minutes: one of ``bucket_choices`` (default 60)
+    - encoding: base64 (default; one byte per cell, row-major) | rle
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    default_days = 14
+    max_days = 28
+    bucket_choices = [15, 30, 60, 120, 240, 480, 1440]
+
+    def get(self, request):
+        params = request.query_params
+        encoding = params.get("encoding", "base64")
+
+        try:
+            team_id = int(params["team"])
+            days = int(params.get("days", self.default_days))
+            bucket_minutes = int(params.get("bucket_minutes", 60))
+            if params.get("from"):
+                start = parse_bound(params["from"])
+            else:
+                start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "team is a required id; from an ISO date, days and bucket_minutes numbers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if (
+            not 1 <= days <= self.max_days
+            or bucket_minutes not in self.bucket_choices
+            or encoding not in HEATMAP_ENCODINGS
+        ):
+            return Response(
+                {
+                    "error": f"days must be 1 to {self.max_days}, bucket_minutes one of "
+                             f"{self.bucket_choices}, encoding one of {', '.join(HEATMAP_ENCODINGS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        teams = MaintenanceTeam.objects.all()
+        if request.user.role != "admin":
+            teams = teams.filter(company_id=request.user.company_id)
+        team = teams.filter(id=team_id).first()
+        if team is None:
+            return Response(
+                {"error": "Maintenance team not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        buckets = days * 24 * 60 // bucket_minutes
+        members, utilization = team_heatmap(team, start, bucket_minutes, buckets)
+        percent = to_percent(utilization)
+
+        return Response(
+            {
+                "team": team.id,
+                "start": start,
+                "bucket_minutes": bucket_minutes,
+                "technicians": members,
+                "shape": list(percent.shape),
+                "encoding": encoding,
+                "matrix": encode_base64(percent) if encoding == "base64" else encode_rle(percent),
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -6,7 +6,8 @@ from maintenance.models import (
     MaintenanceAssignment,
     MaintenanceWorkLog,
 )
-from maintenance.services import pick_technician_from_team
+from maintenance.rollups import record_created
+from maintenance.services import select_technician, technician_schedule
 
 from accounts.models import User
 from core.models import (
@@ -29,7 +30,9 @@ technicians = User.objects.filter(role="technician")
 
 equipments = list(Equipment.objects.select_related("company", "department"))
 work_centers = list(WorkCenter.objects.select_related("company"))
-teams = list(MaintenanceTeam.objects.select_related("company"))
+teams = list(
+    MaintenanceTeam.objects.select_related("company").prefetch_related("members")
+)
 
 assert user, "❌ No user found"
 assert admin, "❌ No admin found"
@@ -37,6 +40,16 @@ assert equipments, "❌ No equipment found"
 assert work_centers, "❌ No work centers found"
 assert teams, "❌ No maintenance teams found"
 
+# =====================================================
+# LOAD TECHNICIAN SCHEDULE (ONE QUERY)
+# =====================================================
+
+schedule = technician_schedule(
+    list(technicians.values_list("id", flat=True)),
+    now,
+    now + timedelta(days=7),
+)
+
 # =====================================================
 # CREATE MAINTENANCE REQUESTS
 # =====================================================
@@ -50,18 +63,22 @@ for idx in range(5):
 
     scheduled_start = now + timedelta(days=idx + 1)
     duration = 2
+    scheduled_end = scheduled_start + timedelta(hours=duration)
 
-    technician = pick_technician_from_team(
-        team=team,
+    technician = select_technician(
+        members=sorted(team.members.all(), key=lambda m: m.id),
+        schedule=schedule,
         start=scheduled_start,
-        duration=duration
+        end=scheduled_end,
     )
 
     if not technician:
         print(f"⚠️ No technician available for team {team.name}")
         continue
 
-    mr = MaintenanceRequest.objects.create(
+    schedule.book(technician.id, scheduled_start, scheduled_end)
+
+    mr = MaintenanceRequest(
         title=f"Routine Maintenance #{idx + 1}",
         description="Auto-generated demo maintenance",
         maintenance_type="preventive" if idx % 2 == 0 else "corrective",
@@ -80,18 +97,24 @@ for idx in range(5):
 
         scheduled_start=scheduled_start,
         duration_hours=duration,
+        scheduled_end=scheduled_end,
     )
 
-    # Assignment history
-    MaintenanceAssignment.objects.create(
+    maintenance_requests.append(mr)
+
+# One INSERT for the requests, one for their assignment history
+MaintenanceRequest.objects.bulk_create(maintenance_requests)
+record_created(maintenance_requests)
+MaintenanceAssignment.objects.bulk_create(
+    MaintenanceAssignment(
         maintenance_request=mr,
-        assigned_team=team,
-        assigned_technician=technician,
+        assigned_team=mr.assigned_team,
+        assigned_technician=mr.assigned_technician,
         assigned_by=admin,
         is_active=True,
     )
-
-    maintenance_requests.append(mr)
+    for mr in maintenance_requests
+)
 
 print(f"✅ Created {len(maintenance_requests)} maintenance requests")
 